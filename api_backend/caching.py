@@ -0,0 +1,137 @@
+"""
+Conditional GET and response caching for read-mostly lookup viewsets.
+
+Each tracked table has a version key in the Django cache holding the time of
+its last change; ``post_save``/``post_delete`` bump it once the transaction
+commits (see ``track_table_versions``, called from the apps' ``signals``
+modules). Views
+using ``ConditionalLookupMixin`` derive an ``ETag``/``Last-Modified`` from the
+versions of the tables they read, answer ``304 Not Modified`` when the client
+already has them and otherwise serve the serialized data from the cache.
+A change in any table produces new keys, so nothing has to be deleted.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION_KEY = "api:table-version:{label}"
+RESPONSE_CACHE_KEY = "api:lookup:{etag}"
+
+
+def _version_key(model):
+    return TABLE_VERSION_KEY.format(label=model._meta.label_lower)
+
+
+def bump_table_version(model):
+    try:
+        cache.set(_version_key(model), time.time(), None)
+    except Exception:
+        logger.warning("No se pudo actualizar la versión de %s en el cache", model._meta.label, exc_info=True)
+
+
+def get_table_versions(models):
+    """``{label: version}`` of the given models, initialising missing ones."""
+    keys = {_version_key(model): model for model in models}
+    versions = cache.get_many(list(keys))
+    now = time.time()
+    for key in keys.keys() - versions.keys():
+        # First use (or evicted): start a new version so old ETags stop matching
+        cache.add(key, now, None)
+        versions[key] = cache.get(key, now)
+    return {keys[key]._meta.label_lower: versions[key] for key in keys}
+
+
+def track_table_versions(*models):
+    """
+    Bump the table version of ``models`` on every save/delete, after commit:
+    bumping inside the transaction would let a concurrent request cache the
+    pre-commit rows under the new version.
+    """
+    for model in models:
+        def receiver(sender, _model=model, **kwargs):
+            transaction.on_commit(lambda: bump_table_version(_model))
+
+        uid = f"table-version:{model._meta.label_lower}"
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(receiver, sender=field.remote_field.through, weak=False, dispatch_uid=f"{uid}:{field.name}")
+
+
+def etag_matches(request, etag):
+    """Whether the request's ``If-None-Match`` lists ``etag`` (unquoted) or ``*``."""
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or quote_etag(etag) in candidates
+
+
+class ConditionalLookupMixin:
+    """
+    ETag/Last-Modified + cached data for ``list``/``retrieve``.
+
+    ``cache_dependencies`` lists every model the serialized data reads (e.g.
+    Career and Area for ``area_name``); the view's own model is added.
+    """
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        model = self.get_queryset().model
+        return (model,) + tuple(dep for dep in self.cache_dependencies if dep is not model)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(request, lambda: super(ConditionalLookupMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(request, lambda: super(ConditionalLookupMixin, self).retrieve(request, *args, **kwargs))
+
+    def _conditional_response(self, request, build):
+        try:
+            versions = get_table_versions(self.get_cache_dependencies())
+        except Exception:
+            logger.warning("Cache no disponible; se responde sin ETag", exc_info=True)
+            return build()
+
+        renderer = getattr(request, "accepted_renderer", None)
+        signature = "|".join(
+            [request.get_full_path(), getattr(renderer, "format", "") or ""]
+            + [f"{label}={version!r}" for label, version in sorted(versions.items())]
+        )
+        etag = hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()
+        last_modified = int(max(versions.values()))
+        headers = {
+            "ETag": quote_etag(etag),
+            "Last-Modified": http_date(last_modified),
+            "Cache-Control": "private, no-cache",
+        }
+
+        if self._not_modified(request, etag, last_modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        key = RESPONSE_CACHE_KEY.format(etag=etag)
+        data = cache.get(key)
+        if data is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(key, data, getattr(settings, "LOOKUP_CACHE_SECONDS", 86400))
+        return Response(data, headers=headers)
+
+    def _not_modified(self, request, etag, last_modified):
+        if request.headers.get("If-None-Match"):
+            return etag_matches(request, etag)
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        return if_modified_since is not None and last_modified <= if_modified_since
@@ -0,0 +1,252 @@
+"""
+Keyset (cursor) pagination shared by the API viewsets.
+
+Unlike DRF's ``CursorPagination`` (which positions on the first ordering
+field plus an offset), the cursor stores the values of every ordering field
+of the boundary row, and the next page is fetched with a lexicographic
+``WHERE (a, b, ...) > (x, y, ...)`` filter. Cost stays flat no matter how deep
+the client pages, and composite orderings such as
+``(code, section, period_year, period_season)`` can use their index.
+
+Views declare their default ordering with the usual ``ordering`` attribute
+(``?ordering=`` from ``OrderingFilter`` still applies); the primary key is
+appended as a tie-breaker. Small lookup tables opt out with
+``pagination_class = None``. ``values()`` querysets are supported: missing
+ordering fields are selected for the cursor and removed from the rows.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    ``DjangoJSONEncoder`` cuts datetimes/times to milliseconds; a truncated
+    boundary sorts before the last row returned and ``> boundary`` would
+    include it again. Cursor values keep full precision (ISO 8601, which the
+    model fields parse back exactly).
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Cursor inválido."
+
+    # NULLs sort first in ascending order (MySQL/SQLite behaviour)
+    nulls_first_ascending = True
+
+    def __init__(self):
+        self.page_size = getattr(settings, "REST_FRAMEWORK", {}).get("PAGE_SIZE") or 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [self._parse_term(queryset.model, term) for term in self.ordering]
+        self.pk_name = queryset.model._meta.pk.attname
+
+        values, reverse = self.decode_cursor(request)
+        self.has_cursor = values is not None
+        fields = [(name, not desc if reverse else desc, nullable) for name, desc, nullable in self.fields]
+        queryset = queryset.order_by(*[("-" if desc else "") + name for name, desc, _ in fields])
+        if values is not None:
+            queryset = queryset.filter(self._after_q(fields, values))
+        extra_keys = self._select_ordering_values(queryset)
+        if extra_keys:
+            queryset = queryset.values(*queryset._fields, *extra_keys)
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+        self.reverse = reverse
+        self.page = results
+        # Boundary positions are taken now, before extra keys are stripped
+        self.first_position = self._position(results[0]) if results else None
+        self.last_position = self._position(results[-1]) if results else None
+        for row in results if extra_keys else ():
+            for key in extra_keys:
+                del row[key]
+        return results
+
+    def _select_ordering_values(self, queryset):
+        """Ordering fields a ``values()`` queryset must add to build the cursor."""
+        if not getattr(queryset, "_fields", None):
+            return []
+        selected = set(queryset._fields)
+        pk_name = queryset.model._meta.pk.attname
+        return [
+            name for name, _, _ in self.fields
+            if name not in selected and not (name == "pk" and pk_name in selected)
+        ]
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, "ordering", None) or queryset.query.order_by or ("pk",)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = [term for term in ordering if isinstance(term, str)]
+        names = {term.lstrip("-") for term in ordering}
+        pk_name = queryset.model._meta.pk.attname
+        if not names & {"pk", "id", pk_name}:
+            ordering.append("pk")
+        return ordering
+
+    def _parse_term(self, model, term):
+        desc = term.startswith("-")
+        name = term.lstrip("-")
+        return name, desc, self._is_nullable(model, name)
+
+    def _is_nullable(self, model, name):
+        opts = model._meta
+        for part in name.split("__"):
+            if part == "pk":
+                return False
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                field = next((f for f in opts.concrete_fields if f.attname == part), None)
+                if field is None:
+                    return True
+            if getattr(field, "null", False) or field.is_relation and not field.concrete:
+                return True
+            if field.is_relation:
+                opts = field.related_model._meta
+        return False
+
+    def _after_q(self, fields, values):
+        """Rows strictly after ``values`` for the given (name, desc, nullable) ordering."""
+        result = Q(pk__in=[])
+        equal = Q()
+        for (name, desc, nullable), value in zip(fields, values):
+            result |= equal & self._after_field_q(name, desc, nullable, value)
+            equal &= Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+        return result
+
+    def _after_field_q(self, name, desc, nullable, value):
+        nulls_last = desc if self.nulls_first_ascending else not desc
+        if value is None:
+            # Only non-NULL rows follow a NULL when NULLs come first
+            return Q(pk__in=[]) if nulls_last else Q(**{f"{name}__isnull": False})
+        q = Q(**{f"{name}__lt" if desc else f"{name}__gt": value})
+        if nullable and nulls_last:
+            q |= Q(**{f"{name}__isnull": True})
+        return q
+
+    def _position(self, instance):
+        if isinstance(instance, dict):
+            return [instance[self.pk_name if name == "pk" and name not in instance else name] for name, _, _ in self.fields]
+        values = []
+        for name, _, _ in self.fields:
+            value = instance
+            for part in name.split("__"):
+                value = getattr(value, part, None) if value is not None else None
+            if hasattr(value, "_meta"):
+                value = value.pk
+            values.append(value)
+        return values
+
+    def encode_cursor(self, values, reverse=False):
+        payload = json.dumps({"v": values, "r": int(reverse)}, cls=CursorJSONEncoder, separators=(",", ":"))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, reverse = data["v"], bool(data.get("r"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.last_position)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            if self.has_cursor:
+                return remove_query_param(self.base_url, self.cursor_query_param)
+            return None
+        if (self.reverse and self.has_more) or (not self.reverse and self.has_cursor):
+            return self.encode_cursor(self.first_position, reverse=True)
+        return None
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor de paginación.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Resultados por página (máx. {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,68 @@
+"""
+orjson-based JSON renderer/parser for the API.
+
+Drop-in replacements for DRF's ``JSONRenderer``/``JSONParser``: output matches
+the stdlib encoder (datetimes, ``Decimal``, lazy strings, UUIDs... go through
+DRF's ``JSONEncoder``; U+2028/U+2029 are escaped) but lists of thousands of
+rows are encoded several times faster. Requests asking for an ``indent`` (the
+browsable API), non-default ``UNICODE_JSON``/``COMPACT_JSON`` settings and
+installs without ``orjson`` fall back to DRF's classes.
+
+``python manage.py bench_json_renderers`` compares both on period-sized data.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Same representation as DRF's encoder for everything orjson leaves to us
+    return _drf_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            # Like DRF: keep the output embeddable in <script> tags
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read() if stream is not None else b""
+            if codecs.lookup(encoding).name != "utf-8":
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
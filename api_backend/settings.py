@@ -72,7 +72,14 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.BasicAuthentication'],
   'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
   'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend','rest_framework.filters.SearchFilter','rest_framework.filters.OrderingFilter'],
+  # Keyset pagination; lookup tables opt out with pagination_class = None
+  'DEFAULT_PAGINATION_CLASS': 'api_backend.pagination.KeysetPagination',
+  'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '100')),
 }
+# JSON con orjson (api_backend/renderers.py); API_FAST_JSON=0 vuelve a los de DRF
+if os.getenv('API_FAST_JSON', '1').lower() in {'1', 'true', 'yes', 'on'}:
+  REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['api_backend.renderers.ORJSONRenderer', 'rest_framework.renderers.BrowsableAPIRenderer']
+  REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = ['api_backend.renderers.ORJSONParser', 'rest_framework.parsers.FormParser', 'rest_framework.parsers.MultiPartParser']
 
 ROOT_URLCONF = 'api_backend.urls'
 
@@ -175,9 +182,64 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
 CELERY_TASK_ALWAYS_EAGER = False                       # True solo en tests
+CELERY_BEAT_SCHEDULE = {
+    # Borra exportaciones vencidas (ExportJob.expires_at) y sus archivos
+    'purge-export-jobs': {'task': 'exports_app.tasks.purge_export_jobs', 'schedule': 3600.0},
+}
+
+# Cache compartido entre workers (Redis). CACHE_REDIS_URL vacío usa memoria local (un proceso)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://redis:6379/2")
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': os.getenv("CACHE_KEY_PREFIX", "apibackend"),
+        }
+    }
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Vigencia de las respuestas cacheadas de catálogos (las versiones por tabla las invalidan antes)
+LOOKUP_CACHE_SECONDS = int(os.getenv("LOOKUP_CACHE_SECONDS", "86400"))
+
+# Motor de exportación Excel: 'patch' (parcha el XML de la plantilla) u 'openpyxl'
+EXPORT_XLSX_ENGINE = os.getenv("EXPORT_XLSX_ENGINE", "patch")
+# Procesos para generar las fichas del zip por período (0 = en el mismo proceso)
+EXPORT_BULK_WORKERS = int(os.getenv("EXPORT_BULK_WORKERS", "0"))
+# Fichas ya generadas que cada proceso guarda (LRU) mientras la asignatura no cambie; 0 = desactivado
+EXPORT_RENDER_CACHE_BYTES = int(os.getenv("EXPORT_RENDER_CACHE_BYTES", str(32 * 1024 * 1024)))
+# Exportaciones en segundo plano (/api/exports/jobs/): vigencia del archivo generado en
+# MEDIA_ROOT y tiempo tras el cual un trabajo pendiente se considera abandonado
+EXPORT_JOB_TTL_SECONDS = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "86400"))
+EXPORT_JOB_STALE_SECONDS = int(os.getenv("EXPORT_JOB_STALE_SECONDS", "3600"))
 
 # Redis URL used by the Subject SSE stream (falls back to Celery broker)
 SUBJECT_STREAM_REDIS_URL = os.getenv("SUBJECT_STREAM_REDIS_URL", CELERY_BROKER_URL)
+# Segundos que el stream SSE reutiliza un JWT ya validado (nunca mas alla de exp)
+SUBJECT_STREAM_AUTH_CACHE_SECONDS = int(os.getenv("SUBJECT_STREAM_AUTH_CACHE_SECONDS", "30"))
+
+# Cache de perfiles de acceso (grupo 'vcm') entre requests; 0 = desactivado
+USER_ACCESS_CACHE_SECONDS = int(os.getenv("USER_ACCESS_CACHE_SECONDS", "0"))
+# Cache del resumen por período del Gantt (/api/subject-phase-progress/period-overview/)
+PERIOD_OVERVIEW_CACHE_SECONDS = int(os.getenv("PERIOD_OVERVIEW_CACHE_SECONDS", "300"))
 
 # Período académico por defecto (O-YYYY / P-YYYY)
 SUBJECT_DEFAULT_PERIOD = os.getenv("SUBJECT_DEFAULT_PERIOD", "P-2025")
+# Cache del período activo (PeriodSetting): compartido en el cache de Django y
+# copia local por proceso; se invalida al guardar PeriodSetting
+PERIOD_SETTING_CACHE_SECONDS = int(os.getenv("PERIOD_SETTING_CACHE_SECONDS", "3600"))
+PERIOD_SETTING_LOCAL_SECONDS = float(os.getenv("PERIOD_SETTING_LOCAL_SECONDS", "5"))
+
+# Log de consultas SQL para `report_unindexed_filters` (Django solo las registra con DEBUG=True)
+DJANGO_DB_LOG_FILE = os.getenv("DJANGO_DB_LOG_FILE")
+if DJANGO_DB_LOG_FILE:
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {
+            'db_file': {'class': 'logging.FileHandler', 'filename': DJANGO_DB_LOG_FILE},
+        },
+        'loggers': {
+            'django.db.backends': {'handlers': ['db_file'], 'level': 'DEBUG', 'propagate': False},
+        },
+    }
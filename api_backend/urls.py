@@ -41,6 +41,7 @@ from subjects.views import (
     CompanyEngagementScopeViewSet,
     SubjectPhaseProgressViewSet,
     subject_stream,
+    subject_stream_metrics,
 )
 from forms_app.views import FormInstanceViewSet, FormTemplateViewSet
 from descriptors.views import DescriptorViewSet
@@ -88,6 +89,7 @@ urlpatterns = [
 
     # API
     path('api/subjects/stream/', subject_stream, name='subject-stream'),
+    path('api/subjects/stream/metrics/', subject_stream_metrics, name='subject-stream-metrics'),
     path('api/', include(router.urls)),
     path('api/', include('exports_app.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
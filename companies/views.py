@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions
 from rest_framework import exceptions
-from django.db.models import Q
-from subjects.models import Subject
+from subjects.scoping import SubjectScopedQuerysetMixin, accessible_subject_ids
+from users.access import get_access_profile
 from .models import Company, ProblemStatement, CounterpartContact
 from .serializers import (
     CompanySerializer,
@@ -10,52 +10,15 @@ from .serializers import (
 )
 
 
-def _has_full_company_scope(user):
-    return (
-        getattr(user, 'is_staff', False)
-        or getattr(user, 'role', None) in ['VCM', 'COORD', 'DC', 'DOC']
-        or user.groups.filter(name__in=['vcm']).exists()
-    )
-
-
-def _director_problemstatement_scope(user):
-    if getattr(user, 'role', None) != 'DC':
-        return None
-    career_id = getattr(user, 'career_id', None)
-    if career_id:
-        return Q(subject__career_id=career_id)
-    area_id = getattr(user, 'area_id', None)
-    if area_id:
-        return Q(subject__area_id=area_id)
-    return None
+COMPANY_FULL_SCOPE_ROLES = ('VCM', 'COORD', 'DC', 'DOC')
 
 
-def _director_subject_queryset(user):
-    if getattr(user, 'role', None) != 'DC':
-        return Subject.objects.none()
-    qs = Subject.objects.all()
-    career_id = getattr(user, 'career_id', None)
-    if career_id:
-        return qs.filter(career_id=career_id)
-    area_id = getattr(user, 'area_id', None)
-    if area_id:
-        return qs.filter(area_id=area_id)
-    return Subject.objects.none()
-
-
-def _subject_pairs_for_director(user):
-    qs = _director_subject_queryset(user)
-    return list(qs.values_list('code', 'section', 'period_year', 'period_season'))
+def _has_full_company_scope(user):
+    return get_access_profile(user).has_elevated_access(COMPANY_FULL_SCOPE_ROLES)
 
 
 def _accessible_company_ids(user):
-    teacher_subject_ids = set(
-        Subject.objects.filter(teacher=user).values_list('id', flat=True)
-    )
-    director_subject_ids = set(
-        _director_subject_queryset(user).values_list('id', flat=True)
-    )
-    subject_ids = teacher_subject_ids | director_subject_ids
+    subject_ids = accessible_subject_ids(user)
     if not subject_ids:
         return set()
     return set(
@@ -66,29 +29,23 @@ def _accessible_company_ids(user):
 
 class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.all().order_by('name')
+    ordering = ('name', 'id')
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class ProblemStatementViewSet(viewsets.ModelViewSet):
+class ProblemStatementViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = ProblemStatement.objects.all().select_related('subject', 'company')
+    ordering = ('subject_id', 'company_id', 'id')
     serializer_class = ProblemStatementSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['subject', 'company']
-
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if _has_full_company_scope(user):
-            return qs
-        director_scope = _director_problemstatement_scope(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
+    subject_scope_full_access_roles = COMPANY_FULL_SCOPE_ROLES
 
 
 class CounterpartContactViewSet(viewsets.ModelViewSet):
     queryset = CounterpartContact.objects.all().select_related('company')
+    ordering = ('company_id', 'id')
     serializer_class = CounterpartContactSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['company']
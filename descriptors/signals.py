@@ -18,7 +18,7 @@ def descriptor_processed(sender, instance, created, update_fields=None, **kwargs
     if update_fields is not None and "processed_at" not in update_fields:
         return
     try:
-        publish_subject_event("descriptor_processed", instance.subject)
+        publish_subject_event("descriptor_processed", instance.subject, changed_fields=())
     except Exception:
         # SSE notifications should not interrupt the save pipeline
         pass
@@ -2,6 +2,7 @@ from django.shortcuts import render
 
 # Create your views here.
 from rest_framework import viewsets, permissions, decorators, response, status, serializers
+from users.access import get_access_profile
 from .models import DescriptorFile
 from .serializers import DescriptorUploadSerializer
 from .strict_tasks import process_descriptor_strict
@@ -9,6 +10,7 @@ from .utils_descriptor_validation import _norm_code, extract_code_from_path_robu
 
 class DescriptorViewSet(viewsets.ModelViewSet):
     queryset = DescriptorFile.objects.all().select_related('subject')
+    ordering = ('id',)
     serializer_class = DescriptorUploadSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -21,20 +23,12 @@ class DescriptorViewSet(viewsets.ModelViewSet):
         if subject_id:
             qs = qs.filter(subject_id=subject_id)
         
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD', 'DC']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
+        if get_access_profile(user).has_elevated_access(['DAC', 'VCM', 'COORD', 'DC']):
             return qs
         return qs.filter(subject__teacher=user)
 
     def _has_elevated_access(self, user):
-        return (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['ADMIN', 'DAC', 'VCM', 'DC']
-            or user.groups.filter(name__in=['vcm']).exists()
-        )
+        return get_access_profile(user).has_elevated_access(['ADMIN', 'DAC', 'VCM', 'DC'])
 
     def perform_create(self, serializer):
         user = self.request.user
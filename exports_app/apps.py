@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ExportsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exports_app'
+
+    def ready(self):
+        # Señales que actualizan la versión de datos exportables (versions.py)
+        from . import signals  # noqa: F401
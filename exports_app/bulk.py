@@ -0,0 +1,171 @@
+"""
+Exportación masiva: todas las Fichas API de un período en un zip.
+
+Las asignaturas se recorren por bloques con sus relaciones precargadas
+(``ficha_api_subjects``, una consulta por relación y bloque); cada ficha se genera con ``render_xlsx`` (en el
+proceso o en un pool de procesos si ``EXPORT_BULK_WORKERS`` > 0) y se agrega
+al zip apenas está lista. ``iter_ficha_api_zip`` entrega el zip por partes,
+así la respuesta se transmite mientras se genera y nunca se tienen todos los
+archivos en memoria. Al final se agrega ``manifest.json`` con el estado y los
+datos faltantes de cada ficha.
+"""
+import json
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from subjects.models import Subject
+from subjects.scoping import scope_queryset_by_subject
+from users.access import get_access_profile
+from .data_collectors import FichaAPIDataCollector, ficha_api_subjects
+from .services import render_xlsx
+
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 100
+# Roles que pueden exportar fichas de cualquier asignatura
+EXPORT_FULL_ACCESS_ROLES = ('ADMIN', 'VCM', 'COORD', 'DAC')
+
+
+class _ZipStream:
+    """Destino de ``zipfile`` sin ``seek``/``tell``: acumula lo escrito hasta ``take()``."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def period_subjects(season, year, filters, user):
+    """Asignaturas del período filtradas por ``filters`` (``area``/``career``) y el alcance de ``user``."""
+    subjects = Subject.objects.filter(
+        period_season=season,
+        period_year=year,
+        **{f'{param}_id': value for param, value in (filters or {}).items()},
+    )
+    if not get_access_profile(user).has_elevated_access(EXPORT_FULL_ACCESS_ROLES):
+        subjects = scope_queryset_by_subject(subjects, user, subject_field='')
+    return subjects
+
+
+def ficha_api_filename(subject):
+    code = f"{subject.code}_{subject.section}".replace(' ', '_').replace('/', '_')
+    return f"Ficha_API_{code}_{subject.period_season}{subject.period_year}.xlsx"
+
+
+def _collect(subjects):
+    """``(entrada del manifiesto, datos o None)`` por asignatura."""
+    for subject in subjects:
+        entry = {
+            'subject_id': subject.pk,
+            'code': subject.code,
+            'section': subject.section,
+            'name': subject.name,
+            'file': ficha_api_filename(subject),
+        }
+        collector = FichaAPIDataCollector(subject)
+        try:
+            data = collector.collect_all()
+        except Exception as exc:
+            logger.exception("No se pudo recolectar la Ficha API de la asignatura %s", subject.pk)
+            entry.update(status='error', error=str(exc))
+            yield entry, None
+            continue
+        missing = collector.get_missing_data_report()
+        entry.update(status='partial' if missing else 'complete', missing_data=missing)
+        yield entry, data
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _render_ficha_api(data, engine):
+    return render_xlsx('ficha-api', data, engine=engine)
+
+
+def _render_all(collected, engine, workers):
+    """``(entrada, bytes o None)`` en el mismo orden, usando un pool si ``workers`` > 0."""
+    if workers <= 0:
+        for entry, data in collected:
+            yield entry, _render_safe(entry, lambda: _render_ficha_api(data, engine))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for entry, data in collected:
+            pending.append((entry, pool.submit(_render_ficha_api, data, engine) if data is not None else None))
+            # Ventana acotada: a lo más 2 fichas por proceso en vuelo
+            while len(pending) > workers * 2:
+                entry, future = pending.popleft()
+                yield entry, _render_safe(entry, future.result if future else None)
+        while pending:
+            entry, future = pending.popleft()
+            yield entry, _render_safe(entry, future.result if future else None)
+
+
+def _render_safe(entry, render):
+    if render is None or entry['status'] == 'error':
+        return None
+    try:
+        return render()
+    except Exception as exc:
+        logger.exception("No se pudo generar %s", entry['file'])
+        entry.pop('missing_data', None)
+        entry.update(status='error', error=str(exc))
+        return None
+
+
+def iter_ficha_api_zip(subjects, period=None, filters=None, engine=None, workers=None):
+    """
+    Genera por partes un zip con la Ficha API de cada asignatura de
+    ``subjects`` (queryset) y un ``manifest.json``.
+    """
+    if workers is None:
+        workers = int(getattr(settings, 'EXPORT_BULK_WORKERS', 0) or 0)
+    subjects = (
+        ficha_api_subjects(subjects)
+        .order_by('code', 'section', 'pk')
+        .iterator(chunk_size=BULK_CHUNK_SIZE)
+    )
+    manifest = {
+        'template': 'ficha-api',
+        'period': period,
+        'filters': filters or {},
+        'generated_at': timezone.now().isoformat(),
+        'files': [],
+    }
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for entry, content in _render_all(_collect(subjects), engine, workers):
+            if content is not None:
+                # Los .xlsx ya vienen comprimidos
+                archive.writestr(entry['file'], content)
+            manifest['files'].append(entry)
+            yield stream.take()
+
+        statuses = [entry['status'] for entry in manifest['files']]
+        manifest.update(
+            total=len(statuses),
+            complete=statuses.count('complete'),
+            partial=statuses.count('partial'),
+            errors=statuses.count('error'),
+        )
+        archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+    yield stream.take()
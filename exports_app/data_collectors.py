@@ -5,6 +5,66 @@ y preparar datos para exportar a Excel.
 from typing import Dict, Any, List
 from datetime import datetime
 
+from django.db.models import Prefetch
+
+from companies.models import CounterpartContact, ProblemStatement
+from subjects.models import PossibleCounterpart, SubjectTechnicalCompetency, SubjectUnit
+
+
+# Los collectors solo leen datos precargados: cargar la asignatura (y la
+# problemática) con estos helpers deja cada exportación en un número fijo de
+# consultas, sin importar cuántas filas tenga. Cada Prefetch trae el orden que
+# espera el collector, así que ``.all()`` nunca vuelve a consultar.
+FICHA_API_SELECT = (
+    'area', 'semester', 'company_boundary_conditions', 'api2_completion', 'api3_completion', 'alternance',
+)
+PROYECTO_API_SELECT = ('area', 'semester', 'engagement_scope')
+# Consultas por exportación de una asignatura (1 de la asignatura + 1 por relación precargada)
+FICHA_API_QUERY_BUDGET = 7
+PROYECTO_API_QUERY_BUDGET = 4
+
+
+def _counterpart_contacts_prefetch(lookup):
+    return Prefetch(lookup, queryset=CounterpartContact.objects.order_by('id'))
+
+
+def ficha_api_prefetch():
+    return (
+        Prefetch('technical_competencies', queryset=SubjectTechnicalCompetency.objects.order_by('number')),
+        Prefetch(
+            'possible_counterparts',
+            queryset=PossibleCounterpart.objects.select_related('company')
+            .prefetch_related('interaction_types')
+            .order_by('company__name', 'id'),
+        ),
+        Prefetch(
+            'problem_statements',
+            queryset=ProblemStatement.objects.select_related('company')
+            .prefetch_related(_counterpart_contacts_prefetch('company__counterpart_contacts'))
+            .order_by('company__name', 'id'),
+        ),
+        Prefetch('units', queryset=SubjectUnit.objects.order_by('number')),
+    )
+
+
+def ficha_api_subjects(queryset):
+    """``queryset`` de Subject con todo lo que lee ``FichaAPIDataCollector``."""
+    return queryset.select_related(*FICHA_API_SELECT).prefetch_related(*ficha_api_prefetch())
+
+
+def proyecto_api_subjects(queryset):
+    """``queryset`` de Subject con todo lo que lee ``ProyectoAPIDataCollector``."""
+    return queryset.select_related(*PROYECTO_API_SELECT).prefetch_related(
+        Prefetch('units', queryset=SubjectUnit.objects.order_by('number'))
+    )
+
+
+def proyecto_api_problem_statements(queryset):
+    """``queryset`` de ProblemStatement con la empresa y sus contactos ordenados."""
+    return queryset.select_related('company').prefetch_related(
+        _counterpart_contacts_prefetch('company__counterpart_contacts')
+    )
+
 
 class FichaAPIDataCollector:
     """
@@ -72,7 +132,7 @@ class FichaAPIDataCollector:
     
     def _collect_technical_competencies(self) -> Dict[str, Any]:
         """Recolecta las 5 competencias técnicas."""
-        competencies = list(self.subject.technical_competencies.order_by('number')[:5])
+        competencies = list(self.subject.technical_competencies.all())[:5]
         data = {}
         
         if len(competencies) < 5:
@@ -162,7 +222,7 @@ class FichaAPIDataCollector:
     
     def _collect_possible_counterparts(self) -> Dict[str, Any]:
         """Recolecta hasta 4 posibles contrapartes."""
-        counterparts = self.subject.possible_counterparts.select_related('company')[:4]
+        counterparts = list(self.subject.possible_counterparts.all())[:4]
         data = {}
         
         for idx, counterpart in enumerate(counterparts, start=1):
@@ -199,13 +259,13 @@ class FichaAPIDataCollector:
     
     def _collect_companies_and_contacts(self) -> Dict[str, Any]:
         """Recolecta empresas y sus contactos de las problemáticas."""
-        problem_statements = self.subject.problem_statements.select_related('company')[:4]
+        problem_statements = list(self.subject.problem_statements.all())[:4]
         data = {}
         
         for idx, ps in enumerate(problem_statements, start=1):
             company = ps.company
             # Obtener el primer contacto de contraparte (a través de la company)
-            contact = company.counterpart_contacts.first() if company else None
+            contact = next(iter(company.counterpart_contacts.all()), None) if company else None
             
             data.update({
                 f'Company_name_col_{idx}': company.name,
@@ -265,7 +325,7 @@ class FichaAPIDataCollector:
     def _collect_additional_data(self) -> Dict[str, Any]:
         """Recolecta datos adicionales finales."""
         # Obtener evidencias de evaluación de todas las unidades
-        units = self.subject.units.order_by('number')
+        units = self.subject.units.all()
         evaluation_evidences = ' / '.join([
             unit.evaluation_evidence or '' 
             for unit in units 
@@ -274,7 +334,7 @@ class FichaAPIDataCollector:
         
         # Obtener definición del problema (primer problem_statement)
         problem_definition = ''
-        first_ps = self.subject.problem_statements.first()
+        first_ps = next(iter(self.subject.problem_statements.all()), None)
         if first_ps:
             problem_definition = first_ps.problem_definition
         
@@ -437,7 +497,7 @@ class ProyectoAPIDataCollector:
     
     def _collect_subject_units(self) -> Dict[str, Any]:
         """Recolecta hasta 4 unidades con sus contactos de contraparte."""
-        units = list(self.subject.units.order_by('number')[:4])
+        units = list(self.subject.units.all())[:4]
         data = {}
         
         if len(units) < 4:
@@ -446,7 +506,7 @@ class ProyectoAPIDataCollector:
         # Obtener el primer contacto de contraparte del problem_statement específico
         first_contact = None
         if self.problem_statement.company:
-            first_contact = self.problem_statement.company.counterpart_contacts.first()
+            first_contact = next(iter(self.problem_statement.company.counterpart_contacts.all()), None)
         
         # Llenar hasta 4 filas
         for idx in range(1, 5):
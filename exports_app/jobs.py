@@ -0,0 +1,140 @@
+"""
+Trabajos de exportación en segundo plano.
+
+``get_or_create_export_job`` registra un ``ExportJob`` y lo encola en Celery
+(``exports_app.tasks.run_export_job``) al confirmar la transacción. Pedidos
+iguales (misma plantilla, mismo objetivo y misma versión de los datos de las
+asignaturas, ver ``versions``) reutilizan el trabajo en curso o el archivo ya
+generado mientras no expire. El avance se publica como evento
+``export_progress`` en el stream SSE de asignaturas.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from subjects.events import publish_stream_event
+from .models import ExportJob
+from .versions import get_subject_data_versions
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_LOCK_KEY = "exports:job-lock:{key}"
+
+
+def export_job_ttl():
+    return timedelta(seconds=int(getattr(settings, "EXPORT_JOB_TTL_SECONDS", 86400)))
+
+
+def export_job_dedupe_key(template, subject_ids, scope=None, **target):
+    """Hash de la plantilla, el objetivo (``target``) y la versión de datos de ``subject_ids``."""
+    versions = sorted(get_subject_data_versions(subject_ids).items())
+    parts = [template, scope, sorted(target.items()), versions]
+    if template in ("ficha-api", "ficha-api-period"):
+        # La Ficha API lleva el mes y año actuales
+        parts.append(datetime.now().strftime("%Y-%m"))
+    raw = json.dumps(parts, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _reusable_job(dedupe_key):
+    now = timezone.now()
+    # Un trabajo pendiente muy antiguo (worker caído) ya no bloquea uno nuevo
+    stale = now - timedelta(seconds=int(getattr(settings, "EXPORT_JOB_STALE_SECONDS", 3600)))
+    return (
+        ExportJob.objects.filter(dedupe_key=dedupe_key)
+        .filter(
+            Q(status__in=(ExportJob.STATUS_PENDING, ExportJob.STATUS_RUNNING), created_at__gt=stale)
+            | Q(status=ExportJob.STATUS_DONE, expires_at__gt=now)
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def get_or_create_export_job(dedupe_key, **fields):
+    """``(job, created)``: el trabajo equivalente vigente o uno nuevo encolado."""
+    job = _reusable_job(dedupe_key)
+    if job is not None:
+        return job, False
+
+    lock = EXPORT_JOB_LOCK_KEY.format(key=dedupe_key)
+    locked = cache.add(lock, 1, 30)
+    if not locked:
+        # Otro request está creando el mismo trabajo
+        for _ in range(20):
+            time.sleep(0.1)
+            job = _reusable_job(dedupe_key)
+            if job is not None:
+                return job, False
+    try:
+        job = _reusable_job(dedupe_key)
+        if job is not None:
+            return job, False
+        job = ExportJob.objects.create(dedupe_key=dedupe_key, **fields)
+    finally:
+        if locked:
+            cache.delete(lock)
+
+    transaction.on_commit(lambda: _enqueue(job))
+    return job, True
+
+
+def _enqueue(job):
+    from .tasks import run_export_job
+    try:
+        run_export_job.delay(job.pk)
+    except Exception as exc:
+        # Broker caído: el trabajo queda en error en vez de pendiente para siempre
+        logger.exception("No se pudo encolar el trabajo de exportación %s", job.pk)
+        job.status = ExportJob.STATUS_ERROR
+        job.error = f"No se pudo encolar la exportación: {exc}"
+        job.finished_at = timezone.now()
+        job.expires_at = job.finished_at + export_job_ttl()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=job.status, error=job.error, finished_at=job.finished_at, expires_at=job.expires_at
+        )
+
+
+def export_job_download_url(job):
+    return reverse("exports:export_job_download", args=[job.pk])
+
+
+def publish_export_progress(job):
+    payload = {
+        "job_id": job.pk,
+        "template": job.template,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "subject_id": job.subject_id,
+        "requested_by": job.requested_by_id,
+        "download_url": export_job_download_url(job) if job.status == ExportJob.STATUS_DONE else None,
+        "error": job.error or None,
+    }
+    try:
+        publish_stream_event("export_progress", payload)
+    except Exception:
+        # Redis caído: el estado sigue disponible en GET /api/exports/jobs/<id>/
+        logger.warning("No se pudo publicar el avance del trabajo %s", job.pk, exc_info=True)
+
+
+def purge_expired_export_jobs():
+    """Borra los trabajos vencidos y sus archivos; retorna cuántos se borraron."""
+    expired = ExportJob.objects.filter(expires_at__lte=timezone.now())
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        count += 1
+    return count
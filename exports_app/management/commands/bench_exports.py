@@ -0,0 +1,339 @@
+"""
+Benchmarks the Excel exports on synthetic subjects with every related table
+maxed out: 4 units, 5 competencies, boundary conditions, API 2/3 completion,
+alternance, engagement scope, 4 possible counterparts with interaction types
+and 4 problem statements whose companies have 4 contacts each.
+
+For each template and engine it times separately the collector (loading the
+subject with ``data_collectors`` prefetches + ``collect_all``), the template
+load (cold, then the per-export copy/lookup), the cell fill and the save. It
+counts the collector's queries and measures the peak memory (tracemalloc) of
+a whole export. The synthetic rows live in a transaction that is rolled back.
+
+Fails when the collectors exceed their query budgets
+(``FICHA_API_QUERY_BUDGET`` / ``PROYECTO_API_QUERY_BUDGET``) or an export with
+the configured engine (``EXPORT_XLSX_ENGINE``) exceeds ``--max-ms`` /
+``--max-peak-kb``.
+
+    python manage.py bench_exports --subjects 20 --repeat 5
+"""
+import io
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from companies.models import Company, CounterpartContact, ProblemStatement
+from exports_app.data_collectors import (
+    FICHA_API_QUERY_BUDGET,
+    PROYECTO_API_QUERY_BUDGET,
+    FichaAPIDataCollector,
+    ProyectoAPIDataCollector,
+    ficha_api_subjects,
+    proyecto_api_problem_statements,
+    proyecto_api_subjects,
+)
+from exports_app.services import _set_value_safe, get_mapping_path, get_template_path, render_xlsx
+from exports_app.template_cache import (
+    clear_template_cache,
+    get_compiled_mapping,
+    get_template_workbook,
+    get_xlsx_template,
+)
+from subjects.models import (
+    Api3Alternance,
+    ApiType2Completion,
+    ApiType3Completion,
+    Area,
+    CompanyBoundaryCondition,
+    CompanyEngagementScope,
+    InteractionType,
+    PossibleCounterpart,
+    SemesterLevel,
+    Subject,
+    SubjectTechnicalCompetency,
+    SubjectUnit,
+)
+
+
+BENCH_PERIOD = (2099, "O")
+ENGINES = ("patch", "openpyxl")
+_TEXT = "Texto de prueba con largo similar al de una ficha real. " * 4
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _best(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _create_synthetic(count):
+    """``count`` subjects with maxed-out related data; returns their ids."""
+    area = Area.objects.order_by("pk").first() or Area.objects.create(name="Bench área")
+    semester = SemesterLevel.objects.order_by("pk").first() or SemesterLevel.objects.create(name="Bench")
+    interaction_types = list(InteractionType.objects.all()[:2]) or [
+        InteractionType.objects.create(code=f"bench-{idx}", label=f"Bench {idx}") for idx in range(2)
+    ]
+    companies = [
+        Company.objects.create(
+            name=f"Bench empresa {idx}", address="Av. Siempre Viva 742", management_address="Casa matriz",
+            email=f"bench{idx}@example.com", phone="+56 9 1234 5678", employees_count=100 + idx, sector="Tecnología",
+        )
+        for idx in range(4)
+    ]
+    CounterpartContact.objects.bulk_create([
+        CounterpartContact(
+            company=company, name=f"Contacto {idx}", rut="11.111.111-1", phone="+56 9 8765 4321",
+            email=f"contacto{idx}@example.com", counterpart_area="Operaciones", role="Jefe de área",
+        )
+        for company in companies for idx in range(4)
+    ])
+
+    year, season = BENCH_PERIOD
+    Subject.objects.bulk_create([
+        Subject(
+            code=f"BENCH-{idx:04d}", section="1", name=f"Asignatura de prueba {idx}", period_year=year,
+            period_season=season, hours=72, total_students=40, api_type=2 + idx % 2, area=area, semester=semester,
+        )
+        for idx in range(count)
+    ])
+    # bulk_create no devuelve pks en MySQL
+    subject_ids = list(
+        Subject.objects.filter(period_year=year, period_season=season, code__startswith="BENCH-").values_list("pk", flat=True)
+    )
+
+    SubjectUnit.objects.bulk_create([
+        SubjectUnit(
+            subject_id=subject_id, number=number, expected_learning=_TEXT, unit_hours=18,
+            activities_description=_TEXT, evaluation_evidence=f"Evidencia {number}", evidence_detail=_TEXT,
+            counterpart_link=_TEXT, place_mode_type="Presencial",
+        )
+        for subject_id in subject_ids for number in range(1, 5)
+    ])
+    SubjectTechnicalCompetency.objects.bulk_create([
+        SubjectTechnicalCompetency(subject_id=subject_id, number=number, description=_TEXT)
+        for subject_id in subject_ids for number in range(1, 6)
+    ])
+    CompanyBoundaryCondition.objects.bulk_create([
+        CompanyBoundaryCondition(
+            subject_id=subject_id, large_company=True, medium_company=True, small_company=False,
+            family_enterprise=False, not_relevant=False, company_type_description=_TEXT,
+            company_requirements_for_level_2_3=_TEXT, project_minimum_elements=_TEXT,
+        )
+        for subject_id in subject_ids
+    ])
+    ApiType2Completion.objects.bulk_create([
+        ApiType2Completion(
+            subject_id=subject_id, project_goal_students=_TEXT, deliverables_at_end=_TEXT,
+            company_expected_participation=_TEXT, other_activities=_TEXT,
+        )
+        for subject_id in subject_ids
+    ])
+    ApiType3Completion.objects.bulk_create([
+        ApiType3Completion(
+            subject_id=subject_id, project_goal_students=_TEXT, deliverables_at_end=_TEXT,
+            expected_student_role=_TEXT, other_activities=_TEXT, master_guide_expected_support=_TEXT,
+        )
+        for subject_id in subject_ids
+    ])
+    Api3Alternance.objects.bulk_create([
+        Api3Alternance(
+            subject_id=subject_id, student_role="Practicante", students_quota=4, tutor_name="Tutor Bench",
+            tutor_email="tutor@example.com", alternance_hours=120,
+        )
+        for subject_id in subject_ids
+    ])
+    CompanyEngagementScope.objects.bulk_create([
+        CompanyEngagementScope(
+            subject_id=subject_id, benefits_from_student=_TEXT, has_value_or_research_project=True,
+            time_availability_and_participation=_TEXT, workplace_has_conditions_for_group=True,
+            meeting_schedule_availability=_TEXT,
+        )
+        for subject_id in subject_ids
+    ])
+    PossibleCounterpart.objects.bulk_create([
+        PossibleCounterpart(
+            subject_id=subject_id, company=company, sector="Tecnología", worked_before=True,
+            interest_collaborate=True, can_develop_activities=True, willing_design_project=True,
+            has_guide=True, can_receive_alternance=True, alternance_students_quota=2,
+        )
+        for subject_id in subject_ids for company in companies
+    ])
+    Through = PossibleCounterpart.interaction_types.through
+    Through.objects.bulk_create([
+        Through(possiblecounterpart_id=counterpart_id, interactiontype_id=interaction_type.pk)
+        for counterpart_id in PossibleCounterpart.objects.filter(subject_id__in=subject_ids).values_list("pk", flat=True)
+        for interaction_type in interaction_types
+    ])
+    ProblemStatement.objects.bulk_create([
+        ProblemStatement(
+            subject_id=subject_id, company=company, problem_to_address=_TEXT, why_important=_TEXT,
+            stakeholders=_TEXT, related_area=_TEXT, benefits_short_medium_long_term=_TEXT, problem_definition=_TEXT,
+        )
+        for subject_id in subject_ids for company in companies
+    ])
+    return subject_ids
+
+
+def _collect_ficha_api(subject_id):
+    subject = ficha_api_subjects(Subject.objects.all()).get(pk=subject_id)
+    collector = FichaAPIDataCollector(subject)
+    return collector.collect_all(), collector.get_missing_data_report()
+
+
+def _collect_proyecto_api(case):
+    subject_id, problem_statement_id = case
+    subject = proyecto_api_subjects(Subject.objects.all()).get(pk=subject_id)
+    statement = proyecto_api_problem_statements(ProblemStatement.objects.all()).get(pk=problem_statement_id)
+    collector = ProyectoAPIDataCollector(subject, statement)
+    return collector.collect_all(), collector.get_missing_data_report()
+
+
+def _render_phases(template_key, data, engine, repeat):
+    """Mejor tiempo de (carga, llenado, guardado) de una exportación ya cargada en cache."""
+    template_path = get_template_path(template_key)
+    mapping_path = get_mapping_path(template_key)
+    if engine == "patch":
+        load, (template, mapping) = _best(
+            lambda: (get_xlsx_template(template_path), get_compiled_mapping(template_path, mapping_path)), repeat
+        )
+        values = [(coord, data.get(field, "")) for field, coord in mapping]
+        fill, sheet = _best(lambda: template.patch_sheet(values), repeat)
+        save, _ = _best(lambda: template.package(sheet), repeat)
+        return load, fill, save
+
+    load, (_, mapping) = _best(
+        lambda: (get_template_workbook(template_path), get_compiled_mapping(template_path, mapping_path)), repeat
+    )
+    fill_times, save_times = [], []
+    for _ in range(repeat):
+        # Cada llenado necesita una copia nueva de la plantilla
+        wb = get_template_workbook(template_path)
+        ws = wb.active
+        started = time.perf_counter()
+        for field, coord in mapping:
+            _set_value_safe(ws, coord, data.get(field, ""))
+        fill_times.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        wb.save(io.BytesIO())
+        save_times.append(time.perf_counter() - started)
+    return load, min(fill_times), min(save_times)
+
+
+def _cold_load(template_key, engine):
+    clear_template_cache()
+    template_path = get_template_path(template_key)
+    started = time.perf_counter()
+    if engine == "patch":
+        get_xlsx_template(template_path)
+    else:
+        get_template_workbook(template_path)
+    get_compiled_mapping(template_path, get_mapping_path(template_key))
+    return time.perf_counter() - started
+
+
+def _peak_memory(collect, case, template_key, engine):
+    """Pico (bytes) de una exportación completa con la plantilla ya en cache."""
+    render_xlsx(template_key, collect(case)[0], engine=engine)
+    tracemalloc.start()
+    try:
+        render_xlsx(template_key, collect(case)[0], engine=engine)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = "Benchmark Excel exports on maxed-out synthetic subjects; fail on query/time/memory regressions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subjects", type=int, default=20, help="Synthetic subjects to create (default 20).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per timing; the best is reported.")
+        parser.add_argument("--max-ms", type=float, default=100.0,
+                            help="Max mean ms of a whole export with EXPORT_XLSX_ENGINE (default 100).")
+        parser.add_argument("--max-peak-kb", type=int, default=4096,
+                            help="Max peak KiB of a whole export with EXPORT_XLSX_ENGINE (default 4096).")
+
+    def handle(self, *args, **options):
+        if options["subjects"] < 1:
+            raise CommandError("--subjects must be at least 1")
+        self.failures = []
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            clear_template_cache()
+
+        for failure in self.failures:
+            self.stdout.write(self.style.ERROR(failure))
+        if self.failures:
+            raise CommandError(f"{len(self.failures)} threshold(s) exceeded")
+        self.stdout.write(self.style.SUCCESS("All exports within thresholds"))
+
+    def _run(self, options):
+        repeat = max(1, options["repeat"])
+        configured = getattr(settings, "EXPORT_XLSX_ENGINE", "patch")
+        subject_ids = _create_synthetic(options["subjects"])
+        statements = list(
+            ProblemStatement.objects.filter(subject_id__in=subject_ids).order_by("pk").values_list("subject_id", "pk")
+        )
+        templates = (
+            ("ficha-api", _collect_ficha_api, subject_ids, FICHA_API_QUERY_BUDGET),
+            ("proyecto-api", _collect_proyecto_api, statements[:len(subject_ids)], PROYECTO_API_QUERY_BUDGET),
+        )
+
+        header = (
+            f"{'template':<13} {'engine':<9} {'collect ms':>10} {'queries':>8} {'cold load':>10} "
+            f"{'load ms':>8} {'fill ms':>8} {'save ms':>8} {'total ms':>9} {'peak KiB':>9} {'missing':>8}"
+        )
+        self.stdout.write(f"{len(subject_ids)} synthetic subjects, best of {repeat}")
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for template_key, collect, cases, budget in templates:
+            collect_times, query_counts, collected = [], [], []
+            for case in cases:
+                with CaptureQueriesContext(connection) as queries:
+                    elapsed, result = _best(lambda: collect(case), 1)
+                collect_times.append(elapsed)
+                query_counts.append(len(queries))
+                collected.append(result)
+            collect_ms = statistics.mean(collect_times) * 1000
+            max_queries = max(query_counts)
+            max_missing = max(len(missing) for _, missing in collected)
+            if max_queries > budget:
+                self.failures.append(f"{template_key}: {max_queries} queries > budget {budget}")
+
+            for engine in ENGINES:
+                cold_ms = _cold_load(template_key, engine) * 1000
+                phases = [_render_phases(template_key, data, engine, repeat) for data, _ in collected]
+                load_ms, fill_ms, save_ms = (statistics.mean(values) * 1000 for values in zip(*phases))
+                total_ms = collect_ms + load_ms + fill_ms + save_ms
+                peak_kb = _peak_memory(collect, cases[0], template_key, engine) // 1024
+                self._row(template_key, engine, collect_ms, max_queries, cold_ms, load_ms, fill_ms, save_ms,
+                          total_ms, peak_kb, max_missing)
+                if engine == configured:
+                    if total_ms > options["max_ms"]:
+                        self.failures.append(f"{template_key}/{engine}: {total_ms:.1f} ms > {options['max_ms']} ms")
+                    if peak_kb > options["max_peak_kb"]:
+                        self.failures.append(f"{template_key}/{engine}: {peak_kb} KiB > {options['max_peak_kb']} KiB")
+
+    def _row(self, template_key, engine, collect_ms, queries, cold_ms, load_ms, fill_ms, save_ms, total_ms, peak_kb, missing):
+        self.stdout.write(
+            f"{template_key:<13} {engine:<9} {collect_ms:>10.2f} {queries:>8} {cold_ms:>10.1f} "
+            f"{load_ms:>8.2f} {fill_ms:>8.2f} {save_ms:>8.2f} {total_ms:>9.2f} {peak_kb:>9} {missing:>8}"
+        )
@@ -0,0 +1,88 @@
+"""
+Checks that loading and collecting an export stays within its query budget.
+
+The data collectors only read prefetched data, so an export costs a fixed
+number of queries however many units, competencies, counterparts, problem
+statements or contacts a subject has (``FICHA_API_QUERY_BUDGET`` /
+``PROYECTO_API_QUERY_BUDGET``). This loads every subject / problem statement
+(up to ``--limit``, busiest first) the way the export views do, collects its
+data and fails if any export ran more queries than the budget.
+
+    python manage.py check_export_queries --limit 50
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from companies.models import ProblemStatement
+from exports_app.data_collectors import (
+    FICHA_API_QUERY_BUDGET,
+    PROYECTO_API_QUERY_BUDGET,
+    FichaAPIDataCollector,
+    ProyectoAPIDataCollector,
+    ficha_api_subjects,
+    proyecto_api_problem_statements,
+    proyecto_api_subjects,
+)
+from subjects.models import Subject
+
+
+def count_ficha_api_queries(subject_id):
+    with CaptureQueriesContext(connection) as queries:
+        subject = ficha_api_subjects(Subject.objects.all()).get(pk=subject_id)
+        FichaAPIDataCollector(subject).collect_all()
+    return len(queries)
+
+
+def count_proyecto_api_queries(subject_id, problem_statement_id):
+    with CaptureQueriesContext(connection) as queries:
+        subject = proyecto_api_subjects(Subject.objects.all()).get(pk=subject_id)
+        statement = proyecto_api_problem_statements(ProblemStatement.objects.all()).get(
+            pk=problem_statement_id, subject_id=subject_id
+        )
+        ProyectoAPIDataCollector(subject, statement).collect_all()
+    return len(queries)
+
+
+class Command(BaseCommand):
+    help = "Fail if a Ficha API / Proyecto API export runs more queries than its budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Subjects/problem statements per template (default 50).")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        subject_ids = (
+            Subject.objects.annotate(rows=Count("units", distinct=True) + Count("problem_statements", distinct=True))
+            .order_by("-rows", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+        statements = (
+            ProblemStatement.objects.annotate(contacts=Count("company__counterpart_contacts"))
+            .order_by("-contacts", "pk")
+            .values_list("subject_id", "pk")[:limit]
+        )
+        cases = [
+            ("ficha-api", FICHA_API_QUERY_BUDGET, [(f"subject {pk}", count_ficha_api_queries(pk)) for pk in subject_ids]),
+            (
+                "proyecto-api",
+                PROYECTO_API_QUERY_BUDGET,
+                [(f"problem statement {pk}", count_proyecto_api_queries(subject_id, pk)) for subject_id, pk in statements],
+            ),
+        ]
+
+        over = []
+        for template, budget, results in cases:
+            if not results:
+                self.stdout.write(f"{template:<14} no data")
+                continue
+            worst = max(count for _, count in results)
+            self.stdout.write(f"{template:<14} {len(results):>4} exports  max {worst} queries  (budget {budget})")
+            over.extend((template, label, count, budget) for label, count in results if count > budget)
+
+        for template, label, count, budget in over:
+            self.stdout.write(self.style.ERROR(f"{template:<14} {label}: {count} queries > {budget}"))
+        if over:
+            raise CommandError(f"{len(over)} export(s) over the query budget")
+        self.stdout.write(self.style.SUCCESS("All exports within the query budget"))
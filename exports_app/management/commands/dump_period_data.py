@@ -0,0 +1,59 @@
+"""
+Writes the analytics tables of a period (exports_app.tabular) to files, e.g.
+for a nightly dump:
+
+    python manage.py dump_period_data --period O-2025 --format parquet --output-dir /srv/dumps
+
+Creates ``<output-dir>/<table>_<season><year>.<format>`` per table, streaming
+rows in chunks, so memory does not grow with the period size. Covers every
+subject of the period (no per-user scoping).
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exports_app.tabular import TABLES, TABULAR_CHUNK_SIZE, available_formats, iter_table
+from subjects.models import Subject
+from subjects.utils import parse_period_string
+
+
+class Command(BaseCommand):
+    help = "Dump a period's subjects, units, competencies, counterparts, problem statements and progress as CSV/Arrow/Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", required=True, help="Period as O-2025 / P-2025.")
+        parser.add_argument("--format", default="csv", choices=("csv", "arrow", "parquet"))
+        parser.add_argument("--output-dir", default=".")
+        parser.add_argument("--tables", nargs="*", choices=sorted(TABLES), help="Tables to dump (default: all).")
+        parser.add_argument("--area", type=int)
+        parser.add_argument("--career", type=int)
+        parser.add_argument("--chunk-size", type=int, default=TABULAR_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        season, year = parse_period_string(options["period"])
+        if not (season and year):
+            raise CommandError("--period must look like O-2025")
+        file_format = options["format"]
+        if file_format not in available_formats():
+            raise CommandError(f"Format {file_format!r} needs pyarrow; available: {', '.join(available_formats())}")
+
+        subjects = Subject.objects.filter(period_season=season, period_year=year)
+        for param in ("area", "career"):
+            if options[param] is not None:
+                subjects = subjects.filter(**{f"{param}_id": options[param]})
+
+        output_dir = options["output_dir"]
+        os.makedirs(output_dir, exist_ok=True)
+        for table in options["tables"] or TABLES:
+            path = os.path.join(output_dir, f"{table}_{season}{year}.{file_format}")
+            started = time.perf_counter()
+            # Write to a temporary name so a nightly reader never sees a half-written file
+            partial = f"{path}.partial"
+            with open(partial, "wb") as handle:
+                for chunk in iter_table(table, subjects, file_format, chunk_size=options["chunk_size"]):
+                    handle.write(chunk)
+            os.replace(partial, path)
+            self.stdout.write(
+                f"{path}  {os.path.getsize(path):>10} bytes  {(time.perf_counter() - started) * 1000:8.1f} ms"
+            )
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:13
+
+import django.db.models.deletion
+import exports_app.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('companies', '0002_problemstatement'),
+        ('subjects', '0006_subject_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template', models.CharField(choices=[('ficha-api', 'Ficha API'), ('proyecto-api', 'Ficha Proyecto API'), ('ficha-api-period', 'Fichas API del período (zip)')], max_length=32)),
+                ('period_year', models.PositiveIntegerField(blank=True, null=True)),
+                ('period_season', models.CharField(blank=True, max_length=1)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('dedupe_key', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('done', 'Terminado'), ('error', 'Error')], default='pending', max_length=10)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to=exports_app.models._export_upload_to)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('missing_data', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('problem_statement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='companies.problemstatement')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='subjects.subject')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
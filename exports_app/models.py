@@ -1,3 +1,61 @@
+import secrets
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+def _export_upload_to(instance, filename):
+    # Carpeta aleatoria: MEDIA_URL no debe permitir adivinar archivos de otros
+    return f"exports/{secrets.token_hex(16)}/{filename}"
+
+
+class ExportJob(models.Model):
+    """Exportación generada en segundo plano (Celery) y guardada en MEDIA_ROOT hasta ``expires_at``."""
+
+    TEMPLATE_CHOICES = (
+        ("ficha-api", "Ficha API"),
+        ("proyecto-api", "Ficha Proyecto API"),
+        ("ficha-api-period", "Fichas API del período (zip)"),
+    )
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_ERROR = "error"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pendiente"),
+        (STATUS_RUNNING, "En proceso"),
+        (STATUS_DONE, "Terminado"),
+        (STATUS_ERROR, "Error"),
+    )
+
+    template = models.CharField(max_length=32, choices=TEMPLATE_CHOICES)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="export_jobs"
+    )
+    subject = models.ForeignKey(
+        "subjects.Subject", on_delete=models.CASCADE, null=True, blank=True, related_name="export_jobs"
+    )
+    problem_statement = models.ForeignKey(
+        "companies.ProblemStatement", on_delete=models.CASCADE, null=True, blank=True, related_name="export_jobs"
+    )
+    period_year = models.PositiveIntegerField(null=True, blank=True)
+    period_season = models.CharField(max_length=1, blank=True)
+    filters = models.JSONField(default=dict, blank=True)
+    # Hash de (plantilla, objetivo, versión de los datos): trabajos iguales se reutilizan
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to=_export_upload_to, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    missing_data = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self):
+        return f"{self.template} #{self.pk} ({self.status})"
@@ -0,0 +1,84 @@
+"""
+Cache por proceso de exportaciones ya generadas.
+
+Una ficha depende solo de los datos de su asignatura, cuya versión lleva
+``versions.py`` (renovada por las señales de ``signals.py``). El resultado de
+``build_ficha_api``/``build_proyecto_api`` se guarda bajo
+``(plantilla, asignatura, problemática, versión, firma de la plantilla)``;
+mientras la versión no cambie, repetir la descarga no toca la base de datos ni
+la plantilla. La firma (``template_files_signature`` del ``.xlsx`` y su mapeo)
+cambia al reemplazar la plantilla en disco. La clave también da el ``ETag``
+de la respuesta, así que el navegador puede revalidar con ``If-None-Match`` y
+recibir 304.
+
+Las entradas viven en un LRU acotado en bytes (``EXPORT_RENDER_CACHE_BYTES``,
+0 lo desactiva). Una versión nueva deja las entradas viejas sin uso hasta que
+el LRU las saca; nunca se borran a mano.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+
+from .services import get_mapping_path, get_template_path
+from .template_cache import template_files_signature
+from .versions import get_subject_data_version
+
+
+_lock = threading.Lock()
+# clave -> (contenido, nombre de archivo, datos faltantes)
+_entries = OrderedDict()
+_size = 0
+
+
+def _max_bytes():
+    return int(getattr(settings, 'EXPORT_RENDER_CACHE_BYTES', 32 * 1024 * 1024) or 0)
+
+
+def rendered_export_key(template, subject_id, problem_statement_id=None):
+    parts = [
+        template, subject_id, problem_statement_id, repr(get_subject_data_version(subject_id)),
+        template_files_signature(get_template_path(template), get_mapping_path(template)),
+    ]
+    if template == 'ficha-api':
+        # La Ficha API lleva el mes y año actuales
+        parts.append(datetime.now().strftime('%Y-%m'))
+    return '|'.join(str(part) for part in parts)
+
+
+def rendered_export_etag(key):
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_rendered_export(key):
+    with _lock:
+        result = _entries.get(key)
+        if result is not None:
+            _entries.move_to_end(key)
+        return result
+
+
+def put_rendered_export(key, result):
+    global _size
+    size = len(result[0])
+    max_bytes = _max_bytes()
+    if size > max_bytes:
+        return
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _size -= len(previous[0])
+        _entries[key] = result
+        _size += size
+        while _size > max_bytes:
+            _, evicted = _entries.popitem(last=False)
+            _size -= len(evicted[0])
+
+
+def clear_rendered_exports():
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
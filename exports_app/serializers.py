@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from .jobs import export_job_download_url
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id',
+            'template',
+            'status',
+            'progress',
+            'total',
+            'subject',
+            'problem_statement',
+            'period_year',
+            'period_season',
+            'filters',
+            'filename',
+            'missing_data',
+            'error',
+            'created_at',
+            'finished_at',
+            'expires_at',
+            'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.STATUS_DONE:
+            return None
+        return export_job_download_url(obj)
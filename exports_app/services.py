@@ -1,50 +1,61 @@
 """
 Servicios para exportar datos a Excel usando plantillas.
 """
-from openpyxl import load_workbook
-from openpyxl.cell.cell import MergedCell
-import json
+import io
+import logging
+from django.conf import settings
 from django.http import HttpResponse
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from .data_collectors import FichaAPIDataCollector, ProyectoAPIDataCollector
+from .template_cache import get_compiled_mapping, get_template_workbook, get_xlsx_template
+from .xlsx_patch import XlsxPatchUnsupported
 
 
-def _normalize_coord(coord: str) -> str:
-    """
-    Accept a single cell (e.g. "C5") or a range (e.g. "C5:D5").
-    Return the top-left coordinate (e.g. "C5").
-    """
-    if not coord:
-        return coord
-    coord = str(coord).strip()
-    if ":" in coord:
-        start, _ = coord.split(":", 1)
-        return start.strip()
-    return coord
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 
 def _set_value_safe(ws, coord: str, value):
-    """Set value in a cell, handling merged cells correctly."""
-    coord = _normalize_coord(coord)
-    if not coord:
-        return
-        
+    """
+    Set value in a cell. ``coord`` is already the anchor of its merged range
+    (see template_cache.get_compiled_mapping), so this is a direct assignment.
+    """
     try:
-        cell = ws[coord]
-        # If targeting a merged cell that is not the top-left anchor, redirect
-        if isinstance(cell, MergedCell):
-            for rng in ws.merged_cells.ranges:
-                if coord in rng:
-                    anchor = ws.cell(row=rng.min_row, column=rng.min_col)
-                    anchor.value = value
-                    return
-            # If not found in ranges (edge case), just skip silently
-            return
-        cell.value = value
+        ws[coord].value = value
     except Exception as e:
         # Log error but don't fail the entire export
-        print(f"Error setting value at {coord}: {e}")
+        logger.warning("No se pudo escribir la celda %s: %s", coord, e)
+
+
+def render_xlsx(template_key: str, data: Dict[str, Any], engine: str = None) -> bytes:
+    """
+    Llena la plantilla ``template_key`` con ``data`` según su mapeo JSON y
+    retorna el ``.xlsx``. ``engine`` ('patch' u 'openpyxl', por defecto
+    ``EXPORT_XLSX_ENGINE``) elige el motor; si 'patch' no puede escribir la
+    plantilla o algún valor se usa openpyxl.
+    """
+    template_path = get_template_path(template_key)
+    cell_mapping = get_compiled_mapping(template_path, get_mapping_path(template_key))
+    engine = engine or getattr(settings, 'EXPORT_XLSX_ENGINE', 'patch')
+
+    if engine == 'patch':
+        try:
+            return get_xlsx_template(template_path).render(
+                (cell_coord, data.get(field_key, '')) for field_key, cell_coord in cell_mapping
+            )
+        except XlsxPatchUnsupported as exc:
+            logger.warning("Exportación %s con openpyxl: %s", template_key, exc)
+
+    # Copia de la plantilla Excel (parseada una vez por proceso)
+    wb = get_template_workbook(template_path)
+    ws = wb.active
+    for field_key, cell_coord in cell_mapping:
+        _set_value_safe(ws, cell_coord, data.get(field_key, ''))
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
 
 
 def export_ficha_api(subject) -> HttpResponse:
@@ -60,47 +71,7 @@ def export_ficha_api(subject) -> HttpResponse:
     NOTA: Este sistema SIEMPRE genera un Excel válido, incluso si faltan datos.
     Los campos faltantes se rellenan con cadenas vacías.
     """
-    # 1. Obtener ruta de plantilla y mapeo
-    template_path = get_template_path('ficha-api')
-    mapping_path = get_mapping_path('ficha-api')
-    
-    # 2. Cargar plantilla Excel
-    wb = load_workbook(filename=template_path)
-    ws = wb.active
-    
-    # 3. Recolectar datos de la base de datos
-    collector = FichaAPIDataCollector(subject)
-    data = collector.collect_all()
-    
-    # 4. Cargar mapeo JSON
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        cell_mapping = json.load(f)
-    
-    # 5. Llenar celdas según el mapeo
-    for field_key, cell_coord in cell_mapping.items():
-        value = data.get(field_key, '')
-        _set_value_safe(ws, cell_coord, value)
-    
-    # 6. Preparar respuesta HTTP
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    filename = f"Ficha_API_{subject.code}_{subject.period_season}{subject.period_year}.xlsx"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    # 7. Agregar información sobre datos faltantes en headers
-    missing_data = collector.get_missing_data_report()
-    if missing_data:
-        response['X-Export-Status'] = 'partial'
-        response['X-Missing-Data-Count'] = str(len(missing_data))
-        # Opcional: agregar lista de datos faltantes (limitado por tamaño de header)
-        # response['X-Missing-Data'] = '; '.join(missing_data[:3])
-    else:
-        response['X-Export-Status'] = 'complete'
-    
-    # 8. Guardar y retornar
-    wb.save(response)
-    return response
+    return xlsx_response(*build_ficha_api(subject))
 
 
 def get_template_path(template_key: str) -> str:
@@ -141,44 +112,44 @@ def export_proyecto_api(subject, problem_statement) -> HttpResponse:
     NOTA: Este sistema SIEMPRE genera un Excel válido, incluso si faltan datos.
     Los campos faltantes se rellenan con cadenas vacías.
     """
-    # 1. Obtener ruta de plantilla y mapeo
-    template_path = get_template_path('proyecto-api')
-    mapping_path = get_mapping_path('proyecto-api')
-    
-    # 2. Cargar plantilla Excel
-    wb = load_workbook(filename=template_path)
-    ws = wb.active
+    return xlsx_response(*build_proyecto_api(subject, problem_statement))
+
+
+def build_ficha_api(subject) -> Tuple[bytes, str, List[str]]:
+    """Genera la Ficha API: ``(contenido, nombre de archivo, datos faltantes)``."""
+    # 1. Recolectar datos de la base de datos
+    collector = FichaAPIDataCollector(subject)
+    data = collector.collect_all()
     
-    # 3. Recolectar datos de la base de datos
+    # 2. Llenar la plantilla según el mapeo JSON (ver render_xlsx)
+    content = render_xlsx('ficha-api', data)
+    filename = f"Ficha_API_{subject.code}_{subject.period_season}{subject.period_year}.xlsx"
+    return content, filename, collector.get_missing_data_report()
+
+
+def build_proyecto_api(subject, problem_statement) -> Tuple[bytes, str, List[str]]:
+    """Genera la Ficha Proyecto API: ``(contenido, nombre de archivo, datos faltantes)``."""
+    # 1. Recolectar datos de la base de datos
     collector = ProyectoAPIDataCollector(subject, problem_statement)
     data = collector.collect_all()
     
-    # 4. Cargar mapeo JSON
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        cell_mapping = json.load(f)
-    
-    # 5. Llenar celdas según el mapeo
-    for field_key, cell_coord in cell_mapping.items():
-        value = data.get(field_key, '')
-        _set_value_safe(ws, cell_coord, value)
-    
-    # 6. Preparar respuesta HTTP
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    # 2. Llenar la plantilla según el mapeo JSON (ver render_xlsx)
+    content = render_xlsx('proyecto-api', data)
     # Incluir información de la empresa en el nombre del archivo
     company_name = problem_statement.company.name.replace(' ', '_').replace('/', '_')[:30]
     filename = f"Proyecto_API_{subject.code}_{subject.section}_{company_name}.xlsx"
+    return content, filename, collector.get_missing_data_report()
+
+
+def xlsx_response(content: bytes, filename: str, missing_data: List[str]) -> HttpResponse:
+    response = HttpResponse(content, content_type=XLSX_CONTENT_TYPE)
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     
-    # 7. Agregar información sobre datos faltantes en headers
-    missing_data = collector.get_missing_data_report()
+    # Agregar información sobre datos faltantes en headers
+    # El frontend puede leer esto para mostrar una advertencia
     if missing_data:
         response['X-Export-Status'] = 'partial'
         response['X-Missing-Data-Count'] = str(len(missing_data))
     else:
         response['X-Export-Status'] = 'complete'
-    
-    # 8. Guardar y retornar
-    wb.save(response)
     return response
@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from companies.models import Company, CounterpartContact, ProblemStatement
+from subjects.models import (
+    Api3Alternance,
+    ApiType2Completion,
+    ApiType3Completion,
+    Area,
+    CompanyBoundaryCondition,
+    CompanyEngagementScope,
+    InteractionType,
+    PossibleCounterpart,
+    SemesterLevel,
+    Subject,
+    SubjectTechnicalCompetency,
+    SubjectUnit,
+)
+
+from .versions import bump_subject_data_versions
+
+
+def _company_subject_ids(company_id):
+    """Asignaturas cuyas fichas muestran la empresa (problemáticas o posibles contrapartes)."""
+    ids = set(ProblemStatement.objects.filter(company_id=company_id).values_list('subject_id', flat=True))
+    ids.update(PossibleCounterpart.objects.filter(company_id=company_id).values_list('subject_id', flat=True))
+    return ids
+
+
+def _interaction_type_subject_ids(interaction_type_id):
+    return set(
+        PossibleCounterpart.objects.filter(interaction_types=interaction_type_id).values_list('subject_id', flat=True)
+    )
+
+
+# modelo -> función que da las asignaturas afectadas por una instancia
+_AFFECTED_SUBJECTS = {
+    Subject: lambda instance: {instance.pk},
+    SubjectUnit: lambda instance: {instance.subject_id},
+    SubjectTechnicalCompetency: lambda instance: {instance.subject_id},
+    CompanyBoundaryCondition: lambda instance: {instance.subject_id},
+    Api3Alternance: lambda instance: {instance.subject_id},
+    ApiType2Completion: lambda instance: {instance.subject_id},
+    ApiType3Completion: lambda instance: {instance.subject_id},
+    CompanyEngagementScope: lambda instance: {instance.subject_id},
+    PossibleCounterpart: lambda instance: {instance.subject_id},
+    ProblemStatement: lambda instance: {instance.subject_id},
+    Company: lambda instance: _company_subject_ids(instance.pk),
+    CounterpartContact: lambda instance: _company_subject_ids(instance.company_id),
+    Area: lambda instance: set(Subject.objects.filter(area_id=instance.pk).values_list('id', flat=True)),
+    SemesterLevel: lambda instance: set(Subject.objects.filter(semester_id=instance.pk).values_list('id', flat=True)),
+    InteractionType: lambda instance: _interaction_type_subject_ids(instance.pk),
+}
+
+# modelo -> (campo dueño, asignaturas del dueño): al mover el registro a otra
+# asignatura/empresa también cambia la ficha del dueño anterior
+_PREVIOUS_OWNER = {
+    PossibleCounterpart: ('subject_id', lambda subject_id: {subject_id}),
+    ProblemStatement: ('subject_id', lambda subject_id: {subject_id}),
+    CounterpartContact: ('company_id', _company_subject_ids),
+}
+
+
+def _bump_after_commit(subject_ids):
+    # Tras el commit: antes, una exportación concurrente podría leer los datos
+    # viejos y guardarlos en cache con la versión nueva
+    if subject_ids:
+        transaction.on_commit(lambda: bump_subject_data_versions(subject_ids))
+
+
+def _remember_previous_owner(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    field, owner_subjects = _PREVIOUS_OWNER[sender]
+    previous = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+    if previous is not None and previous != getattr(instance, field):
+        instance._export_previous_subjects = owner_subjects(previous)
+
+
+def _remember_interaction_type_subjects(sender, instance, **kwargs):
+    # En post_delete las filas intermedias ya no existen
+    instance._export_previous_subjects = _interaction_type_subject_ids(instance.pk)
+
+
+def _data_changed(sender, instance, **kwargs):
+    subject_ids = _AFFECTED_SUBJECTS[sender](instance)
+    subject_ids |= instance.__dict__.pop('_export_previous_subjects', set())
+    _bump_after_commit(subject_ids)
+
+
+def _interaction_types_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # counterpart.interaction_types.add/remove/clear()
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _bump_after_commit({instance.subject_id})
+        return
+    # interaction_type.possible_counterparts...: pk_set son contrapartes
+    if action == 'pre_clear':
+        # En post_clear pk_set es None
+        instance._export_cleared_subjects = _interaction_type_subject_ids(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        _bump_after_commit(set(
+            PossibleCounterpart.objects.filter(pk__in=pk_set).values_list('subject_id', flat=True)
+        ))
+    elif action == 'post_clear':
+        _bump_after_commit(instance.__dict__.pop('_export_cleared_subjects', set()))
+
+
+for _model in _AFFECTED_SUBJECTS:
+    post_save.connect(_data_changed, sender=_model, dispatch_uid=f'export-version:{_model._meta.label_lower}:save')
+    post_delete.connect(_data_changed, sender=_model, dispatch_uid=f'export-version:{_model._meta.label_lower}:delete')
+for _model in _PREVIOUS_OWNER:
+    pre_save.connect(_remember_previous_owner, sender=_model, dispatch_uid=f'export-version:{_model._meta.label_lower}:owner')
+pre_delete.connect(
+    _remember_interaction_type_subjects, sender=InteractionType, dispatch_uid='export-version:interactiontype:pre-delete'
+)
+m2m_changed.connect(
+    _interaction_types_changed,
+    sender=PossibleCounterpart.interaction_types.through,
+    dispatch_uid='export-version:possiblecounterpart:interaction_types',
+)
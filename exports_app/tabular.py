@@ -0,0 +1,268 @@
+"""
+Exportación tabular de un período para análisis (CSV, Arrow, Parquet).
+
+Cada tabla (``TABLES``) es plana y lleva ``subject_id`` para unirla con
+``subjects``: asignaturas, unidades, competencias, posibles contrapartes (y
+sus tipos de interacción), problemáticas y avance de fases. Las filas se leen
+con ``values_list`` por bloques de ``TABULAR_CHUNK_SIZE`` ordenados por pk
+(keyset: ``pk > último``) y cada bloque se escribe y entrega de inmediato, así
+que la memoria no depende del tamaño del período. No se usa
+``iterator(chunk_size=...)``: con MySQL Django no tiene cursores del lado del
+servidor y el driver cargaría el resultado completo.
+
+Arrow (stream IPC) y Parquet necesitan ``pyarrow``; sin él solo hay CSV.
+Los tipos de cada columna salen del campo del modelo.
+"""
+import csv
+import io
+
+from django.db import models
+
+from companies.models import ProblemStatement
+from subjects.models import (
+    PossibleCounterpart,
+    Subject,
+    SubjectPhaseProgress,
+    SubjectTechnicalCompetency,
+    SubjectUnit,
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+
+TABULAR_CHUNK_SIZE = 2000
+TABULAR_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+_InteractionTypes = PossibleCounterpart.interaction_types.through
+
+# tabla -> (modelo, ruta hasta Subject ('' para Subject), ((columna, lookup), ...))
+TABLES = {
+    'subjects': (Subject, '', (
+        ('subject_id', 'pk'),
+        ('code', 'code'),
+        ('section', 'section'),
+        ('name', 'name'),
+        ('period_season', 'period_season'),
+        ('period_year', 'period_year'),
+        ('campus', 'campus'),
+        ('shift', 'shift'),
+        ('phase', 'phase'),
+        ('api_type', 'api_type'),
+        ('hours', 'hours'),
+        ('total_students', 'total_students'),
+        ('area_id', 'area_id'),
+        ('area', 'area__name'),
+        ('career_id', 'career_id'),
+        ('career', 'career__name'),
+        ('semester', 'semester__name'),
+        ('teacher_id', 'teacher_id'),
+    )),
+    'units': (SubjectUnit, 'subject', (
+        ('subject_id', 'subject_id'),
+        ('number', 'number'),
+        ('expected_learning', 'expected_learning'),
+        ('unit_hours', 'unit_hours'),
+        ('activities_description', 'activities_description'),
+        ('evaluation_evidence', 'evaluation_evidence'),
+        ('evidence_detail', 'evidence_detail'),
+        ('counterpart_link', 'counterpart_link'),
+        ('place_mode_type', 'place_mode_type'),
+    )),
+    'competencies': (SubjectTechnicalCompetency, 'subject', (
+        ('subject_id', 'subject_id'),
+        ('number', 'number'),
+        ('description', 'description'),
+    )),
+    'counterparts': (PossibleCounterpart, 'subject', (
+        ('subject_id', 'subject_id'),
+        ('counterpart_id', 'pk'),
+        ('company_id', 'company_id'),
+        ('company', 'company__name'),
+        ('sector', 'sector'),
+        ('worked_before', 'worked_before'),
+        ('interest_collaborate', 'interest_collaborate'),
+        ('can_develop_activities', 'can_develop_activities'),
+        ('willing_design_project', 'willing_design_project'),
+        ('has_guide', 'has_guide'),
+        ('can_receive_alternance', 'can_receive_alternance'),
+        ('alternance_students_quota', 'alternance_students_quota'),
+    )),
+    'counterpart_interaction_types': (_InteractionTypes, 'possiblecounterpart__subject', (
+        ('subject_id', 'possiblecounterpart__subject_id'),
+        ('counterpart_id', 'possiblecounterpart_id'),
+        ('interaction_type', 'interactiontype__code'),
+        ('interaction_type_label', 'interactiontype__label'),
+    )),
+    'problem_statements': (ProblemStatement, 'subject', (
+        ('subject_id', 'subject_id'),
+        ('problem_statement_id', 'pk'),
+        ('company_id', 'company_id'),
+        ('company', 'company__name'),
+        ('company_sector', 'company__sector'),
+        ('company_employees_count', 'company__employees_count'),
+        ('problem_to_address', 'problem_to_address'),
+        ('why_important', 'why_important'),
+        ('stakeholders', 'stakeholders'),
+        ('related_area', 'related_area'),
+        ('benefits_short_medium_long_term', 'benefits_short_medium_long_term'),
+        ('problem_definition', 'problem_definition'),
+    )),
+    'phase_progress': (SubjectPhaseProgress, 'subject', (
+        ('subject_id', 'subject_id'),
+        ('phase', 'phase'),
+        ('status', 'status'),
+        ('updated_at', 'updated_at'),
+        ('notes', 'notes'),
+    )),
+}
+
+
+def available_formats():
+    return ('csv', 'arrow', 'parquet') if pyarrow is not None else ('csv',)
+
+
+def table_columns(table):
+    return [column for column, _ in TABLES[table][2]]
+
+
+def _table_queryset(table, subjects):
+    model, subject_path, _ = TABLES[table]
+    if not subject_path:
+        return subjects
+    return model.objects.filter(**{f'{subject_path}__in': subjects.values('pk')})
+
+
+def iter_table_rows(table, subjects, chunk_size=TABULAR_CHUNK_SIZE):
+    """Bloques (listas de tuplas) de la tabla para las asignaturas ``subjects``."""
+    lookups = [lookup for _, lookup in TABLES[table][2]]
+    queryset = _table_queryset(table, subjects).order_by('pk').values_list('pk', *lookups)
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < chunk_size:
+            return
+
+
+class _ByteSink:
+    """Archivo de solo escritura que acumula lo escrito hasta ``take()``."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_csv(table, subjects, chunk_size):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(table_columns(table))
+    yield text.getvalue().encode('utf-8')
+    for rows in iter_table_rows(table, subjects, chunk_size):
+        text.seek(0)
+        text.truncate()
+        writer.writerows(rows)
+        yield text.getvalue().encode('utf-8')
+
+
+def _resolve_field(model, lookup):
+    if lookup == 'pk':
+        return model._meta.pk
+    *path, name = lookup.split('__')
+    for part in path:
+        model = model._meta.get_field(part).related_model
+    field = model._meta.get_field(name)
+    while field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _arrow_type(field):
+    if isinstance(field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pyarrow.int64()
+    if isinstance(field, (models.FloatField, models.DecimalField)):
+        return pyarrow.float64()
+    if isinstance(field, models.DateTimeField):
+        return pyarrow.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def arrow_schema(table):
+    model, _, columns = TABLES[table]
+    return pyarrow.schema([
+        pyarrow.field(column, _arrow_type(_resolve_field(model, lookup))) for column, lookup in columns
+    ])
+
+
+def _iter_arrow(table, subjects, chunk_size, file_format):
+    schema = arrow_schema(table)
+    sink = _ByteSink()
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+    try:
+        for rows in iter_table_rows(table, subjects, chunk_size):
+            # Un row group / record batch por bloque
+            columns = [list(values) for values in zip(*rows)]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_table(table, subjects, file_format='csv', chunk_size=TABULAR_CHUNK_SIZE):
+    """
+    Genera por partes la tabla ``table`` de las asignaturas ``subjects``
+    (queryset) en ``file_format`` ('csv', 'arrow' o 'parquet').
+    """
+    if table not in TABLES:
+        raise ValueError(f"Tabla desconocida: {table}")
+    if file_format not in available_formats():
+        raise ValueError(f"Formato no disponible: {file_format}")
+    if file_format == 'csv':
+        return _iter_csv(table, subjects, chunk_size)
+    return _iter_arrow(table, subjects, chunk_size, file_format)
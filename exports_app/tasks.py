@@ -0,0 +1,99 @@
+import logging
+import tempfile
+import time
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from companies.models import ProblemStatement
+from subjects.models import Subject
+
+from .bulk import iter_ficha_api_zip, period_subjects
+from .data_collectors import ficha_api_subjects, proyecto_api_problem_statements, proyecto_api_subjects
+from .jobs import export_job_ttl, publish_export_progress, purge_expired_export_jobs
+from .models import ExportJob
+from .services import build_ficha_api, build_proyecto_api
+
+
+logger = logging.getLogger(__name__)
+
+# Publicar avance a lo más cada este intervalo (segundos) en exportaciones por período
+PROGRESS_INTERVAL = 1.0
+
+
+def _build_single(job):
+    if job.template == 'ficha-api':
+        return build_ficha_api(ficha_api_subjects(Subject.objects.all()).get(pk=job.subject_id))
+    subject = proyecto_api_subjects(Subject.objects.all()).get(pk=job.subject_id)
+    problem_statement = proyecto_api_problem_statements(ProblemStatement.objects.all()).get(
+        pk=job.problem_statement_id, subject_id=job.subject_id
+    )
+    return build_proyecto_api(subject, problem_statement)
+
+
+def _build_period_zip(job, target):
+    """Escribe el zip del período en ``target`` publicando el avance."""
+    period = f"{job.period_season}-{job.period_year}"
+    subjects = period_subjects(job.period_season, job.period_year, job.filters, job.requested_by)
+    job.total = subjects.count()
+    job.save(update_fields=['total'])
+    publish_export_progress(job)
+
+    last_publish = time.monotonic()
+    # Sin pool: los procesos del worker de Celery no pueden crear procesos hijos
+    for chunk in iter_ficha_api_zip(subjects, period=period, filters=job.filters, workers=0):
+        target.write(chunk)
+        # Una parte por ficha y una final con manifest.json
+        job.progress = min(job.progress + 1, job.total)
+        if time.monotonic() - last_publish >= PROGRESS_INTERVAL:
+            job.save(update_fields=['progress'])
+            publish_export_progress(job)
+            last_publish = time.monotonic()
+
+
+@shared_task
+def run_export_job(job_id: int):
+    # Reclamar el trabajo: una entrega repetida de la tarea no lo ejecuta dos veces
+    if not ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_PENDING).update(
+        status=ExportJob.STATUS_RUNNING
+    ):
+        return
+    job = ExportJob.objects.select_related('requested_by').get(pk=job_id)
+    publish_export_progress(job)
+
+    try:
+        if job.template == 'ficha-api-period':
+            job.filename = f"Fichas_API_{job.period_season}{job.period_year}.zip"
+            with tempfile.TemporaryFile() as tmp:
+                _build_period_zip(job, tmp)
+                tmp.seek(0)
+                job.file.save(job.filename, File(tmp), save=False)
+        else:
+            content, filename, missing_data = _build_single(job)
+            job.filename = filename
+            job.missing_data = missing_data
+            job.total = job.progress = 1
+            job.file.save(filename, ContentFile(content), save=False)
+    except Exception as exc:
+        logger.exception("Falló el trabajo de exportación %s", job_id)
+        job.status = ExportJob.STATUS_ERROR
+        job.error = str(exc)
+        job.finished_at = timezone.now()
+        job.expires_at = job.finished_at + export_job_ttl()
+        job.save()
+        publish_export_progress(job)
+        return
+
+    job.status = ExportJob.STATUS_DONE
+    job.progress = job.total
+    job.finished_at = timezone.now()
+    job.expires_at = job.finished_at + export_job_ttl()
+    job.save()
+    publish_export_progress(job)
+
+
+@shared_task
+def purge_export_jobs():
+    return purge_expired_export_jobs()
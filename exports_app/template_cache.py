@@ -0,0 +1,138 @@
+"""
+Cache por proceso de las plantillas Excel y sus mapeos de celdas.
+
+``load_workbook`` sobre la plantilla era la mayor parte del costo de cada
+exportación. Aquí cada plantilla se parsea una sola vez por proceso y se
+guarda serializada con ``pickle``; cada petición recibe una copia
+independiente (``pickle.loads`` es ~15x más rápido que volver a leer el
+xlsx). ``copy.deepcopy`` no sirve: la copia comparte índices de estilos y
+falla al guardar.
+
+El mapeo JSON también se compila una vez por plantilla
+(``get_compiled_mapping``): cada celda o rango queda resuelto a la celda ancla
+que recibe el valor, así llenar la plantilla son asignaciones directas sin
+recorrer los rangos combinados de la hoja.
+
+Las entradas se validan contra ``(st_mtime_ns, st_size)`` de sus archivos, así
+que reemplazar una plantilla o un JSON de mapeo en disco se nota en la
+siguiente exportación sin reiniciar el proceso.
+"""
+import json
+import os
+import pickle
+import threading
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+
+from .xlsx_patch import XlsxTemplate
+
+
+_lock = threading.RLock()
+_workbooks = {}  # path -> (signature, pickled workbook)
+_mappings = {}  # path -> (signature, dict)
+_xlsx_templates = {}  # path -> (signature, XlsxTemplate)
+_compiled_mappings = {}  # (template path, mapping path) -> (signature, tuple)
+
+
+def _signature(paths):
+    return tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, paths))
+
+
+def _cached(store, key, build):
+    """``build(key)`` cacheado en ``store``; ``key`` es una ruta o una tupla de rutas."""
+    signature = _signature(key if isinstance(key, tuple) else (key,))
+    entry = store.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with _lock:
+        entry = store.get(key)
+        if entry is None or entry[0] != signature:
+            entry = (signature, build(key))
+            store[key] = entry
+        return entry[1]
+
+
+def _pickle_workbook(path):
+    return pickle.dumps(load_workbook(filename=path), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_mapping(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _normalize_coord(coord):
+    """
+    Accept a single cell (e.g. "C5") or a range (e.g. "C5:D5").
+    Return the top-left coordinate (e.g. "C5").
+    """
+    if not coord:
+        return coord
+    coord = str(coord).strip()
+    if ":" in coord:
+        start, _ = coord.split(":", 1)
+        return start.strip()
+    return coord
+
+
+def merged_anchor_map(ranges):
+    """``{celda: celda_ancla}`` de las celdas no-ancla de los rangos combinados."""
+    anchors = {}
+    for ref in ranges:
+        min_col, min_row, max_col, max_row = range_boundaries(str(ref))
+        anchor = f'{get_column_letter(min_col)}{min_row}'
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                coord = f'{get_column_letter(col)}{row}'
+                if coord != anchor:
+                    anchors[coord] = anchor
+    return anchors
+
+
+def _compile_mapping(paths):
+    template_path, mapping_path = paths
+    ws = get_template_workbook(template_path).active
+    anchors = merged_anchor_map(ws.merged_cells.ranges)
+    compiled = []
+    for field_key, cell_coord in get_cell_mapping(mapping_path).items():
+        coord = _normalize_coord(cell_coord)
+        if coord:
+            compiled.append((field_key, anchors.get(coord, coord)))
+    return tuple(compiled)
+
+
+def get_template_workbook(path):
+    """Copia nueva (editable) de la plantilla ``path``."""
+    return pickle.loads(_cached(_workbooks, path, _pickle_workbook))
+
+
+def get_xlsx_template(path):
+    """``XlsxTemplate`` de ``path`` para el motor que parcha el XML."""
+    return _cached(_xlsx_templates, path, XlsxTemplate)
+
+
+def get_cell_mapping(path):
+    """Mapeo ``{campo: celda}`` de ``path``; compartido entre peticiones, no modificar."""
+    return _cached(_mappings, path, _read_mapping)
+
+
+def get_compiled_mapping(template_path, mapping_path):
+    """
+    ``((campo, celda), ...)`` del mapeo ``mapping_path`` sobre la hoja activa de
+    ``template_path``, con cada celda resuelta a su ancla si está combinada.
+    """
+    return _cached(_compiled_mappings, (template_path, mapping_path), _compile_mapping)
+
+
+def template_files_signature(*paths):
+    """Firma ``(st_mtime_ns, st_size)`` de los archivos; cambia al reemplazar cualquiera."""
+    return _signature(paths)
+
+
+def clear_template_cache():
+    with _lock:
+        _workbooks.clear()
+        _mappings.clear()
+        _xlsx_templates.clear()
+        _compiled_mappings.clear()
@@ -1,3 +1,116 @@
 from django.test import TestCase
 
-# Create your tests here.
+from companies.models import Company, CounterpartContact, ProblemStatement
+from subjects.models import (
+    Api3Alternance,
+    ApiType2Completion,
+    ApiType3Completion,
+    Area,
+    CompanyBoundaryCondition,
+    CompanyEngagementScope,
+    InteractionType,
+    PossibleCounterpart,
+    SemesterLevel,
+    Subject,
+    SubjectTechnicalCompetency,
+    SubjectUnit,
+)
+
+from .data_collectors import (
+    FICHA_API_QUERY_BUDGET,
+    PROYECTO_API_QUERY_BUDGET,
+    ficha_api_subjects,
+    proyecto_api_problem_statements,
+    proyecto_api_subjects,
+)
+from .services import build_ficha_api, build_proyecto_api
+
+
+TEXT = "Texto de prueba"
+
+
+class ExportQueryBudgetTests(TestCase):
+    """Una exportación cuesta un número fijo de consultas aunque todas las tablas estén llenas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        area = Area.objects.create(name="Área de prueba")
+        semester = SemesterLevel.objects.create(name="Prueba")
+        interaction_types = [
+            InteractionType.objects.create(code=f"tipo-{idx}", label=f"Tipo {idx}") for idx in range(2)
+        ]
+        cls.subject = Subject.objects.create(
+            code="TEST-001", name="Asignatura de prueba", period_year=2025, period_season="O",
+            hours=72, total_students=40, api_type=2, area=area, semester=semester,
+        )
+        companies = [
+            Company.objects.create(
+                name=f"Empresa {idx}", address="Dirección", email=f"empresa{idx}@example.com",
+                phone="123", employees_count=100, sector="Tecnología",
+            )
+            for idx in range(4)
+        ]
+        for company in companies:
+            for idx in range(4):
+                CounterpartContact.objects.create(
+                    company=company, name=f"Contacto {idx}", rut="1-9", phone="123",
+                    email=f"contacto{idx}@example.com", counterpart_area="Operaciones", role="Jefe",
+                )
+            counterpart = PossibleCounterpart.objects.create(
+                subject=cls.subject, company=company, sector="Tecnología", worked_before=True,
+                interest_collaborate=True, can_develop_activities=True, willing_design_project=True,
+                has_guide=True, can_receive_alternance=True, alternance_students_quota=2,
+            )
+            counterpart.interaction_types.set(interaction_types)
+            ProblemStatement.objects.create(
+                subject=cls.subject, company=company, problem_to_address=TEXT, why_important=TEXT,
+                stakeholders=TEXT, related_area=TEXT, benefits_short_medium_long_term=TEXT,
+                problem_definition=TEXT,
+            )
+        for number in range(1, 5):
+            SubjectUnit.objects.create(
+                subject=cls.subject, number=number, expected_learning=TEXT, unit_hours=18,
+                activities_description=TEXT, evaluation_evidence=TEXT, evidence_detail=TEXT,
+                counterpart_link=TEXT, place_mode_type="Presencial",
+            )
+        for number in range(1, 6):
+            SubjectTechnicalCompetency.objects.create(subject=cls.subject, number=number, description=TEXT)
+        CompanyBoundaryCondition.objects.create(
+            subject=cls.subject, large_company=True, medium_company=False, small_company=False,
+            family_enterprise=False, not_relevant=False, company_type_description=TEXT,
+            company_requirements_for_level_2_3=TEXT, project_minimum_elements=TEXT,
+        )
+        ApiType2Completion.objects.create(
+            subject=cls.subject, project_goal_students=TEXT, deliverables_at_end=TEXT,
+            company_expected_participation=TEXT, other_activities=TEXT,
+        )
+        ApiType3Completion.objects.create(
+            subject=cls.subject, project_goal_students=TEXT, deliverables_at_end=TEXT,
+            expected_student_role=TEXT, other_activities=TEXT, master_guide_expected_support=TEXT,
+        )
+        Api3Alternance.objects.create(
+            subject=cls.subject, student_role="Practicante", students_quota=4, tutor_name="Tutor",
+            tutor_email="tutor@example.com", alternance_hours=120,
+        )
+        CompanyEngagementScope.objects.create(
+            subject=cls.subject, benefits_from_student=TEXT, has_value_or_research_project=True,
+            time_availability_and_participation=TEXT, workplace_has_conditions_for_group=True,
+            meeting_schedule_availability=TEXT,
+        )
+        cls.problem_statement = ProblemStatement.objects.filter(subject=cls.subject).order_by('pk').first()
+
+    def test_ficha_api_export_query_budget(self):
+        with self.assertNumQueries(FICHA_API_QUERY_BUDGET):
+            subject = ficha_api_subjects(Subject.objects.filter(pk=self.subject.pk)).get()
+            content, _, missing = build_ficha_api(subject)
+        self.assertTrue(content)
+        self.assertEqual(missing, [])
+
+    def test_proyecto_api_export_query_budget(self):
+        with self.assertNumQueries(PROYECTO_API_QUERY_BUDGET):
+            subject = proyecto_api_subjects(Subject.objects.filter(pk=self.subject.pk)).get()
+            problem_statement = proyecto_api_problem_statements(
+                ProblemStatement.objects.filter(pk=self.problem_statement.pk)
+            ).get()
+            content, _, _ = build_proyecto_api(subject, problem_statement)
+        self.assertTrue(content)
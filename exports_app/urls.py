@@ -2,11 +2,26 @@
 URLs para la app de exportaciones.
 """
 from django.urls import path
-from .views import export_ficha_api_view, export_proyecto_api_view
+from .views import (
+    export_ficha_api_view,
+    export_job_create_view,
+    export_job_detail_view,
+    export_job_download_view,
+    export_period_ficha_api_view,
+    export_period_table_view,
+    export_period_tables_view,
+    export_proyecto_api_view,
+)
 
 app_name = 'exports'
 
 urlpatterns = [
     path('exports/subjects/<int:subject_id>/ficha-api/', export_ficha_api_view, name='export_ficha_api'),
     path('exports/subjects/<int:subject_id>/proyecto-api/<int:problem_statement_id>/', export_proyecto_api_view, name='export_proyecto_api'),
-]
\ No newline at end of file
+    path('exports/periods/<str:period>/ficha-api/', export_period_ficha_api_view, name='export_period_ficha_api'),
+    path('exports/periods/<str:period>/data/', export_period_tables_view, name='export_period_tables'),
+    path('exports/periods/<str:period>/data/<str:table>.<str:file_format>', export_period_table_view, name='export_period_table'),
+    path('exports/jobs/', export_job_create_view, name='export_job_create'),
+    path('exports/jobs/<int:job_id>/', export_job_detail_view, name='export_job_detail'),
+    path('exports/jobs/<int:job_id>/download/', export_job_download_view, name='export_job_download'),
+]
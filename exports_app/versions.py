@@ -0,0 +1,52 @@
+"""
+Versión de los datos exportables de cada asignatura.
+
+Cada asignatura tiene una clave en el cache de Django con el instante de su
+último cambio; las señales de ``exports_app.signals`` la actualizan al
+guardar/borrar la asignatura o cualquiera de los registros que leen los data
+collectors (unidades, competencias, contrapartes, problemáticas, contactos,
+completaciones, alternancia...). Dos exportaciones con la misma versión
+producen la misma ficha, lo que permite deduplicar trabajos y reutilizar
+archivos ya generados.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+SUBJECT_DATA_VERSION_KEY = "exports:subject-data-version:{subject_id}"
+
+
+def _key(subject_id):
+    return SUBJECT_DATA_VERSION_KEY.format(subject_id=subject_id)
+
+
+def bump_subject_data_versions(subject_ids):
+    """Marca como cambiados los datos de ``subject_ids``."""
+    subject_ids = {subject_id for subject_id in subject_ids if subject_id}
+    if not subject_ids:
+        return
+    now = time.time()
+    try:
+        cache.set_many({_key(subject_id): now for subject_id in subject_ids}, None)
+    except Exception:
+        logger.warning("No se pudo actualizar la versión de datos de %s", sorted(subject_ids), exc_info=True)
+
+
+def get_subject_data_versions(subject_ids):
+    """``{subject_id: versión}``; inicializa las que no existen."""
+    keys = {_key(subject_id): subject_id for subject_id in set(subject_ids)}
+    found = cache.get_many(list(keys))
+    now = time.time()
+    for key in keys.keys() - found.keys():
+        # Primera vez (o desalojada): versión nueva para no reutilizar resultados viejos
+        cache.add(key, now, None)
+        found[key] = cache.get(key, now)
+    return {keys[key]: found[key] for key in keys}
+
+
+def get_subject_data_version(subject_id):
+    return get_subject_data_versions([subject_id])[subject_id]
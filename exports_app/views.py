@@ -1,13 +1,91 @@
 """
 Vistas para exportar datos a diferentes formatos.
 """
+import logging
+
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import quote_etag
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from api_backend.caching import etag_matches
+from companies.models import ProblemStatement
 from subjects.models import Subject
-from .services import export_ficha_api, export_proyecto_api
+from subjects.utils import parse_period_string
+from users.access import get_access_profile
+from .bulk import EXPORT_FULL_ACCESS_ROLES, iter_ficha_api_zip, period_subjects
+from .data_collectors import ficha_api_subjects, proyecto_api_problem_statements, proyecto_api_subjects
+from .jobs import export_job_dedupe_key, get_or_create_export_job
+from .models import ExportJob
+from .render_cache import get_rendered_export, put_rendered_export, rendered_export_etag, rendered_export_key
+from .serializers import ExportJobSerializer
+from .services import build_ficha_api, build_proyecto_api, xlsx_response
+from .tabular import TABLES, TABULAR_CONTENT_TYPES, available_formats, iter_table, table_columns
+
+
+logger = logging.getLogger(__name__)
+
+
+def _can_export_subject(user, subject):
+    """El docente de la asignatura, staff o roles 'ADMIN', 'VCM', 'COORD', 'DC' o 'DAC'."""
+    is_teacher = subject.teacher_id is not None and subject.teacher_id == user.id
+    is_admin = user.is_staff or user.is_superuser
+    is_vcm = getattr(user, 'role', None) in ['VCM', 'ADMIN', 'COORD', 'DC', 'DAC']
+    return is_teacher or is_admin or is_vcm
+
+
+def _cached_xlsx_response(request, template, subject_id, problem_statement_id, build):
+    """
+    Respuesta Excel servida desde ``render_cache`` si la asignatura no cambió
+    (``build`` solo se llama si no está), con ``ETag`` y 304 ante ``If-None-Match``.
+    """
+    try:
+        key = rendered_export_key(template, subject_id, problem_statement_id)
+    except Exception:
+        logger.warning("Cache no disponible; se exporta sin ETag", exc_info=True)
+        return xlsx_response(*build())
+
+    etag = rendered_export_etag(key)
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = quote_etag(etag)
+        return response
+
+    result = get_rendered_export(key)
+    cache_status = 'hit'
+    if result is None:
+        result = build()
+        put_rendered_export(key, result)
+        cache_status = 'miss'
+    response = xlsx_response(*result)
+    response['ETag'] = quote_etag(etag)
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Export-Cache'] = cache_status
+    return response
+
+
+def _parse_period_filters(period, params):
+    """``(season, year, filters, None)`` o ``(None, None, None, Response 400)``."""
+    season, year = parse_period_string(period or '')
+    if not (season and year):
+        return None, None, None, Response(
+            {'detail': 'period debe tener formato O-2025.'}, status=status.HTTP_400_BAD_REQUEST
+        )
+    filters = {}
+    for param in ('area', 'career'):
+        value = params.get(param)
+        if value in (None, ''):
+            continue
+        value = str(value)
+        if not value.isdigit():
+            return None, None, None, Response(
+                {'detail': f'{param} debe ser numérico.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        filters[param] = int(value)
+    return season, year, filters, None
 
 
 @api_view(['GET'])
@@ -24,43 +102,27 @@ def export_ficha_api_view(request, subject_id: int):
     
     NOTA: El sistema SIEMPRE genera un Excel válido, incluso si faltan datos.
     Los datos faltantes se llenan con cadenas vacías.
+    
+    Mientras los datos de la asignatura no cambien, la ficha se sirve desde
+    cache (``X-Export-Cache: hit``) y ``If-None-Match`` con el ``ETag`` da 304.
     """
-    # Obtener la asignatura con todos los datos relacionados
-    subject = get_object_or_404(
-        Subject.objects.select_related(
-            'area', 'career', 'semester', 'teacher'
-        ).prefetch_related(
-            'technical_competencies',
-            'possible_counterparts__company',
-            'possible_counterparts__interaction_types',
-            'problem_statements__company',
-            'problem_statements__company__counterpart_contacts',
-            'units',
-        ),
-        id=subject_id
-    )
+    subject = get_object_or_404(Subject.objects.only('id', 'teacher_id'), id=subject_id)
     
     # Verificar permisos
-    user = request.user
-    is_teacher = subject.teacher and subject.teacher.id == user.id
-    is_admin = user.is_staff or user.is_superuser
-    is_vcm = getattr(user, 'role', None) in ['VCM', 'ADMIN', 'COORD', 'DC', 'DAC']
-    
-    if not (is_teacher or is_admin or is_vcm):
+    if not _can_export_subject(request.user, subject):
         return Response(
             {'detail': 'No tienes permisos para exportar esta asignatura.'},
             status=status.HTTP_403_FORBIDDEN
         )
     
+    def build():
+        # Asignatura con todos los datos relacionados (consultas fijas)
+        return build_ficha_api(ficha_api_subjects(Subject.objects.all()).get(pk=subject.pk))
+    
     # Generar y retornar el archivo Excel
+    # (X-Export-Status: 'partial' si faltan datos, 'complete' si todo está)
     try:
-        response = export_ficha_api(subject)
-        
-        # Agregar header informativo sobre datos faltantes (opcional)
-        # El frontend puede leer esto para mostrar una advertencia
-        # response['X-Export-Status'] = 'partial' si faltan datos, 'complete' si todo está
-        
-        return response
+        return _cached_xlsx_response(request, 'ficha-api', subject.pk, None, build)
     except Exception as e:
         return Response(
             {'detail': f'Error al generar el archivo: {str(e)}'},
@@ -83,46 +145,256 @@ def export_proyecto_api_view(request, subject_id: int, problem_statement_id: int
     NOTA: El sistema SIEMPRE genera un Excel válido, incluso si faltan datos.
     Los datos faltantes se llenan con cadenas vacías.
     """
-    # Obtener la asignatura con todos los datos relacionados
-    subject = get_object_or_404(
-        Subject.objects.select_related(
-            'area', 'career', 'semester', 'teacher'
-        ).prefetch_related(
-            'problem_statements__company',
-            'problem_statements__company__counterpart_contacts',
-            'units',
-        ),
-        id=subject_id
-    )
+    subject = get_object_or_404(Subject.objects.only('id', 'teacher_id'), id=subject_id)
     
-    # Obtener el problem_statement específico
-    from companies.models import ProblemStatement
-    problem_statement = get_object_or_404(
-        ProblemStatement.objects.select_related('company').prefetch_related(
-            'company__counterpart_contacts'
-        ),
-        id=problem_statement_id,
-        subject_id=subject_id
-    )
+    # Verificar que el problem_statement sea de la asignatura
+    get_object_or_404(ProblemStatement.objects.only('id'), id=problem_statement_id, subject_id=subject_id)
     
     # Verificar permisos
-    user = request.user
-    is_teacher = subject.teacher and subject.teacher.id == user.id
-    is_admin = user.is_staff or user.is_superuser
-    is_vcm = getattr(user, 'role', None) in ['VCM', 'ADMIN', 'COORD', 'DC', 'DAC']
-    
-    if not (is_teacher or is_admin or is_vcm):
+    if not _can_export_subject(request.user, subject):
         return Response(
             {'detail': 'No tienes permisos para exportar esta asignatura.'},
             status=status.HTTP_403_FORBIDDEN
         )
     
+    def build():
+        # Asignatura y problemática con todos los datos relacionados (consultas fijas)
+        full_subject = proyecto_api_subjects(Subject.objects.all()).get(pk=subject.pk)
+        problem_statement = proyecto_api_problem_statements(ProblemStatement.objects.all()).get(pk=problem_statement_id)
+        return build_proyecto_api(full_subject, problem_statement)
+    
     # Generar y retornar el archivo Excel
     try:
-        response = export_proyecto_api(subject, problem_statement)
-        return response
+        return _cached_xlsx_response(request, 'proyecto-api', subject.pk, problem_statement_id, build)
     except Exception as e:
         return Response(
             {'detail': f'Error al generar el archivo: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_period_ficha_api_view(request, period: str):
+    """
+    Exporta en un zip las Fichas API de todas las asignaturas de un período.
+    
+    GET /api/exports/periods/<period>/ficha-api/?area=<id>&career=<id>
+    
+    - ``period`` con formato O-2025 / P-2025.
+    - ``area`` y ``career`` (opcionales) filtran las asignaturas.
+    - El zip incluye ``manifest.json`` con el estado y los datos faltantes de cada ficha.
+    
+    Permisos:
+    - Roles 'ADMIN', 'VCM', 'COORD', 'DAC' o staff: todas las asignaturas
+    - Director de carrera ('DC'): las de su área/carrera
+    - Docentes: sus asignaturas
+    """
+    season, year, filters, error = _parse_period_filters(period, request.query_params)
+    if error is not None:
+        return error
+
+    subjects = period_subjects(season, year, filters, request.user)
+    if not subjects.exists():
+        return Response(
+            {'detail': 'No hay asignaturas para exportar en ese período.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    response = StreamingHttpResponse(
+        iter_ficha_api_zip(subjects, period=f"{season}-{year}", filters=filters),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="Fichas_API_{season}{year}.zip"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_period_tables_view(request, period: str):
+    """
+    Tablas disponibles para la exportación tabular de un período.
+    
+    GET /api/exports/periods/<period>/data/
+    """
+    season, year, _, error = _parse_period_filters(period, {})
+    if error is not None:
+        return error
+    return Response({
+        'period': f"{season}-{year}",
+        'formats': list(available_formats()),
+        'tables': {table: table_columns(table) for table in TABLES},
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_period_table_view(request, period: str, table: str, file_format: str):
+    """
+    Exporta una tabla plana del período para análisis, transmitida por bloques.
+    
+    GET /api/exports/periods/<period>/data/<table>.<csv|arrow|parquet>?area=<id>&career=<id>
+    
+    - ``table``: subjects, units, competencies, counterparts,
+      counterpart_interaction_types, problem_statements o phase_progress
+      (todas con ``subject_id`` para unirlas).
+    - ``arrow`` y ``parquet`` requieren ``pyarrow`` en el servidor.
+    
+    Permisos: los mismos del zip por período (cada usuario ve sus asignaturas).
+    """
+    if table not in TABLES:
+        return Response({'detail': f'Tabla desconocida: {table}.'}, status=status.HTTP_404_NOT_FOUND)
+    if file_format not in available_formats():
+        return Response(
+            {'detail': f'Formato no disponible: {file_format}. Disponibles: {", ".join(available_formats())}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    season, year, filters, error = _parse_period_filters(period, request.query_params)
+    if error is not None:
+        return error
+
+    subjects = period_subjects(season, year, filters, request.user)
+    response = StreamingHttpResponse(
+        iter_table(table, subjects, file_format), content_type=TABULAR_CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{table}_{season}{year}.{file_format}"'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def export_job_create_view(request):
+    """
+    Encola una exportación en segundo plano (Celery).
+    
+    POST /api/exports/jobs/
+    
+    Body:
+    - ``{"template": "ficha-api", "subject_id": 1}``
+    - ``{"template": "proyecto-api", "subject_id": 1, "problem_statement_id": 2}``
+    - ``{"template": "ficha-api-period", "period": "O-2025", "area": 1, "career": 2}``
+    
+    Responde 202 con el trabajo. Si ya hay uno igual en curso, o un archivo
+    vigente generado con la misma versión de los datos, se devuelve ese
+    (``"reused": true``). El avance se publica como evento
+    ``export_progress`` en /api/subjects/stream/; al terminar,
+    ``download_url`` apunta a /api/exports/jobs/<id>/download/.
+    
+    Permisos: los mismos de la exportación directa de cada plantilla.
+    """
+    user = request.user
+    data = request.data
+    template = data.get('template')
+    fields = {'template': template, 'requested_by': user}
+
+    if template in ('ficha-api', 'proyecto-api'):
+        subject_id = data.get('subject_id')
+        if not str(subject_id or '').isdigit():
+            return Response({'detail': 'subject_id es requerido.'}, status=status.HTTP_400_BAD_REQUEST)
+        subject = get_object_or_404(Subject.objects.only('id', 'teacher_id'), id=int(subject_id))
+        if not _can_export_subject(user, subject):
+            return Response(
+                {'detail': 'No tienes permisos para exportar esta asignatura.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        fields['subject'] = subject
+        target = {'subject_id': subject.pk}
+        if template == 'proyecto-api':
+            problem_statement_id = data.get('problem_statement_id')
+            if not str(problem_statement_id or '').isdigit():
+                return Response(
+                    {'detail': 'problem_statement_id es requerido.'}, status=status.HTTP_400_BAD_REQUEST
+                )
+            problem_statement = get_object_or_404(
+                ProblemStatement.objects.only('id'), id=int(problem_statement_id), subject_id=subject.pk
+            )
+            fields['problem_statement'] = problem_statement
+            target['problem_statement_id'] = problem_statement.pk
+        dedupe_key = export_job_dedupe_key(template, [subject.pk], **target)
+    elif template == 'ficha-api-period':
+        season, year, filters, error = _parse_period_filters(data.get('period'), data)
+        if error is not None:
+            return error
+        subject_ids = list(period_subjects(season, year, filters, user).values_list('pk', flat=True))
+        if not subject_ids:
+            return Response(
+                {'detail': 'No hay asignaturas para exportar en ese período.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        fields.update(period_season=season, period_year=year, filters=filters)
+        # El zip depende del alcance del usuario: solo se comparte entre usuarios que ven todo
+        scope = 'all' if get_access_profile(user).has_elevated_access(EXPORT_FULL_ACCESS_ROLES) else f'user:{user.pk}'
+        dedupe_key = export_job_dedupe_key(
+            template, subject_ids, scope=scope, period=f"{season}-{year}", filters=filters
+        )
+    else:
+        choices = ', '.join(value for value, _ in ExportJob.TEMPLATE_CHOICES)
+        return Response({'detail': f'template debe ser uno de: {choices}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    job, created = get_or_create_export_job(dedupe_key, **fields)
+    payload = dict(ExportJobSerializer(job).data, reused=not created)
+    return Response(payload, status=status.HTTP_202_ACCEPTED)
+
+
+def _get_job_for_user(user, job_id):
+    """El trabajo si ``user`` lo pidió o puede exportar su contenido; si no, None."""
+    job = get_object_or_404(ExportJob.objects.select_related('subject'), id=job_id)
+    if job.requested_by_id == user.id or user.is_staff or user.is_superuser:
+        return job
+    if job.subject is not None:
+        return job if _can_export_subject(user, job.subject) else None
+    # Zip por período: los usuarios que ven todas las asignaturas
+    return job if get_access_profile(user).has_elevated_access(EXPORT_FULL_ACCESS_ROLES) else None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_job_detail_view(request, job_id: int):
+    """
+    Estado de un trabajo de exportación.
+    
+    GET /api/exports/jobs/<job_id>/
+    """
+    job = _get_job_for_user(request.user, job_id)
+    if job is None:
+        return Response(
+            {'detail': 'No tienes permisos para ver esta exportación.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(ExportJobSerializer(job).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_job_download_view(request, job_id: int):
+    """
+    Descarga el archivo de un trabajo terminado.
+    
+    GET /api/exports/jobs/<job_id>/download/
+    
+    409 si aún no termina (o falló) y 410 si el archivo ya expiró.
+    """
+    job = _get_job_for_user(request.user, job_id)
+    if job is None:
+        return Response(
+            {'detail': 'No tienes permisos para descargar esta exportación.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if job.status != ExportJob.STATUS_DONE:
+        return Response(
+            {'detail': 'La exportación aún no está lista.', 'status': job.status},
+            status=status.HTTP_409_CONFLICT
+        )
+    if not job.file or (job.expires_at and job.expires_at <= timezone.now()):
+        return Response({'detail': 'La exportación expiró.'}, status=status.HTTP_410_GONE)
+    try:
+        handle = job.file.open('rb')
+    except FileNotFoundError:
+        return Response({'detail': 'La exportación expiró.'}, status=status.HTTP_410_GONE)
+    response = FileResponse(handle, as_attachment=True, filename=job.filename)
+    if job.subject_id is not None:
+        # Mismos headers que la exportación directa; el zip trae manifest.json
+        response['X-Export-Status'] = 'partial' if job.missing_data else 'complete'
+        if job.missing_data:
+            response['X-Missing-Data-Count'] = str(len(job.missing_data))
+    return response
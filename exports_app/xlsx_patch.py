@@ -0,0 +1,233 @@
+"""
+Motor de exportación que parcha celdas directamente en el XML de la plantilla.
+
+Una exportación es la plantilla con unos cientos de celdas cambiadas, pero
+``wb.save()`` de openpyxl vuelve a serializar el libro completo (estilos,
+temas, dibujos...). ``XlsxTemplate`` trata el ``.xlsx`` como un zip:
+
+- Todas las partes salvo la hoja activa se copian tal cual, con sus bytes
+  ya comprimidos (no se descomprimen ni recomprimen).
+- En la hoja activa solo se reemplazan los elementos ``<c>`` de las celdas
+  mapeadas (ya resueltas a su ancla por el mapeo compilado). Los textos se escriben como ``inlineStr`` (igual que openpyxl),
+  así ``sharedStrings.xml`` tampoco cambia.
+
+Los valores pasan por ``openpyxl.cell.Cell`` para inferir el tipo (número,
+texto, fórmula, booleano...) exactamente como en la ruta openpyxl. Lo que
+este motor no sabe escribir (fechas, texto enriquecido, celdas que no existen
+en la plantilla) levanta ``XlsxPatchUnsupported`` y ``services`` vuelve a
+openpyxl.
+
+``python manage.py compare_xlsx_engines`` verifica que ambas rutas producen
+las mismas celdas y compara tiempos.
+"""
+import logging
+import re
+import struct
+import zipfile
+import zlib
+from posixpath import dirname, join, normpath
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import Cell
+from openpyxl.compat import safe_string
+
+
+logger = logging.getLogger(__name__)
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_CELL_RE = re.compile(r'<c\s[^>]*?\br="([A-Z]+[0-9]+)"[^>]*?(?:/>|>.*?</c>)', re.DOTALL)
+_STYLE_RE = re.compile(r'\ss="([0-9]+)"')
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+_UTF8_FLAG = 0x800
+
+
+class XlsxPatchUnsupported(Exception):
+    """La plantilla o un valor no se pueden escribir parchando el XML."""
+
+
+_scratch_sheet = None
+
+
+def _bind(value):
+    """``(data_type, value)`` que openpyxl asignaría a ``value``."""
+    global _scratch_sheet
+    if _scratch_sheet is None:
+        _scratch_sheet = Workbook().active
+    cell = Cell(_scratch_sheet)
+    cell.value = value
+    return cell.data_type, cell._value
+
+
+def _text(value):
+    space = ' xml:space="preserve"' if value != value.strip() else ''
+    return f'<t{space}>{escape(value)}</t>'
+
+
+def _cell_xml(coord, style, value):
+    data_type, value = _bind(value)
+    attrs = f' r="{coord}"{style}'
+    if value is None or value == '':
+        return f'<c{attrs}/>'
+    if data_type == 's':
+        if not isinstance(value, str):
+            raise XlsxPatchUnsupported(f'{coord}: texto enriquecido')
+        return f'<c{attrs} t="inlineStr"><is>{_text(value)}</is></c>'
+    if data_type == 'f':
+        if not isinstance(value, str):
+            raise XlsxPatchUnsupported(f'{coord}: fórmula de arreglo/tabla')
+        return f'<c{attrs}><f>{escape(value[1:])}</f><v></v></c>'
+    if data_type in ('n', 'b', 'e'):
+        return f'<c{attrs} t="{data_type}"><v>{escape(safe_string(value))}</v></c>'
+    raise XlsxPatchUnsupported(f'{coord}: tipo {data_type!r} no soportado')
+
+
+def _active_sheet_part(archive):
+    """Ruta dentro del zip de la hoja que openpyxl usa como ``wb.active``."""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    view = workbook.find(f'{_MAIN_NS}bookViews/{_MAIN_NS}workbookView')
+    active = int(view.get('activeTab', 0)) if view is not None else 0
+    sheets = workbook.findall(f'{_MAIN_NS}sheets/{_MAIN_NS}sheet')
+    if not sheets:
+        raise XlsxPatchUnsupported('el libro no tiene hojas')
+    rel_id = sheets[min(active, len(sheets) - 1)].get(f'{_REL_NS}id')
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            return target.lstrip('/') if target.startswith('/') else normpath(join(dirname('xl/workbook.xml'), target))
+    raise XlsxPatchUnsupported(f'relación {rel_id} de la hoja activa no encontrada')
+
+
+class _Member:
+    """Una parte del zip con sus bytes comprimidos, lista para copiar."""
+    __slots__ = ('name', 'flags', 'method', 'dos_time', 'dos_date', 'crc', 'data', 'size', 'external_attr')
+
+    def __init__(self, info, data, crc=None, size=None, method=None):
+        self.name = info.filename.encode('utf-8')
+        self.flags = _UTF8_FLAG if any(byte > 0x7F for byte in self.name) else 0
+        self.method = info.compress_type if method is None else method
+        year, month, day, hour, minute, second = info.date_time
+        self.dos_time = (hour << 11) | (minute << 5) | (second // 2)
+        self.dos_date = ((year - 1980) << 9) | (month << 5) | day
+        self.crc = info.CRC if crc is None else crc
+        self.data = data
+        self.size = info.file_size if size is None else size
+        self.external_attr = info.external_attr
+
+    def local_header(self):
+        return _LOCAL_HEADER.pack(
+            0x04034B50, 20, self.flags, self.method, self.dos_time, self.dos_date,
+            self.crc, len(self.data), self.size, len(self.name), 0,
+        ) + self.name
+
+    def central_header(self, offset):
+        return _CENTRAL_HEADER.pack(
+            0x02014B50, 20, 20, self.flags, self.method, self.dos_time, self.dos_date,
+            self.crc, len(self.data), self.size, len(self.name), 0, 0, 0, 0,
+            self.external_attr, offset,
+        ) + self.name
+
+
+def _raw_data(fileobj, info):
+    """Bytes comprimidos de ``info`` tal como están en el zip."""
+    fileobj.seek(info.header_offset)
+    header = fileobj.read(_LOCAL_HEADER.size)
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    fileobj.seek(info.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+    return fileobj.read(info.compress_size)
+
+
+class XlsxTemplate:
+    """
+    Plantilla ``.xlsx`` preparada para generar copias con celdas reemplazadas.
+
+    Se construye una vez por proceso (ver ``template_cache.get_xlsx_template``);
+    ``render()`` no modifica el estado y puede usarse desde varios hilos.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fileobj, zipfile.ZipFile(fileobj) as archive:
+            self.sheet_part = _active_sheet_part(archive)
+            self.members = []
+            for info in archive.infolist():
+                if info.filename == self.sheet_part:
+                    self.sheet_info = info
+                    self.sheet_index = len(self.members)
+                    self.members.append(None)
+                    continue
+                if info.file_size >= 0xFFFFFFFF or info.compress_size >= 0xFFFFFFFF:
+                    raise XlsxPatchUnsupported(f'{info.filename}: zip64 no soportado')
+                self.members.append(_Member(info, _raw_data(fileobj, info)))
+            self.sheet_xml = archive.read(self.sheet_part).decode('utf-8')
+
+        # Posición y estilo de cada <c> de la hoja
+        self.cells = {}
+        for match in _CELL_RE.finditer(self.sheet_xml):
+            style = _STYLE_RE.search(match.group(0)[:match.group(0).find('>') + 1])
+            self.cells[match.group(1)] = (match.start(), match.end(), f' s="{style.group(1)}"' if style else '')
+
+    def render(self, values):
+        """
+        Retorna el ``.xlsx`` con ``values`` (iterable de ``(celda, valor)``,
+        celdas ancla de ``template_cache.get_compiled_mapping``) escritos en
+        la hoja activa. Si una celda se escribe dos veces gana la última, como
+        con openpyxl.
+        """
+        return self.package(self.patch_sheet(values))
+
+    def patch_sheet(self, values):
+        """XML (bytes) de la hoja activa con ``values`` escritos (ver ``render``)."""
+        patches = {}
+        for coord, value in values:
+            if coord not in self.cells:
+                raise XlsxPatchUnsupported(f'{coord}: la celda no existe en la plantilla')
+            try:
+                patches[coord] = _cell_xml(coord, self.cells[coord][2], value)
+            except XlsxPatchUnsupported:
+                raise
+            except Exception as e:
+                # Igual que _set_value_safe: se omite la celda sin fallar la exportación
+                logger.warning("No se pudo escribir la celda %s: %s", coord, e)
+
+        xml = self.sheet_xml
+        parts, position = [], 0
+        for start, end, xml_cell in sorted((self.cells[c][0], self.cells[c][1], x) for c, x in patches.items()):
+            parts.append(xml[position:start])
+            parts.append(xml_cell)
+            position = end
+        parts.append(xml[position:])
+        return ''.join(parts).encode('utf-8')
+
+    def package(self, sheet):
+        """El ``.xlsx``: las partes de la plantilla sin tocar más ``sheet`` como hoja activa."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        sheet_member = _Member(
+            self.sheet_info,
+            compressor.compress(sheet) + compressor.flush(),
+            crc=zlib.crc32(sheet),
+            size=len(sheet),
+            method=zipfile.ZIP_DEFLATED,
+        )
+        members = list(self.members)
+        members[self.sheet_index] = sheet_member
+
+        chunks, central, offset = [], [], 0
+        for member in members:
+            header = member.local_header()
+            central.append(member.central_header(offset))
+            chunks.append(header)
+            chunks.append(member.data)
+            offset += len(header) + len(member.data)
+        directory = b''.join(central)
+        chunks.append(directory)
+        chunks.append(_END_RECORD.pack(0x06054B50, 0, 0, len(members), len(members), len(directory), offset, 0))
+        return b''.join(chunks)
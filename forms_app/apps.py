@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FormsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'forms_app'
+
+    def ready(self):
+        # Import signals so they register on app startup
+        from . import signals  # noqa: F401
@@ -1,9 +1,10 @@
 from rest_framework.permissions import BasePermission
+from users.access import get_access_profile
 class IsFormOwnerOrCoordinator(BasePermission):
     def has_object_permission(self, request, view, obj):
         user = request.user
         if not user.is_authenticated:
             return False
-        if getattr(user, 'is_staff', False) or getattr(user, 'role', None) == 'VCM' or user.groups.filter(name__in=['vcm']).exists():
+        if get_access_profile(user).has_elevated_access(['VCM']):
             return True
         return obj.subject.teacher_id == user.id
@@ -0,0 +1,51 @@
+"""
+Validadores JSON Schema compilados de las plantillas de formulario.
+
+``jsonschema.validate`` revisa el schema contra el meta-schema y arma un
+validador nuevo en cada llamada; con el autoguardado eso ocurre en cada
+escritura de un ``FormInstance``. Aquí el validador se arma una vez por
+``(template.id, template.version)`` y se reutiliza en el proceso. Guardar o
+borrar un ``FormTemplate`` descarta sus validadores (``signals.py``); como la
+señal solo llega al proceso que guardó, la entrada además recuerda el schema
+con que se armó y se rehace si la plantilla cargada trae otro.
+"""
+import threading
+
+from jsonschema.validators import validator_for
+
+
+_lock = threading.Lock()
+# (template_id, version) -> (schema, validador)
+_validators = {}
+
+
+def get_template_validator(template):
+    """Validador compilado de ``template.schema``; ``SchemaError`` si el schema no es válido."""
+    key = (template.pk, template.version)
+    entry = _validators.get(key)
+    if entry is not None and entry[0] == template.schema:
+        return entry[1]
+
+    validator_class = validator_for(template.schema)
+    validator_class.check_schema(template.schema)
+    validator = validator_class(template.schema)
+    with _lock:
+        _validators[key] = (template.schema, validator)
+    return validator
+
+
+def iter_schema_errors(template, data):
+    """Todos los errores de ``data`` contra el schema de ``template``, en orden de ruta."""
+    errors = get_template_validator(template).iter_errors(data)
+    return sorted(errors, key=lambda error: [str(part) for part in error.absolute_path])
+
+
+def forget_template_validators(template_id):
+    with _lock:
+        for key in [key for key in _validators if key[0] == template_id]:
+            del _validators[key]
+
+
+def clear_template_validators():
+    with _lock:
+        _validators.clear()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from jsonschema import validate, ValidationError
+from jsonschema import SchemaError
 from .models import FormTemplate, FormInstance
+from .schema_validation import iter_schema_errors
 
 class FormTemplateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,9 +20,13 @@ class FormInstanceSerializer(serializers.ModelSerializer):
         template = attrs.get('template', getattr(self.instance, 'template', None))
         if template and template.schema:
             try:
-                validate(instance=data, schema=template.schema)
-            except ValidationError as e:
-                raise serializers.ValidationError({'data': f'JSON no cumple schema: {e.message}'})
+                errors = iter_schema_errors(template, data)
+            except SchemaError as e:
+                raise serializers.ValidationError({'template': f'El schema de la plantilla no es válido: {e.message}'})
+            if errors:
+                raise serializers.ValidationError({'data': [
+                    f"JSON no cumple schema en {e.json_path}: {e.message}" for e in errors
+                ]})
         return attrs
 
     def update(self, instance, validated_data):
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api_backend.caching import track_table_versions
+
+from .models import FormTemplate
+from .schema_validation import forget_template_validators
+
+
+# ETag/cache versions of the lookup tables (api_backend.caching)
+track_table_versions(FormTemplate)
+
+
+@receiver(post_save, sender=FormTemplate)
+@receiver(post_delete, sender=FormTemplate)
+def forget_compiled_schema(sender, instance, **kwargs):
+    forget_template_validators(instance.pk)
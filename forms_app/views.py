@@ -3,17 +3,21 @@ from django.shortcuts import render
 # Create your views here.
 from rest_framework import viewsets, permissions, decorators, response, status
 from django.shortcuts import get_object_or_404
+from api_backend.caching import ConditionalLookupMixin
+from users.access import get_access_profile
 from .models import FormTemplate, FormInstance
 from .serializers import FormTemplateSerializer, FormInstanceSerializer
 from .permissions import IsFormOwnerOrCoordinator
 
-class FormTemplateViewSet(viewsets.ModelViewSet):
+class FormTemplateViewSet(ConditionalLookupMixin, viewsets.ModelViewSet):
     queryset = FormTemplate.objects.all()
+    pagination_class = None
     serializer_class = FormTemplateSerializer
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
 
 class FormInstanceViewSet(viewsets.ModelViewSet):
     queryset = FormInstance.objects.select_related('subject','template')
+    ordering = ('subject_id', 'template_id')
     serializer_class = FormInstanceSerializer
     permission_classes = [permissions.IsAuthenticated, IsFormOwnerOrCoordinator]
 
@@ -26,7 +30,7 @@ class FormInstanceViewSet(viewsets.ModelViewSet):
             qs = qs.filter(subject__code=subject)
         if template:
             qs = qs.filter(template__key=template)
-        if getattr(user, 'is_staff', False) or getattr(user, 'role', None) == 'VCM' or user.groups.filter(name__in=['vcm']).exists():
+        if get_access_profile(user).has_elevated_access(['VCM']):
             return qs
         return qs.filter(subject__teacher=user)
 
@@ -41,7 +45,7 @@ class FormInstanceViewSet(viewsets.ModelViewSet):
 
     @decorators.action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
-        if not (request.user.is_staff or getattr(request.user, 'role', None) == 'VCM' or request.user.groups.filter(name__in=['vcm']).exists()):
+        if not get_access_profile(request.user).has_elevated_access(['VCM']):
             return response.Response({'detail': 'No autorizado.'}, status=403)
         obj = self.get_object()
         obj.status = 'approved'
@@ -1,13 +1,43 @@
 import asyncio
 import json
+import logging
+import os
+import socket
+import time
+import weakref
 from contextlib import contextmanager
 
 import redis
 import redis.asyncio as aioredis
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 
 
+logger = logging.getLogger(__name__)
+
 SUBJECT_EVENTS_CHANNEL = "subjects:events"
+# Opt-in channel carrying a per-subject version and the serialized changed fields
+SUBJECT_DELTA_EVENTS_CHANNEL = "subjects:events:delta"
+SUBJECT_VERSION_KEY = "subjects:version:{subject_id}"
+# Hash holding the latest metrics snapshot of every process (field = host:pid)
+SUBJECT_STREAM_METRICS_KEY = "subjects:stream:metrics"
+
+# Serialized fields that must be re-sent when a model attribute changes
+_DELTA_DEPENDENT_FIELDS = {
+    "teacher_id": ("teacher", "teacher_name"),
+    "area_id": ("area", "area_name"),
+    "career_id": ("career", "career_name"),
+    "semester_id": ("semester", "semester_name"),
+    "period_year": (
+        "period_year", "period_code", "phase_start_date", "phase_end_date",
+        "process_start_date", "process_end_date",
+    ),
+    "period_season": (
+        "period_season", "period_code", "phase_start_date", "phase_end_date",
+        "process_start_date", "process_end_date",
+    ),
+    "phase": ("phase", "phase_start_date", "phase_end_date"),
+}
 
 
 def _get_redis_client():
@@ -19,12 +49,141 @@ def _get_redis_url():
     return getattr(settings, "SUBJECT_STREAM_REDIS_URL", None) or settings.CELERY_BROKER_URL
 
 
-def publish_subject_event(event_type, subject):
+def _get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LatencySummary:
     """
-    Publish a small payload describing the change to a Subject instance.
+    Cumulative latency histogram (seconds), mergeable across processes.
     """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, seconds):
+        seconds = max(seconds, 0.0)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for idx, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.buckets[idx] += 1
+                return
+        self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "buckets": dict(zip([*map(str, self.BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+class SubjectStreamMetrics:
+    """
+    Per-process counters and gauges for the subject SSE stream.
+
+    Each process periodically stores its snapshot in Redis
+    (``SUBJECT_STREAM_METRICS_KEY``) so ``collect_stream_metrics`` can
+    aggregate every web/Celery worker.
+    """
+
+    COUNTERS = (
+        "connections_total",
+        "messages_in",
+        "messages_out",
+        "messages_dropped",
+        "keepalives_sent",
+        "events_published",
+        "publish_errors",
+    )
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.connections_active = 0
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.publish_latency = LatencySummary()
+        self.delivery_latency = LatencySummary()
+        self.last_report = 0.0
+
+    def queue_depth(self):
+        return sum(hub.queue_depth() for hubs in list(_event_hubs.values()) for hub in hubs.values())
+
+    def snapshot(self):
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data.update({
+            "connections_active": self.connections_active,
+            "queue_depth": self.queue_depth(),
+            "publish_latency": self.publish_latency.as_dict(),
+            "delivery_latency": self.delivery_latency.as_dict(),
+            "reported_at": time.time(),
+        })
+        return data
+
+    def add_report(self, pipe):
+        """Queue the snapshot write on a (sync or async) Redis pipeline."""
+        self.last_report = time.monotonic()
+        pipe.hset(SUBJECT_STREAM_METRICS_KEY, self.worker_id, json.dumps(self.snapshot()))
+        pipe.expire(SUBJECT_STREAM_METRICS_KEY, 24 * 3600)
+
+    def report_due(self):
+        interval = _get_setting("SUBJECT_STREAM_METRICS_INTERVAL", 15)
+        return time.monotonic() - self.last_report >= interval
+
+
+stream_metrics = SubjectStreamMetrics()
+
+
+def collect_stream_metrics():
+    """
+    Aggregate the snapshots reported by every process.
+
+    Counters are summed over all known processes; gauges only over the ones
+    that reported recently (older snapshots are flagged as ``stale``).
+    """
+    raw = _get_redis_client().hgetall(SUBJECT_STREAM_METRICS_KEY)
+    stale_after = 3 * _get_setting("SUBJECT_STREAM_METRICS_INTERVAL", 15)
+    now = time.time()
+    totals = {name: 0 for name in SubjectStreamMetrics.COUNTERS}
+    totals.update({"connections_active": 0, "queue_depth": 0})
+    latencies = {"publish_latency": LatencySummary(), "delivery_latency": LatencySummary()}
+    workers = {}
+    for worker_id, payload in raw.items():
+        try:
+            snapshot = json.loads(payload)
+        except ValueError:
+            continue
+        snapshot["stale"] = now - snapshot.get("reported_at", 0) > stale_after
+        workers[worker_id] = snapshot
+        for name in SubjectStreamMetrics.COUNTERS:
+            totals[name] += snapshot.get(name, 0)
+        if not snapshot["stale"]:
+            totals["connections_active"] += snapshot.get("connections_active", 0)
+            totals["queue_depth"] += snapshot.get("queue_depth", 0)
+        for name, summary in latencies.items():
+            data = snapshot.get(name) or {}
+            summary.count += data.get("count", 0)
+            summary.total += data.get("sum", 0.0)
+            summary.max = max(summary.max, data.get("max", 0.0))
+            for idx, value in enumerate((data.get("buckets") or {}).values()):
+                if idx < len(summary.buckets):
+                    summary.buckets[idx] += value
+    for name, summary in latencies.items():
+        totals[name] = summary.as_dict()
+    return {"totals": totals, "workers": workers}
+
+
+def _build_subject_payload(event_type, subject):
     updated_at = getattr(subject, "updated_at", None)
-    payload = {
+    return {
         "event": event_type,
         "subject_id": subject.id,
         "code": subject.code,
@@ -33,48 +192,223 @@ def publish_subject_event(event_type, subject):
         "period_year": subject.period_year,
         "period_season": subject.period_season,
         "updated_at": updated_at.isoformat() if updated_at else None,
+        "published_at": time.time(),
     }
-    _get_redis_client().publish(SUBJECT_EVENTS_CHANNEL, json.dumps(payload))
+
+
+def _serialize_changed_fields(subject, changed_fields):
+    """
+    Serialize only the SubjectSerializer fields affected by ``changed_fields``
+    (model attnames). ``None`` means every field changed (e.g. on create).
+    """
+    from .serializers import SubjectSerializer
+
+    if changed_fields is None:
+        return SubjectSerializer(subject).data
+    names = set()
+    for attname in changed_fields:
+        names.update(_DELTA_DEPENDENT_FIELDS.get(attname, (attname,)))
+    if not names:
+        return {}
+    return SubjectSerializer(subject, fields=names).data
+
+
+def publish_subject_event(event_type, subject, changed_fields=None):
+    """
+    Publish a small payload describing the change to a Subject instance.
+
+    When clients are listening on the delta channel, a second payload is
+    published with a per-subject ``version`` and the serialized changed
+    fields so they can patch local state without refetching the subject.
+    """
+    started = time.perf_counter()
+    try:
+        _publish_subject_event(event_type, subject, changed_fields)
+    except Exception:
+        stream_metrics.publish_errors += 1
+        raise
+    stream_metrics.events_published += 1
+    stream_metrics.publish_latency.observe(time.perf_counter() - started)
+
+
+def _publish_subject_event(event_type, subject, changed_fields):
+    payload = _build_subject_payload(event_type, subject)
+    client = _get_redis_client()
+    pipe = client.pipeline(transaction=False)
+    pipe.incr(SUBJECT_VERSION_KEY.format(subject_id=subject.id))
+    pipe.pubsub_numsub(SUBJECT_DELTA_EVENTS_CHANNEL)
+    version, numsub = pipe.execute()
+
+    pipe = client.pipeline(transaction=False)
+    pipe.publish(SUBJECT_EVENTS_CHANNEL, json.dumps(payload))
+    delta_subscribers = numsub[0][1] if numsub else 0
+    if delta_subscribers:
+        if event_type == "deleted":
+            changes = {}
+        else:
+            changes = _serialize_changed_fields(subject, changed_fields)
+        delta = dict(payload, version=version, changes=changes)
+        pipe.publish(SUBJECT_DELTA_EVENTS_CHANNEL, json.dumps(delta, cls=DjangoJSONEncoder))
+    if stream_metrics.report_due():
+        stream_metrics.add_report(pipe)
+    pipe.execute()
+
+
+def publish_stream_event(event_type, payload):
+    """
+    Publish an event that is not a Subject change (e.g. export job progress)
+    on both subject channels, so every SSE client receives it with the subject
+    events. A ``requested_by`` user id in ``payload`` limits delivery to that
+    user (and staff), see ``subjects.views.subject_stream``.
+    """
+    started = time.perf_counter()
+    data = json.dumps(dict(payload, event=event_type, published_at=time.time()), cls=DjangoJSONEncoder)
+    try:
+        pipe = _get_redis_client().pipeline(transaction=False)
+        pipe.publish(SUBJECT_EVENTS_CHANNEL, data)
+        pipe.publish(SUBJECT_DELTA_EVENTS_CHANNEL, data)
+        pipe.execute()
+    except Exception:
+        stream_metrics.publish_errors += 1
+        raise
+    stream_metrics.events_published += 1
+    stream_metrics.publish_latency.observe(time.perf_counter() - started)
 
 
 @contextmanager
-def subject_event_stream():
+def subject_event_stream(channel=SUBJECT_EVENTS_CHANNEL):
     """
     Subscribe to subject events and yield a Redis pub/sub iterator.
     (Synchronous version - kept for backwards compatibility)
     """
     client = _get_redis_client()
     pubsub = client.pubsub()
-    pubsub.subscribe(SUBJECT_EVENTS_CHANNEL)
+    pubsub.subscribe(channel)
     try:
         yield pubsub.listen()
     finally:
         pubsub.close()
 
 
-async def async_subject_event_stream():
+# Closing marker pushed to subscriber queues when the Redis reader stops
+_HUB_CLOSED = object()
+
+# {event loop: {channel: _SubjectEventHub}}
+_event_hubs = weakref.WeakKeyDictionary()
+
+
+class _SubjectEventHub:
+    """
+    Fan-out of a single Redis subscription to every SSE client of one event loop.
+
+    Each client gets a bounded queue; when a slow client's queue is full the
+    message is dropped for that client (and counted) instead of buffering
+    without limit.
     """
-    Async generator that subscribes to subject events via Redis pub/sub.
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queues = set()
+        self._reader = None
+
+    def queue_depth(self):
+        return sum(queue.qsize() for queue in list(self.queues))
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=_get_setting("SUBJECT_STREAM_QUEUE_SIZE", 1000))
+        self.queues.add(queue)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.get_running_loop().create_task(self._read())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+        if not self.queues and self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    def _dispatch(self, item):
+        for queue in list(self.queues):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                stream_metrics.messages_dropped += 1
+
+    async def _read(self):
+        client = aioredis.from_url(_get_redis_url(), decode_responses=True)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if stream_metrics.report_due():
+                    await self._report(client)
+                if message is None or message.get("type") != "message":
+                    continue
+                stream_metrics.messages_in += 1
+                message["published_at"] = _get_published_at(message.get("data"))
+                self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Redis went away: end every stream so browsers reconnect (retry: 10000).
+            # Nobody awaits this task, so log here instead of re-raising.
+            logger.warning("Subject stream reader for %s lost Redis", self.channel, exc_info=True)
+            for queue in list(self.queues):
+                while queue.full():
+                    queue.get_nowait()
+                    stream_metrics.messages_dropped += 1
+                queue.put_nowait(_HUB_CLOSED)
+        finally:
+            try:
+                await asyncio.wait_for(self._report(client), timeout=1.0)
+            except Exception:
+                pass
+            await pubsub.close()
+            await client.close()
+
+    async def _report(self, client):
+        pipe = client.pipeline(transaction=False)
+        stream_metrics.add_report(pipe)
+        await pipe.execute()
+
+
+def _get_published_at(data):
+    try:
+        return json.loads(data).get("published_at")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _get_event_hub(channel):
+    hubs = _event_hubs.setdefault(asyncio.get_running_loop(), {})
+    hub = hubs.get(channel)
+    if hub is None:
+        hub = hubs[channel] = _SubjectEventHub(channel)
+    return hub
+
+
+async def async_subject_event_stream(channel=SUBJECT_EVENTS_CHANNEL):
+    """
+    Async generator yielding subject events from the shared Redis subscription.
     Compatible with ASGI servers like Uvicorn.
+
+    Yields Redis pub/sub messages, or ``{"type": "keepalive"}`` when nothing
+    arrived within ``SUBJECT_STREAM_KEEPALIVE_SECONDS``.
     """
-    url = _get_redis_url()
-    client = aioredis.from_url(url, decode_responses=True)
-    pubsub = client.pubsub()
-    await pubsub.subscribe(SUBJECT_EVENTS_CHANNEL)
+    hub = _get_event_hub(channel)
+    queue = hub.subscribe()
+    keepalive = _get_setting("SUBJECT_STREAM_KEEPALIVE_SECONDS", 30.0)
     try:
         while True:
             try:
-                message = await asyncio.wait_for(pubsub.get_message(ignore_subscribe_messages=True), timeout=30.0)
-                if message is not None:
-                    yield message
-                else:
-                    # Send keepalive comment every 30s to keep connection alive
-                    yield {"type": "keepalive"}
+                message = await asyncio.wait_for(queue.get(), timeout=keepalive)
             except asyncio.TimeoutError:
                 # Send keepalive comment to keep connection alive
                 yield {"type": "keepalive"}
-            except asyncio.CancelledError:
+                continue
+            if message is _HUB_CLOSED:
                 break
+            yield message
     finally:
-        await pubsub.close()
-        await client.close()
+        hub.unsubscribe(queue)
@@ -0,0 +1,133 @@
+"""
+Compares DRF's JSON renderer/parser with the orjson ones in api_backend.renderers.
+
+Builds period-sized payloads shaped like real responses (the ``/api/subjects/``
+list, ``/api/subjects/code-sections/`` and a descriptor ``meta`` document),
+renders and parses each one with both implementations, checks the decoded
+results are identical and reports the best time and output size.
+
+    python manage.py bench_json_renderers --rows 3000 --repeat 20
+"""
+import datetime
+import decimal
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api_backend.renderers import ORJSONParser, ORJSONRenderer, orjson
+from subjects.models import Subject
+from subjects.serializers import SubjectSerializer
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _replicate(rows, count):
+    """Repeat ``rows`` up to ``count`` items with distinct ids/codes."""
+    if not rows:
+        return []
+    out = []
+    for idx in range(count):
+        row = dict(rows[idx % len(rows)])
+        row["id"] = idx + 1
+        if "code" in row:
+            row["code"] = f"{row['code']}-{idx // len(rows)}"
+        out.append(row)
+    return out
+
+
+def _synthetic_subject(idx):
+    return {
+        "id": idx, "code": f"ASG{idx:05d}", "section": "1", "name": f"Asignatura de prueba número {idx}",
+        "campus": "Chillán", "shift": "diurna", "period_year": 2025, "period_season": "O", "period_code": "O-2025",
+        "phase": "formulacion", "phase_start_date": "2025-03-01", "phase_end_date": "2025-03-31",
+        "process_start_date": "2025-03-01", "process_end_date": "2025-07-15", "hours": 72, "total_students": 35,
+        "api_type": 2, "teacher": 10, "teacher_name": "Docente Pérez", "area": 1, "area_name": "Tecnologías",
+        "career": 3, "career_name": "Ingeniería Civil Informática", "semester": 5, "semester_name": "Quinto",
+    }
+
+
+def _descriptor_meta(units):
+    return {
+        "status": "ok",
+        "processed_at": datetime.datetime(2025, 4, 2, 10, 30, 12, 345678, tzinfo=datetime.timezone.utc),
+        "text_chars": 48213,
+        "score": decimal.Decimal("0.875"),
+        "extract": {
+            "subject": {"code": "ASG00001", "name": "Asignatura de prueba", "hours": 72, "semester": "Quinto"},
+            "competencies": [f"Competencia técnica {n}: aplica métodos y herramientas" for n in range(1, 6)],
+            "units": [
+                {
+                    "number": n,
+                    "expected_learning": "Resultado de aprendizaje esperado " * 6,
+                    "unit_hours": 18,
+                    "activities": ["Taller", "Laboratorio", "Visita a empresa"],
+                    "evidence": {"type": "informe", "weight": decimal.Decimal("0.25"), "due": datetime.date(2025, 5, n % 28 + 1)},
+                }
+                for n in range(1, units + 1)
+            ],
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark DRF's JSON renderer/parser against the orjson ones (time and bytes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Subjects per list payload (default 2000).")
+        parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement; the best is reported.")
+        parser.add_argument("--synthetic", action="store_true", help="Do not read subjects from the database.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed: pip install orjson")
+        rows, repeat = options["rows"], max(1, options["repeat"])
+
+        subjects = [] if options["synthetic"] else SubjectSerializer(Subject.objects.select_related(
+            "teacher", "area", "career", "semester"
+        )[:rows], many=True).data
+        subjects = _replicate([dict(s) for s in subjects], rows) or [_synthetic_subject(i) for i in range(1, rows + 1)]
+        code_sections = [
+            {key: s[key] for key in ("id", "code", "section", "name", "period_year", "period_season")}
+            | {"period": f"{s['period_season']}-{s['period_year']}"}
+            for s in subjects
+        ]
+        payloads = [
+            (f"subjects list ({rows})", subjects),
+            (f"code-sections ({rows})", code_sections),
+            ("descriptor meta", _descriptor_meta(units=40)),
+        ]
+
+        drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        drf_parser, fast_parser = JSONParser(), ORJSONParser()
+        header = f"{'payload':<24} {'impl':<6} {'render ms':>10} {'parse ms':>9} {'bytes':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for label, data in payloads:
+            drf_bytes = drf_renderer.render(data)
+            fast_bytes = fast_renderer.render(data)
+            if json.loads(drf_bytes) != json.loads(fast_bytes):
+                raise CommandError(f"{label}: outputs differ")
+            results = {}
+            for impl, renderer, parser, body in (
+                ("drf", drf_renderer, drf_parser, drf_bytes),
+                ("orjson", fast_renderer, fast_parser, fast_bytes),
+            ):
+                render_time = _best(lambda: renderer.render(data), repeat)
+                parse_time = _best(lambda: parser.parse(io.BytesIO(body)), repeat)
+                results[impl] = render_time
+                self.stdout.write(
+                    f"{label:<24} {impl:<6} {render_time * 1000:>10.2f} {parse_time * 1000:>9.2f} {len(body):>10}"
+                )
+            self.stdout.write(f"{'':<24} render speedup {results['drf'] / results['orjson']:.1f}x")
@@ -0,0 +1,112 @@
+"""
+Compares the per-user subject scoping filters of the API viewsets.
+
+For each scoped viewset it runs the legacy join-based filter
+(``Q(subject__career_id=...) | Q(subject__teacher=user)``) and the id-set
+filter used by ``SubjectScopedQuerysetMixin`` (``subject_id IN (...)``),
+checks both return the same rows and reports timings and ``EXPLAIN`` plans.
+
+    python manage.py bench_subject_scope --user director@example.com
+    python manage.py bench_subject_scope --role DC --repeat 50 --explain
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from companies.views import ProblemStatementViewSet
+from subjects.scoping import accessible_subject_ids, subject_scope_q
+from subjects.views import (
+    SubjectViewSet,
+    SubjectUnitViewSet,
+    SubjectTechnicalCompetencyViewSet,
+    CompanyBoundaryConditionViewSet,
+    PossibleCounterpartViewSet,
+    Api3AlternanceViewSet,
+    ApiType2CompletionViewSet,
+    ApiType3CompletionViewSet,
+    CompanyEngagementScopeViewSet,
+)
+
+
+SCOPED_VIEWSETS = (
+    SubjectViewSet,
+    SubjectUnitViewSet,
+    SubjectTechnicalCompetencyViewSet,
+    CompanyBoundaryConditionViewSet,
+    PossibleCounterpartViewSet,
+    Api3AlternanceViewSet,
+    ApiType2CompletionViewSet,
+    ApiType3CompletionViewSet,
+    CompanyEngagementScopeViewSet,
+    ProblemStatementViewSet,
+)
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Benchmark join-based vs id-set subject scoping of the API viewsets (timings and EXPLAIN)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default=None, help="Email of the user to scope for.")
+        parser.add_argument("--role", default="DC", help="Role used to pick a user when --user is not given (default DC).")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query; the best time is reported.")
+        parser.add_argument("--explain", action="store_true", help="Print the EXPLAIN output of both queries.")
+
+    def handle(self, *args, **options):
+        user = self._get_user(options["user"], options["role"])
+        repeat = max(1, options["repeat"])
+        self.stdout.write(
+            f"User {user.email} (role {getattr(user, 'role', None)}, "
+            f"career {getattr(user, 'career_id', None)}, area {getattr(user, 'area_id', None)}) on {connection.vendor}"
+        )
+
+        started = time.perf_counter()
+        subject_ids = accessible_subject_ids(user)
+        resolve_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"Accessible subjects: {len(subject_ids)} (resolved in {resolve_ms:.2f} ms, once per request)")
+        self.stdout.write("")
+        self.stdout.write(f"{'viewset':<36} {'rows':>6} {'join ms':>9} {'id-set ms':>10} {'speedup':>8}")
+
+        for viewset in SCOPED_VIEWSETS:
+            base = viewset.queryset.all()
+            field = viewset.subject_scope_field
+            legacy_qs = base.filter(subject_scope_q(user, field)).order_by("pk")
+            lookup = f"{field}_id__in" if field else "pk__in"
+            scoped_qs = (base.filter(**{lookup: subject_ids}) if subject_ids else base.none()).order_by("pk")
+
+            legacy_time, legacy_ids = _timed(lambda: list(legacy_qs.values_list("pk", flat=True)), repeat)
+            scoped_time, scoped_ids = _timed(lambda: list(scoped_qs.values_list("pk", flat=True)), repeat)
+            if legacy_ids != scoped_ids:
+                raise CommandError(f"{viewset.__name__}: filters disagree ({len(legacy_ids)} vs {len(scoped_ids)} rows)")
+            speedup = legacy_time / scoped_time if scoped_time else float("inf")
+            self.stdout.write(
+                f"{viewset.__name__:<36} {len(scoped_ids):>6} {legacy_time * 1000:>9.2f} "
+                f"{scoped_time * 1000:>10.2f} {speedup:>7.2f}x"
+            )
+            if options["explain"]:
+                self._explain("join", legacy_qs)
+                if subject_ids:
+                    self._explain("id-set", scoped_qs)
+
+    def _explain(self, label, qs):
+        self.stdout.write(f"  {label}:")
+        for line in qs.explain().splitlines():
+            self.stdout.write(f"    {line}")
+
+    def _get_user(self, email, role):
+        qs = get_user_model().objects.filter(is_active=True)
+        user = qs.filter(email=email).first() if email else qs.filter(role=role).order_by("id").first()
+        if user is None:
+            raise CommandError("No matching user (use --user or --role).")
+        return user
@@ -0,0 +1,320 @@
+"""
+Load test for the subject SSE stream (``/api/subjects/stream/``).
+
+Runs the ASGI app under uvicorn in a subprocess, opens N concurrent stream
+clients, publishes M events per second through ``publish_subject_event`` and
+reports delivery latency percentiles, server memory per connection and CPU.
+
+    python manage.py bench_subject_stream --clients 500 --rate 20 --duration 30
+    python manage.py bench_subject_stream --fakeredis   # no local Redis needed
+
+Requires ``uvicorn`` (and ``fakeredis`` for ``--fakeredis``). Memory and CPU
+are read from ``/proc`` (Linux). Large ``--clients`` values may need a higher
+``ulimit -n``.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from subjects.events import publish_subject_event
+from subjects.models import Subject
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    idx = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+    return values[idx]
+
+
+class _BenchStats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.connect_times = []
+        self.latencies = []
+        self.keepalives = 0
+        self.all_connected = asyncio.Event()
+
+
+class Command(BaseCommand):
+    help = "Load test the subject SSE stream under uvicorn (latency percentiles, memory per connection, CPU)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=100, help="Concurrent stream clients (default 100).")
+        parser.add_argument("--rate", type=float, default=10.0, help="Events published per second (default 10).")
+        parser.add_argument("--duration", type=float, default=10.0, help="Publishing time in seconds (default 10).")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--redis-url", default=None, help="Redis URL (default SUBJECT_STREAM_REDIS_URL).")
+        parser.add_argument("--fakeredis", action="store_true", help="Start an in-process fakeredis TCP server.")
+        parser.add_argument("--payload", choices=("base", "delta"), default="base", help="Stream event format.")
+        parser.add_argument("--subject", type=int, default=None, help="Subject id used for the events.")
+        parser.add_argument("--user", default=None, help="Email of the user that opens the streams.")
+        parser.add_argument("--connect-timeout", type=float, default=60.0)
+        parser.add_argument("--grace", type=float, default=3.0, help="Seconds to wait for late deliveries.")
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError("uvicorn is required: pip install uvicorn")
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        subject = self._get_subject(options["subject"])
+        user = self._get_user(options["user"])
+        token = str(AccessToken.for_user(user))
+
+        fake_server = None
+        redis_url = options["redis_url"] or settings.SUBJECT_STREAM_REDIS_URL
+        if options["fakeredis"]:
+            fake_server, redis_url = self._start_fakeredis()
+        # The publisher runs in this process
+        settings.SUBJECT_STREAM_REDIS_URL = redis_url
+
+        server = self._start_uvicorn(options["host"], options["port"], redis_url)
+        try:
+            self._wait_for_port(options["host"], options["port"], server)
+            result = asyncio.run(self._run(options, token, subject, server.pid))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            if fake_server is not None:
+                fake_server.shutdown()
+                fake_server.server_close()
+        self._report(options, result)
+
+    def _get_subject(self, subject_id):
+        qs = Subject.objects.all()
+        subject = qs.filter(pk=subject_id).first() if subject_id else qs.order_by("id").first()
+        if subject is None:
+            raise CommandError("No Subject available to publish events for (use --subject).")
+        return subject
+
+    def _get_user(self, email):
+        qs = get_user_model().objects.filter(is_active=True)
+        user = qs.filter(email=email).first() if email else qs.order_by("id").first()
+        if user is None:
+            raise CommandError("No active user available to open the streams (use --user).")
+        return user
+
+    def _start_fakeredis(self):
+        try:
+            from fakeredis import TcpFakeServer
+        except ImportError:
+            raise CommandError("fakeredis is required for --fakeredis: pip install fakeredis")
+        fake_server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+        fake_server.daemon_threads = True
+        threading.Thread(target=fake_server.serve_forever, daemon=True).start()
+        host, port = fake_server.server_address[:2]
+        return fake_server, f"redis://{host}:{port}/0"
+
+    def _start_uvicorn(self, host, port, redis_url):
+        env = dict(os.environ, SUBJECT_STREAM_REDIS_URL=redis_url)
+        cmd = [
+            sys.executable, "-m", "uvicorn", "api_backend.asgi:application",
+            "--host", host, "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ]
+        return subprocess.Popen(cmd, env=env, cwd=str(settings.BASE_DIR))
+
+    def _wait_for_port(self, host, port, server, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("uvicorn exited before accepting connections.")
+            try:
+                with socket.create_connection((host, port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f"uvicorn did not listen on {host}:{port} within {timeout:.0f}s.")
+
+    async def _run(self, options, token, subject, server_pid):
+        clients = options["clients"]
+        path = f"/api/subjects/stream/?token={token}"
+        if options["payload"] == "delta":
+            path += "&payload=delta"
+        # Warm up one stream so lazy imports don't count as per-connection memory
+        warmup = _BenchStats()
+        warmup_task = asyncio.create_task(self._client(options["host"], options["port"], path, warmup, 1))
+        await asyncio.wait_for(warmup.all_connected.wait(), timeout=options["connect_timeout"])
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await asyncio.sleep(0.5)
+
+        stats = _BenchStats()
+        rss_idle = _rss_bytes(server_pid)
+
+        tasks = [
+            asyncio.create_task(self._client(options["host"], options["port"], path, stats, clients))
+            for _ in range(clients)
+        ]
+        try:
+            await asyncio.wait_for(stats.all_connected.wait(), timeout=options["connect_timeout"])
+        except asyncio.TimeoutError:
+            pass
+        # Give the server a moment to finish subscribing every stream
+        await asyncio.sleep(0.5)
+        rss_connected = _rss_bytes(server_pid)
+
+        cpu_start = _cpu_seconds(server_pid)
+        started = time.perf_counter()
+        published, errors = await asyncio.to_thread(
+            self._publish_loop, subject, options["rate"], options["duration"]
+        )
+        await asyncio.sleep(options["grace"])
+        elapsed = time.perf_counter() - started
+        cpu_end = _cpu_seconds(server_pid)
+        rss_end = _rss_bytes(server_pid)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            "stats": stats,
+            "published": published,
+            "publish_errors": errors,
+            "elapsed": elapsed,
+            "rss_idle": rss_idle,
+            "rss_connected": rss_connected,
+            "rss_end": rss_end,
+            "cpu_seconds": (cpu_end - cpu_start) if cpu_start is not None and cpu_end is not None else None,
+        }
+
+    async def _client(self, host, port, path, stats, expected_clients):
+        started = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if b" 200 " not in status_line:
+                stats.failed += 1
+                return
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            stats.connected += 1
+            stats.connect_times.append(time.perf_counter() - started)
+        except OSError:
+            stats.failed += 1
+            return
+        finally:
+            if stats.connected + stats.failed >= expected_clients:
+                stats.all_connected.set()
+
+        try:
+            # Chunked body: chunk-size lines are ignored, SSE lines are parsed
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.startswith(b"data: "):
+                    received = time.time()
+                    try:
+                        published_at = json.loads(line[6:]).get("published_at")
+                    except ValueError:
+                        continue
+                    if published_at:
+                        stats.latencies.append(received - published_at)
+                elif line.startswith(b": keepalive"):
+                    stats.keepalives += 1
+        finally:
+            writer.close()
+
+    def _publish_loop(self, subject, rate, duration):
+        total = int(rate * duration)
+        interval = 1.0 / rate if rate > 0 else 0
+        published = errors = 0
+        started = time.perf_counter()
+        for idx in range(total):
+            delay = started + idx * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                publish_subject_event("updated", subject, changed_fields=())
+                published += 1
+            except Exception:
+                errors += 1
+        return published, errors
+
+    def _report(self, options, result):
+        stats = result["stats"]
+        latencies = sorted(stats.latencies)
+        connect_times = sorted(stats.connect_times)
+        expected = result["published"] * stats.connected
+        delivered = len(latencies)
+
+        def ms(value):
+            return "n/a" if value is None else f"{value * 1000:.1f} ms"
+
+        def mib(value):
+            return "n/a" if value is None else f"{value / (1024 * 1024):.1f} MiB"
+
+        out = self.stdout.write
+        out(f"Clients: {stats.connected} connected, {stats.failed} failed (requested {options['clients']})")
+        out(
+            f"Connect time: p50 {ms(_percentile(connect_times, 50))}, "
+            f"p95 {ms(_percentile(connect_times, 95))}, max {ms(connect_times[-1] if connect_times else None)}"
+        )
+        out(
+            f"Published: {result['published']} events ({result['publish_errors']} errors) "
+            f"at {options['rate']:g}/s for {options['duration']:g}s"
+        )
+        lost = expected - delivered
+        lost_pct = (lost / expected * 100) if expected else 0.0
+        out(f"Delivered: {delivered}/{expected} ({lost} lost, {lost_pct:.2f}%), keepalives {stats.keepalives}")
+        out(
+            "Delivery latency: "
+            + ", ".join(f"p{pct} {ms(_percentile(latencies, pct))}" for pct in (50, 90, 99))
+            + f", max {ms(latencies[-1] if latencies else None)}"
+        )
+        rss_idle, rss_connected = result["rss_idle"], result["rss_connected"]
+        per_conn = None
+        if rss_idle is not None and rss_connected is not None and stats.connected:
+            per_conn = (rss_connected - rss_idle) / stats.connected
+        out(
+            f"Server RSS: idle {mib(rss_idle)}, connected {mib(rss_connected)}, end {mib(result['rss_end'])}, "
+            f"per connection {'n/a' if per_conn is None else f'{per_conn / 1024:.1f} KiB'}"
+        )
+        cpu = result["cpu_seconds"]
+        if cpu is None:
+            out("Server CPU: n/a")
+        else:
+            out(f"Server CPU: {cpu:.2f}s over {result['elapsed']:.1f}s ({cpu / result['elapsed'] * 100:.1f}%)")
@@ -0,0 +1,178 @@
+"""
+Reports WHERE filters from captured query logs that no index can serve.
+
+Reads SQL from Django ``django.db.backends`` debug logs (see
+``DJANGO_DB_LOG_FILE``), the MySQL general/slow log or any file with one
+statement per line, extracts the columns each statement filters on per table
+and compares them with the indexes of the current database.
+
+    python manage.py report_unindexed_filters /var/log/api/db.log
+    python manage.py report_unindexed_filters db.log --min-count 10 --all
+
+Each OR branch is checked on its own. A filter is *unindexed* when no index
+starts with any of its columns and *partial* when the best index only covers
+some of its equality columns.
+"""
+import re
+import sys
+from collections import Counter
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+_STATEMENT_RE = re.compile(r"\b(SELECT|UPDATE|DELETE)\b.*", re.IGNORECASE)
+_WHERE_RE = re.compile(
+    r"\bWHERE\b(?P<where>.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bFOR\s+UPDATE\b|;|$)",
+    re.IGNORECASE,
+)
+_IDENT = r'[`"]?(\w+)[`"]?'
+_PREDICATE_RE = re.compile(
+    _IDENT + r"\." + _IDENT + r"\s*(?P<op>=|<>|!=|<=|>=|<|>|\bIN\b|\bLIKE\b|\bIS\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+" + _IDENT + r"(?:\s+(?:AS\s+)?" + _IDENT + r")?", re.IGNORECASE)
+_EQUALITY_OPS = {"=", "IN", "IS"}
+
+
+def _statements(stream):
+    for line in stream:
+        match = _STATEMENT_RE.search(line)
+        if match:
+            yield match.group(0)
+
+
+def _or_branches(clause):
+    """Split a WHERE clause on its outermost ORs (each branch needs its own index)."""
+    clause = clause.strip()
+    while clause.startswith("(") and clause.endswith(")") and _closing_paren(clause) == len(clause) - 1:
+        clause = clause[1:-1].strip()
+    branches, depth, start = [], 0, 0
+    for match in re.finditer(r"\(|\)|\bOR\b", clause, re.IGNORECASE):
+        token = match.group(0)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0:
+            branches.append(clause[start:match.start()])
+            start = match.end()
+    branches.append(clause[start:])
+    if len(branches) == 1:
+        return branches
+    return [part for branch in branches for part in _or_branches(branch)]
+
+
+def _closing_paren(clause):
+    depth = 0
+    for pos, char in enumerate(clause):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return pos
+    return -1
+
+
+def _filters(sql):
+    """[(table, frozenset(equality_columns), frozenset(range_columns))] of one statement."""
+    aliases = {}
+    for table, alias in _ALIAS_RE.findall(sql):
+        if alias and alias.upper() not in {"ON", "WHERE", "INNER", "LEFT", "RIGHT", "OUTER", "JOIN", "USING"}:
+            aliases[alias] = table
+    result = set()
+    for where in _WHERE_RE.finditer(sql):
+        for branch in _or_branches(where.group("where")):
+            columns = {}
+            for table, column, op in _PREDICATE_RE.findall(branch):
+                table = aliases.get(table, table)
+                equality, ranged = columns.setdefault(table, (set(), set()))
+                (equality if op.upper() in _EQUALITY_OPS else ranged).add(column)
+            result.update((table, frozenset(eq), frozenset(rg)) for table, (eq, rg) in columns.items())
+    return result
+
+
+def _usable_prefix(index_columns, equality, ranged):
+    """Number of leading index columns a filter can use (range stops the prefix)."""
+    used = 0
+    for column in index_columns:
+        if column in equality:
+            used += 1
+            continue
+        if column in ranged:
+            used += 1
+        break
+    return used
+
+
+class Command(BaseCommand):
+    help = "Report filters from captured SQL logs that are not served by an index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("logs", nargs="*", help="Log files with SQL statements ('-' or none reads stdin).")
+        parser.add_argument("--min-count", type=int, default=1, help="Only report filters seen at least N times.")
+        parser.add_argument("--all", action="store_true", help="Also list filters served by an index.")
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        statements = 0
+        for path in options["logs"] or ["-"]:
+            try:
+                stream = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+            with stream if path != "-" else nullcontext(stream):
+                for sql in _statements(stream):
+                    statements += 1
+                    for table_filter in _filters(sql):
+                        counts[table_filter] += 1
+
+        indexes = self._load_indexes({table for table, _, _ in counts})
+        self.stdout.write(f"Statements: {statements}, distinct filters: {len(counts)}")
+        rows = []
+        for (table, equality, ranged), count in counts.most_common():
+            if count < options["min_count"]:
+                continue
+            if table not in indexes:
+                continue  # not a table of this database (or log noise)
+            best, best_index = 0, None
+            for name, (columns, unique) in indexes[table].items():
+                if unique and set(columns) <= equality:
+                    # Single-row lookup (pk/unique fully bound)
+                    best, best_index = len(equality) + len(ranged), name
+                    break
+                used = _usable_prefix(columns, equality, ranged)
+                if used > best:
+                    best, best_index = used, name
+            wanted = len(equality) + (1 if ranged else 0)
+            status = "unindexed" if best == 0 else ("partial" if best < wanted else "ok")
+            if status == "ok" and not options["all"]:
+                continue
+            rows.append((status, count, table, equality, ranged, best_index, best))
+
+        if not rows:
+            self.stdout.write(self.style.SUCCESS("Every captured filter is served by an index."))
+            return
+        for status, count, table, equality, ranged, best_index, best in rows:
+            filter_desc = ", ".join(sorted(equality) + [f"{c} (range)" for c in sorted(ranged)])
+            index_desc = f"{best_index} ({best} col)" if best_index else "-"
+            style = self.style.ERROR if status == "unindexed" else (
+                self.style.WARNING if status == "partial" else self.style.SUCCESS
+            )
+            self.stdout.write(style(f"[{status}] x{count} {table}: {filter_desc} -> {index_desc}"))
+
+    def _load_indexes(self, tables):
+        existing = set(connection.introspection.table_names())
+        indexes = {}
+        with connection.cursor() as cursor:
+            for table in tables & existing:
+                constraints = connection.introspection.get_constraints(cursor, table)
+                indexes[table] = {
+                    name: (info["columns"], bool(info.get("primary_key") or info.get("unique")))
+                    for name, info in constraints.items()
+                    if (info.get("index") or info.get("primary_key") or info.get("unique")) and info.get("columns")
+                }
+        return indexes
+
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subjects', '0005_alter_subjectphaseprogress_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['period_year', 'period_season'], name='subject_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['teacher', 'period_year', 'period_season'], name='subject_teacher_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['career', 'period_year', 'period_season'], name='subject_career_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['area', 'period_year', 'period_season'], name='subject_area_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subjectphaseprogress',
+            index=models.Index(fields=['phase', 'status'], name='phase_progress_status_idx'),
+        ),
+    ]
@@ -1,8 +1,14 @@
+import logging
+import time
+
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
 from .utils import get_default_period_from_settings
 
 
+logger = logging.getLogger(__name__)
+
 PERIOD_SEASON_CHOICES = (
     ("O", "Otoño"),
     ("P", "Primavera"),
@@ -42,12 +48,63 @@ class PeriodSetting(models.Model):
         obj, _ = cls.objects.get_or_create(pk=cls.SINGLETON_PK, defaults=defaults)
         return obj
 
+    # Active period shared across workers through the Django cache, plus a
+    # short-lived per-process copy so hot paths (Subject defaults) skip even
+    # the cache round-trip. Invalidated by the PeriodSetting save/delete signals.
+    CACHE_KEY = "subjects:active-period"
+    _local_period = None  # (season, year, expires_at)
+
+    @classmethod
+    def get_active_period(cls):
+        """
+        Return ``(period_season, period_year)`` of the active period. Read-only:
+        without the singleton row it returns the settings default. If the cache
+        is down it reads the database.
+        """
+        now = time.monotonic()
+        local = cls._local_period
+        if local is not None and local[2] > now:
+            return local[0], local[1]
+        try:
+            period = cache.get(cls.CACHE_KEY)
+        except Exception:
+            logger.warning("Cache no disponible; se lee el período activo de la base de datos", exc_info=True)
+            period = cache_up = None
+        else:
+            cache_up = True
+        if period is None:
+            period = cls._read_active_period()
+            if cache_up:
+                try:
+                    cache.set(cls.CACHE_KEY, period, getattr(settings, "PERIOD_SETTING_CACHE_SECONDS", 3600))
+                except Exception:
+                    logger.warning("No se pudo guardar el período activo en el cache", exc_info=True)
+        season, year = period
+        cls._local_period = (season, year, now + getattr(settings, "PERIOD_SETTING_LOCAL_SECONDS", 5))
+        return season, year
+
+    @classmethod
+    def _read_active_period(cls):
+        obj = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if obj is None:
+            return get_default_period_from_settings()
+        return obj.period_season, obj.period_year
+
+    @classmethod
+    def invalidate_cache(cls):
+        cls._local_period = None
+        try:
+            cache.delete(cls.CACHE_KEY)
+        except Exception:
+            logger.warning("No se pudo invalidar el período activo en el cache", exc_info=True)
+
+
 def _default_period_year():
-    return PeriodSetting.get_active().period_year
+    return PeriodSetting.get_active_period()[1]
 
 
 def _default_period_season():
-    return PeriodSetting.get_active().period_season
+    return PeriodSetting.get_active_period()[0]
 
 
 class InteractionType(models.Model):
@@ -173,22 +230,58 @@ class Subject(models.Model):
                 name="uniq_subject_code_section_period",
             ),
         ]
+        # (code, section) lookups use the unique constraint above; these cover
+        # period listings and the teacher/director scopes filtered by period.
+        indexes = [
+            models.Index(fields=("period_year", "period_season"), name="subject_period_idx"),
+            models.Index(fields=("teacher", "period_year", "period_season"), name="subject_teacher_period_idx"),
+            models.Index(fields=("career", "period_year", "period_season"), name="subject_career_period_idx"),
+            models.Index(fields=("area", "period_year", "period_season"), name="subject_area_period_idx"),
+        ]
 
     def __str__(self):
         return f"{self.code} (Sec. {self.section}, {self.period_code}) - {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of loaded values, used to build delta payloads for the SSE stream
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
         # Infer shift from subject code: if code contains 'V' (case-insensitive), it's vespertina; otherwise diurna.
         if self.code:
             self.shift = "vespertina" if "V" in self.code.upper() else "diurna"
         super().save(*args, **kwargs)
+        self._loaded_values = {f.attname: getattr(self, f.attname) for f in self._meta.concrete_fields}
+
+    def get_changed_fields(self):
+        """
+        Return the attnames that differ from the last loaded/saved state,
+        or None when the instance was not loaded from the database.
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+        return [name for name, value in loaded.items() if getattr(self, name) != value]
 
     @property
     def period_code(self) -> str:
         return f"{self.period_season}-{self.period_year}"
 
+    def _get_schedule_index(self):
+        # Set by SubjectSerializer so list/retrieve share one schedule query
+        index = getattr(self, "_schedule_index", None)
+        if index is not None and index.covers(self.period_year, self.period_season):
+            return index
+        return None
+
     def get_phase_schedule(self, phase=None):
         phase_key = phase or self.phase
+        index = self._get_schedule_index()
+        if index is not None:
+            return index.get(self.period_year, self.period_season, phase_key)
         return PeriodPhaseSchedule.objects.filter(
             period_year=self.period_year,
             period_season=self.period_season,
@@ -209,6 +302,9 @@ class Subject(models.Model):
     def process_start_date(self):
         if not self.pk:
             return None
+        index = self._get_schedule_index()
+        if index is not None:
+            return index.process_bounds(self.period_year, self.period_season)[0]
         qs = PeriodPhaseSchedule.objects.filter(
             period_year=self.period_year,
             period_season=self.period_season,
@@ -219,6 +315,9 @@ class Subject(models.Model):
     def process_end_date(self):
         if not self.pk:
             return None
+        index = self._get_schedule_index()
+        if index is not None:
+            return index.process_bounds(self.period_year, self.period_season)[1]
         qs = PeriodPhaseSchedule.objects.filter(
             period_year=self.period_year,
             period_season=self.period_season,
@@ -246,6 +345,50 @@ class PeriodPhaseSchedule(models.Model):
     def __str__(self):
         return f"{self.period_season}-{self.period_year} - {self.phase}"
 
+
+class PeriodPhaseScheduleIndex:
+    """
+    In-memory (period_year, period_season, phase) index of PeriodPhaseSchedule
+    rows for a set of periods, loaded with a single query.
+    """
+
+    def __init__(self, periods, schedules):
+        self.periods = set(periods)
+        self.by_phase = {}
+        self.bounds = {}
+        for schedule in schedules:
+            key = (schedule.period_year, schedule.period_season)
+            self.by_phase[key + (schedule.phase,)] = schedule
+            start, end = self.bounds.get(key, (None, None))
+            if schedule.start_date and (start is None or schedule.start_date < start):
+                start = schedule.start_date
+            if schedule.end_date and (end is None or schedule.end_date > end):
+                end = schedule.end_date
+            self.bounds[key] = (start, end)
+
+    @classmethod
+    def for_periods(cls, periods):
+        periods = set(periods)
+        if not periods:
+            return cls(periods, [])
+        query = models.Q()
+        for year, season in periods:
+            query |= models.Q(period_year=year, period_season=season)
+        return cls(periods, PeriodPhaseSchedule.objects.filter(query))
+
+    @classmethod
+    def for_subjects(cls, subjects):
+        return cls.for_periods((s.period_year, s.period_season) for s in subjects)
+
+    def covers(self, period_year, period_season):
+        return (period_year, period_season) in self.periods
+
+    def get(self, period_year, period_season, phase):
+        return self.by_phase.get((period_year, period_season, phase))
+
+    def process_bounds(self, period_year, period_season):
+        return self.bounds.get((period_year, period_season), (None, None))
+
 class SubjectUnit(models.Model):  #ficha proyecto api unidades
     number = models.IntegerField()
     expected_learning = models.TextField(blank=True, null=True)
@@ -411,6 +554,11 @@ class SubjectPhaseProgress(models.Model):
                 name="uniq_subject_phase_progress",
             ),
         ]
+        # (subject, phase[, status]) is served by the unique constraint; the
+        # Gantt view also filters by phase/status across subjects.
+        indexes = [
+            models.Index(fields=("phase", "status"), name="phase_progress_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.subject.code} - {self.get_phase_display()} - {self.get_status_display()}"
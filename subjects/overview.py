@@ -0,0 +1,98 @@
+"""
+Vista resumida (columnar) del avance de todas las asignaturas de un período.
+
+Alimenta el Gantt con tres consultas (asignaturas, progreso por fase y
+calendario de fases) en vez de serializar asignatura por asignatura. El
+resultado se guarda en el cache de Django por período; las señales de
+``subjects.signals`` lo invalidan al guardar/borrar Subject,
+SubjectPhaseProgress o PeriodPhaseSchedule.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import PeriodPhaseSchedule, Subject, SubjectPhaseProgress
+
+
+PERIOD_OVERVIEW_CACHE_KEY = "subjects:period-overview:{year}:{season}"
+PROGRESS_PHASES = tuple(code for code, _ in SubjectPhaseProgress.PHASE_CHOICES)
+
+
+def _cache_seconds():
+    return int(getattr(settings, "PERIOD_OVERVIEW_CACHE_SECONDS", 300) or 0)
+
+
+def _cache_key(period_year, period_season):
+    return PERIOD_OVERVIEW_CACHE_KEY.format(year=period_year, season=period_season)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def build_period_overview(period_year, period_season):
+    """Arma el resumen del período con tres consultas agregadas."""
+    subjects = list(
+        Subject.objects.filter(period_year=period_year, period_season=period_season)
+        .order_by("code", "section", "id")
+        .values_list("id", "code", "section", "name", "phase")
+    )
+    progress = {
+        (subject_id, phase): status
+        for subject_id, phase, status in SubjectPhaseProgress.objects.filter(
+            subject__period_year=period_year,
+            subject__period_season=period_season,
+        ).values_list("subject_id", "phase", "status")
+    }
+    schedule = {}
+    process_start = process_end = None
+    for phase, start, end in PeriodPhaseSchedule.objects.filter(
+        period_year=period_year, period_season=period_season
+    ).values_list("phase", "start_date", "end_date"):
+        schedule[phase] = [_iso(start), _iso(end)]
+        if start and (process_start is None or start < process_start):
+            process_start = start
+        if end and (process_end is None or end > process_end):
+            process_end = end
+
+    ids = [row[0] for row in subjects]
+    return {
+        "period": f"{period_season}-{period_year}",
+        "period_year": period_year,
+        "period_season": period_season,
+        "phases": list(PROGRESS_PHASES),
+        "schedule": schedule,
+        "process_start_date": _iso(process_start),
+        "process_end_date": _iso(process_end),
+        "count": len(subjects),
+        "subjects": {
+            "id": ids,
+            "code": [row[1] for row in subjects],
+            "section": [row[2] for row in subjects],
+            "name": [row[3] for row in subjects],
+            "phase": [row[4] for row in subjects],
+            "progress": {
+                phase: [progress.get((subject_id, phase)) for subject_id in ids]
+                for phase in PROGRESS_PHASES
+            },
+        },
+    }
+
+
+def get_period_overview(period_year, period_season):
+    """Resumen del período desde el cache (lo arma si no está)."""
+    timeout = _cache_seconds()
+    if timeout <= 0:
+        return build_period_overview(period_year, period_season)
+    key = _cache_key(period_year, period_season)
+    data = cache.get(key)
+    if data is None:
+        data = build_period_overview(period_year, period_season)
+        cache.set(key, data, timeout)
+    return data
+
+
+def invalidate_period_overview(*periods):
+    """Descarta el resumen cacheado de los ``(period_year, period_season)`` dados."""
+    keys = {_cache_key(year, season) for year, season in periods if year and season}
+    if keys:
+        cache.delete_many(list(keys))
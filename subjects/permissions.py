@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from users.access import get_access_profile
 
 
 class IsSubjectTeacherOrAdmin(BasePermission):
@@ -16,11 +17,7 @@ class IsSubjectTeacherOrAdmin(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         # Escritura: admin, staff, roles elevados, DC o docentes
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['ADMIN', 'DAC', 'VCM', 'COORD', 'DC', 'DOC']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
+        if get_access_profile(user).has_elevated_access(['ADMIN', 'DAC', 'VCM', 'COORD', 'DC', 'DOC']):
             return True
         return False
 
@@ -28,11 +25,7 @@ class IsSubjectTeacherOrAdmin(BasePermission):
         user = request.user
         if not user or not user.is_authenticated:
             return False
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD', 'DC']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
+        if get_access_profile(user).has_elevated_access(['DAC', 'VCM', 'COORD', 'DC']):
             return True
         return obj.teacher_id == user.id
 
@@ -0,0 +1,73 @@
+"""
+Alcance por asignatura de los viewsets (docente / director de carrera).
+
+Antes cada ``get_queryset`` repetía el mismo bloque (staff/rol/grupo →
+alcance de director → filtro por docente) y filtraba con
+``Q(subject__career_id=...) | Q(subject__teacher=user)``: un ``OR`` sobre el
+JOIN con ``subjects_subject`` que MySQL no puede resolver con un índice.
+Ahora los ids de asignaturas visibles se resuelven una vez por request
+(quedan en el perfil de acceso del usuario) y los recursos se filtran con
+``subject_id IN (...)``, que usa el índice de la FK.
+
+``python manage.py bench_subject_scope`` compara planes y tiempos de ambas
+variantes.
+"""
+from django.db.models import Q
+
+from users.access import get_access_profile
+from .models import Subject
+
+
+def director_scope_q(user, subject_field='subject'):
+    """Return a Q object restricting records to the director's area/career."""
+    scope = get_access_profile(user).director_scope
+    if scope is None:
+        return None
+    prefix = f'{subject_field}__' if subject_field else ''
+    field, value = scope
+    return Q(**{f'{prefix}{field}': value})
+
+
+def subject_scope_q(user, subject_field='subject'):
+    """Filtro por JOIN (docente o alcance de director), sin resolver ids."""
+    teacher_q = Q(**{f'{subject_field}__teacher' if subject_field else 'teacher': user})
+    director_scope = director_scope_q(user, subject_field)
+    return teacher_q if director_scope is None else director_scope | teacher_q
+
+
+def accessible_subject_ids(user):
+    """Ids de asignaturas que dicta ``user`` o de su área/carrera (si es DC)."""
+    profile = get_access_profile(user)
+    if profile.subject_ids is None:
+        profile.subject_ids = frozenset(
+            Subject.objects.filter(subject_scope_q(user, subject_field='')).values_list('id', flat=True)
+        )
+    return profile.subject_ids
+
+
+def scope_queryset_by_subject(qs, user, subject_field='subject'):
+    """Restringe ``qs`` a las asignaturas accesibles con ``<subject_field>_id IN (...)``."""
+    subject_ids = accessible_subject_ids(user)
+    if not subject_ids:
+        return qs.none()
+    lookup = f'{subject_field}_id__in' if subject_field else 'pk__in'
+    return qs.filter(**{lookup: subject_ids})
+
+
+class SubjectScopedQuerysetMixin:
+    """
+    Limita el queryset del viewset a las asignaturas visibles del usuario.
+
+    - ``subject_scope_field``: FK a Subject del modelo ('' para Subject).
+    - ``subject_scope_full_access_roles``: roles que ven todo (además de
+      staff y grupo 'vcm').
+    """
+    subject_scope_field = 'subject'
+    subject_scope_full_access_roles = ('DAC', 'VCM', 'COORD')
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = self.request.user
+        if get_access_profile(user).has_elevated_access(self.subject_scope_full_access_roles):
+            return qs
+        return scope_queryset_by_subject(qs, user, self.subject_scope_field)
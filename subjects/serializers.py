@@ -1,7 +1,9 @@
+from django.db import models
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from .models import (
     Subject,
+    PeriodPhaseScheduleIndex,
     Area,
     Career,
     SemesterLevel,
@@ -23,6 +25,22 @@ ProblemStatement and CounterpartContact serializers were moved to companies.seri
 """
 
 
+SUBJECT_SCHEDULE_FIELDS = ('phase_start_date', 'phase_end_date', 'process_start_date', 'process_end_date')
+
+
+class SubjectListSerializer(serializers.ListSerializer):
+    """Loads the phase schedules of every period in the list with one query."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        subjects = list(iterable)
+        if any(name in self.child.fields for name in SUBJECT_SCHEDULE_FIELDS):
+            index = PeriodPhaseScheduleIndex.for_subjects(subjects)
+            for subject in subjects:
+                subject._schedule_index = index
+        return super().to_representation(subjects)
+
+
 class SubjectSerializer(serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.get_full_name', read_only=True)
     area_name = serializers.CharField(source='area.name', read_only=True)
@@ -34,8 +52,24 @@ class SubjectSerializer(serializers.ModelSerializer):
     process_start_date = serializers.DateField(read_only=True)
     process_end_date = serializers.DateField(read_only=True)
 
+    def __init__(self, *args, **kwargs):
+        # Optional subset of fields to render, e.g. SubjectSerializer(obj, fields=['name'])
+        only_fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if only_fields is not None:
+            for field_name in set(self.fields) - set(only_fields):
+                self.fields.pop(field_name)
+
+    def to_representation(self, instance):
+        needs_schedule = any(name in self.fields for name in SUBJECT_SCHEDULE_FIELDS)
+        if needs_schedule and instance.pk and instance._get_schedule_index() is None:
+            # One query for the four schedule fields instead of one each
+            instance._schedule_index = PeriodPhaseScheduleIndex.for_subjects([instance])
+        return super().to_representation(instance)
+
     class Meta:
         model = Subject
+        list_serializer_class = SubjectListSerializer
         fields = [
             'id',
             'code',
@@ -82,6 +116,79 @@ class SubjectSerializer(serializers.ModelSerializer):
         return value
 
 
+# Columns read by subject_rows(), per SubjectSerializer field
+SUBJECT_ROW_COLUMNS = {
+    'teacher_name': ('teacher_id', 'teacher__first_name', 'teacher__last_name'),
+    'area_name': ('area_id', 'area__name'),
+    'career_name': ('career_id', 'career__name'),
+    'semester_name': ('semester_id', 'semester__name'),
+    'period_code': ('period_year', 'period_season'),
+    'teacher': ('teacher_id',),
+    'area': ('area_id',),
+    'career': ('career_id',),
+    'semester': ('semester_id',),
+    **{name: ('period_year', 'period_season', 'phase') for name in SUBJECT_SCHEDULE_FIELDS},
+}
+RELATED_NAME_FIELDS = {'teacher_name': 'teacher', 'area_name': 'area', 'career_name': 'career', 'semester_name': 'semester'}
+
+
+def subject_rows_queryset(queryset, fields=None):
+    """
+    ``values()`` queryset with the columns subject_rows() needs for ``fields``
+    (default: every SubjectSerializer field), joined in the same query.
+    """
+    fields = SubjectSerializer.Meta.fields if fields is None else fields
+    columns = []
+    for name in fields:
+        for column in SUBJECT_ROW_COLUMNS.get(name, (name,)):
+            if column not in columns:
+                columns.append(column)
+    return queryset.values(*columns)
+
+
+def subject_rows(rows, fields=None):
+    """
+    Build the same dicts SubjectSerializer would, from rows of
+    subject_rows_queryset(), without instantiating models (list endpoints).
+    """
+    fields = [name for name in SubjectSerializer.Meta.fields if fields is None or name in fields]
+    rows = list(rows)
+    index = None
+    if any(name in SUBJECT_SCHEDULE_FIELDS for name in fields):
+        index = PeriodPhaseScheduleIndex.for_periods((row['period_year'], row['period_season']) for row in rows)
+    date_field = serializers.DateField()
+
+    def as_date(value):
+        return date_field.to_representation(value) if value is not None else None
+
+    data = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name in RELATED_NAME_FIELDS:
+                fk = RELATED_NAME_FIELDS[name]
+                if row[f'{fk}_id'] is None:
+                    continue  # like the serializer: no related object, no key
+                if name == 'teacher_name':
+                    item[name] = f"{row['teacher__first_name']} {row['teacher__last_name']}".strip()
+                else:
+                    item[name] = row[f'{fk}__name']
+            elif name in ('teacher', 'area', 'career', 'semester'):
+                item[name] = row[f'{name}_id']
+            elif name == 'period_code':
+                item[name] = f"{row['period_season']}-{row['period_year']}"
+            elif name in ('phase_start_date', 'phase_end_date'):
+                schedule = index.get(row['period_year'], row['period_season'], row['phase'])
+                item[name] = as_date(getattr(schedule, name.replace('phase_', ''), None))
+            elif name in ('process_start_date', 'process_end_date'):
+                start, end = index.process_bounds(row['period_year'], row['period_season'])
+                item[name] = as_date(start if name == 'process_start_date' else end)
+            else:
+                item[name] = row[name]
+        data.append(item)
+    return data
+
+
 class AreaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Area
@@ -1,21 +1,35 @@
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from api_backend.caching import track_table_versions
 from .events import publish_subject_event
-from .models import Subject, SubjectPhaseProgress
+from .models import Area, Career, PeriodPhaseSchedule, PeriodSetting, SemesterLevel, Subject, SubjectPhaseProgress
+from .overview import invalidate_period_overview
 
 
-def _publish(event_name, instance):
+# ETag/cache versions of the lookup tables (api_backend.caching)
+track_table_versions(Area, Career, SemesterLevel, PeriodPhaseSchedule)
+
+
+def _publish(event_name, instance, changed_fields=None):
     try:
-        publish_subject_event(event_name, instance)
+        publish_subject_event(event_name, instance, changed_fields=changed_fields)
     except Exception:
         # Avoid breaking save/delete operations if Redis is down
         pass
 
 
 @receiver(post_save, sender=Subject)
-def subject_saved(sender, instance, created, **kwargs):
-    _publish("created" if created else "updated", instance)
+def subject_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        changed_fields = None
+    elif update_fields is not None:
+        changed_fields = [Subject._meta.get_field(name).attname for name in update_fields]
+    else:
+        changed_fields = instance.get_changed_fields()
+    _publish("created" if created else "updated", instance, changed_fields=changed_fields)
+    _invalidate_subject_overview(instance)
     
     # Al crear una asignatura, crear los 3 registros de progreso de fases con estado "nr"
     if created:
@@ -25,6 +39,52 @@ def subject_saved(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Subject)
 def subject_deleted(sender, instance, **kwargs):
     _publish("deleted", instance)
+    _invalidate_subject_overview(instance)
+
+
+def _invalidate_subject_overview(subject):
+    periods = [(subject.period_year, subject.period_season)]
+    loaded = getattr(subject, "_loaded_values", None)
+    if loaded:
+        # The subject may have moved from another period
+        periods.append((loaded.get("period_year"), loaded.get("period_season")))
+    invalidate_period_overview(*periods)
+
+
+@receiver(post_save, sender=SubjectPhaseProgress)
+@receiver(post_delete, sender=SubjectPhaseProgress)
+def phase_progress_changed(sender, instance, **kwargs):
+    if SubjectPhaseProgress.subject.is_cached(instance):
+        period = (instance.subject.period_year, instance.subject.period_season)
+    else:
+        period = (
+            Subject.objects.filter(pk=instance.subject_id)
+            .values_list("period_year", "period_season")
+            .first()
+        )
+    if period:
+        invalidate_period_overview(period)
+
+
+@receiver(pre_save, sender=PeriodPhaseSchedule)
+def phase_schedule_saving(sender, instance, raw=False, **kwargs):
+    # Remember the previous period so both overviews are invalidated on change
+    if instance.pk and not raw:
+        instance._previous_period = (
+            PeriodPhaseSchedule.objects.filter(pk=instance.pk)
+            .values_list("period_year", "period_season")
+            .first()
+        )
+
+
+@receiver(post_save, sender=PeriodPhaseSchedule)
+@receiver(post_delete, sender=PeriodPhaseSchedule)
+def phase_schedule_changed(sender, instance, **kwargs):
+    periods = [(instance.period_year, instance.period_season)]
+    previous = getattr(instance, "_previous_period", None)
+    if previous:
+        periods.append(previous)
+    invalidate_period_overview(*periods)
 
 
 def create_default_phase_progress(subject):
@@ -40,3 +100,11 @@ def create_default_phase_progress(subject):
             phase=phase,
             defaults={'status': 'nr'}
         )
+
+
+@receiver(post_save, sender=PeriodSetting)
+@receiver(post_delete, sender=PeriodSetting)
+def period_setting_changed(sender, **kwargs):
+    PeriodSetting.invalidate_cache()
+    # Again after commit, in case another worker cached the old row meanwhile
+    transaction.on_commit(PeriodSetting.invalidate_cache)
@@ -71,7 +71,8 @@ def get_default_period_from_settings() -> Tuple[str, int]:
 
 def get_current_period() -> Tuple[str, int]:
     """
-    Returns the current period stored in the database (PeriodSetting singleton).
+    Returns the current period stored in the database (PeriodSetting singleton,
+    cached, see PeriodSetting.get_active_period).
     Falls back to settings/env when the table is not ready yet.
     """
     try:
@@ -79,9 +80,6 @@ def get_current_period() -> Tuple[str, int]:
     except LookupError:
         return get_default_period_from_settings()
     try:
-        period = PeriodSetting.objects.filter(pk=PeriodSetting.SINGLETON_PK).first()
+        return PeriodSetting.get_active_period()
     except (OperationalError, ProgrammingError):
         return get_default_period_from_settings()
-    if period:
-        return period.period_season, period.period_year
-    return get_default_period_from_settings()
@@ -1,15 +1,24 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from django.shortcuts import render
 
 # Create your views here.
-from django.db.models import Q
+from django.db import connection, transaction
 from django.http import HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_GET
-from asgiref.sync import sync_to_async
 from rest_framework import viewsets, permissions
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from api_backend.caching import ConditionalLookupMixin
 from .models import (
     Subject,
     Area,
@@ -29,6 +38,8 @@ from .models import (
 ## ProblemStatement model imported by companies app where its views live
 from .serializers import (
     SubjectSerializer,
+    subject_rows,
+    subject_rows_queryset,
     AreaSerializer,
     CareerSerializer,
     SemesterLevelSerializer,
@@ -44,59 +55,162 @@ from .serializers import (
     SubjectPhaseProgressSerializer,
 )
 from .permissions import IsSubjectTeacherOrAdmin, IsAdminOrCoordinator, IsAdminOrAcademicDept
+from .scoping import SubjectScopedQuerysetMixin
+from .overview import get_period_overview, invalidate_period_overview
 from .utils import get_current_period, normalize_season_token, parse_period_string
-from .events import subject_event_stream, async_subject_event_stream
+from .events import (
+    SUBJECT_DELTA_EVENTS_CHANNEL,
+    SUBJECT_EVENTS_CHANNEL,
+    async_subject_event_stream,
+    collect_stream_metrics,
+    stream_metrics,
+    subject_event_stream,
+)
+
+
+# Validated stream tokens keyed by a hash of the whole token: {digest: (user, expires_at)}
+_STREAM_TOKEN_CACHE_SIZE = 1024
+_stream_token_cache = OrderedDict()
+# Pending user lookups, so concurrent reconnects of one user share a single query
+_stream_user_lookups = {}
+_stream_jwt_auth = None
+
+
+def _get_stream_jwt_auth():
+    global _stream_jwt_auth
+    if _stream_jwt_auth is None:
+        _stream_jwt_auth = JWTAuthentication()
+    return _stream_jwt_auth
+
+
+def _get_stream_raw_token(request, token_param):
+    if token_param:
+        return token_param.encode()
+    jwt_auth = _get_stream_jwt_auth()
+    header = jwt_auth.get_header(request)
+    if header is None:
+        return None
+    try:
+        return jwt_auth.get_raw_token(header)
+    except AuthenticationFailed:
+        return None
+
 
+async def _get_stream_user(user_id):
+    loop = asyncio.get_running_loop()
+    lookup = _stream_user_lookups.get(user_id)
+    if lookup is None or lookup.get_loop() is not loop:
+        user_model = _get_stream_jwt_auth().user_model
+        qs = user_model.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id})
+        if jwt_settings.CHECK_USER_IS_ACTIVE:
+            qs = qs.filter(is_active=True)
+        lookup = loop.create_task(qs.afirst())
+        _stream_user_lookups[user_id] = lookup
 
-def _authenticate_stream_request_sync(request, token_param):
+        def forget(task):
+            # A newer lookup may have replaced this one (e.g. from another loop)
+            if _stream_user_lookups.get(user_id) is task:
+                del _stream_user_lookups[user_id]
+
+        lookup.add_done_callback(forget)
+    return await asyncio.shield(lookup)
+
+
+async def _authenticate_stream_request(request, token_param):
     """
-    Synchronous authentication logic for SSE endpoint.
+    Native async authentication for the SSE endpoint.
+
+    The JWT signature/expiry check is CPU only, so it runs on the event loop;
+    validated tokens are cached by their hash for at most
+    ``SUBJECT_STREAM_AUTH_CACHE_SECONDS`` (and never past ``exp``), which keeps
+    reconnect storms from queueing on the ORM thread while a deactivated user
+    or a role change is picked up within that window.
     """
-    user = getattr(request, "user", None)
-    if user and user.is_authenticated:
-        return user
-    jwt_auth = JWTAuthentication()
-    # Build a fake request-like object for JWT auth
-    class FakeRequest:
-        def __init__(self):
-            self.META = dict(request.META)
-            if token_param:
-                self.META["HTTP_AUTHORIZATION"] = f"Bearer {token_param}"
-    fake_req = FakeRequest()
+    auser = getattr(request, "auser", None)
+    if auser is not None:
+        user = await auser()
+        if user and user.is_authenticated:
+            return user
+    raw_token = _get_stream_raw_token(request, token_param)
+    if raw_token is None:
+        return None
+    digest = hashlib.sha256(raw_token).digest()
+    cached = _stream_token_cache.get(digest)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at > time.time():
+            _stream_token_cache.move_to_end(digest)
+            return user
+        _stream_token_cache.pop(digest, None)
     try:
-        authenticated = jwt_auth.authenticate(fake_req)
-    except (InvalidToken, Exception):
-        authenticated = None
-    if authenticated is None:
+        validated_token = _get_stream_jwt_auth().get_validated_token(raw_token)
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
+    user = await _get_stream_user(user_id)
+    if user is None or not user.is_active:
         return None
-    return authenticated[0]
+    ttl = getattr(settings, "SUBJECT_STREAM_AUTH_CACHE_SECONDS", 30)
+    _stream_token_cache[digest] = (user, min(validated_token.get("exp", 0), time.time() + ttl))
+    if len(_stream_token_cache) > _STREAM_TOKEN_CACHE_SIZE:
+        _stream_token_cache.popitem(last=False)
+    return user
+
+
+def _stream_event_visible(data, user):
+    """False for events addressed to another user (``requested_by``, e.g. export progress)."""
+    if '"requested_by"' not in data:
+        return True
+    try:
+        owner = json.loads(data).get("requested_by")
+    except (TypeError, ValueError, AttributeError):
+        return True
+    return owner is None or owner == user.pk or user.is_staff or user.is_superuser
 
 
 async def subject_stream(request):
     """
     SSE endpoint for real-time subject updates.
     Uses async generator for ASGI compatibility (Uvicorn).
+    With ``?payload=delta`` events also carry ``version`` and ``changes``.
     """
     token_param = request.GET.get("token")
-    user = await sync_to_async(_authenticate_stream_request_sync, thread_sensitive=True)(request, token_param)
+    if request.GET.get("payload") == "delta":
+        channel = SUBJECT_DELTA_EVENTS_CHANNEL
+    else:
+        channel = SUBJECT_EVENTS_CHANNEL
+    user = await _authenticate_stream_request(request, token_param)
     if not user:
         return HttpResponse(status=401)
 
     async def async_event_generator():
-        # Let the browser know how often to retry if the stream drops.
-        yield "retry: 10000\n\n"
-        async for message in async_subject_event_stream():
-            msg_type = message.get("type")
-            if msg_type == "keepalive":
-                # Send SSE comment as keepalive
-                yield ": keepalive\n\n"
-                continue
-            if msg_type != "message":
-                continue
-            data = message.get("data")
-            if not data:
-                continue
-            yield f"data: {data}\n\n"
+        stream_metrics.connections_active += 1
+        stream_metrics.connections_total += 1
+        try:
+            # Let the browser know how often to retry if the stream drops.
+            yield "retry: 10000\n\n"
+            async for message in async_subject_event_stream(channel):
+                msg_type = message.get("type")
+                if msg_type == "keepalive":
+                    # Send SSE comment as keepalive
+                    stream_metrics.keepalives_sent += 1
+                    yield ": keepalive\n\n"
+                    continue
+                if msg_type != "message":
+                    continue
+                data = message.get("data")
+                if not data:
+                    stream_metrics.messages_dropped += 1
+                    continue
+                if not _stream_event_visible(data, user):
+                    continue
+                published_at = message.get("published_at")
+                if published_at:
+                    stream_metrics.delivery_latency.observe(time.time() - published_at)
+                stream_metrics.messages_out += 1
+                yield f"data: {data}\n\n"
+        finally:
+            stream_metrics.connections_active -= 1
 
     response = StreamingHttpResponse(async_event_generator(), content_type="text/event-stream")
     response["Cache-Control"] = "no-cache"
@@ -104,39 +218,50 @@ async def subject_stream(request):
     return response
 
 
-def _director_scope_q(user, subject_field='subject'):
-    """Return a Q object restricting records to the director's area/career."""
-    if getattr(user, 'role', None) != 'DC':
-        return None
-    prefix = f'{subject_field}__' if subject_field else ''
-    career_id = getattr(user, 'career_id', None)
-    if career_id:
-        return Q(**{f'{prefix}career_id': career_id})
-    area_id = getattr(user, 'area_id', None)
-    if area_id:
-        return Q(**{f'{prefix}area_id': area_id})
-    return None
-
-
-class SubjectViewSet(viewsets.ModelViewSet):
-    queryset = Subject.objects.all().select_related('teacher', 'area', 'career')
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdminOrCoordinator])
+def subject_stream_metrics(request):
+    """
+    Connection/throughput metrics of the subject SSE stream, aggregated
+    across every process that reported to Redis (capacity planning).
+    """
+    return Response(collect_stream_metrics())
+
+
+class SubjectViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
+    queryset = Subject.objects.all().select_related('teacher', 'area', 'career', 'semester')
+    ordering = ('code', 'section', 'period_year', 'period_season')
     serializer_class = SubjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsSubjectTeacherOrAdmin]
     filterset_fields = ['code', 'section', 'period_year', 'period_season']
-
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user, subject_field='')
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(teacher=user))
-        return qs.filter(teacher=user)
+    subject_scope_field = ''
+
+    def get_requested_fields(self):
+        """Campos pedidos con ``?fields=code,name`` (None = todos)."""
+        raw = self.request.query_params.get('fields') if self.request.method == 'GET' else None
+        if not raw:
+            return None
+        fields = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in SubjectSerializer.Meta.fields]
+        if unknown:
+            raise ValidationError({'fields': f"Campos desconocidos: {', '.join(unknown)}"})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Lee solo las columnas necesarias con values() y arma los mismos dicts
+        # que SubjectSerializer, sin instanciar Subject/User/Area/...
+        fields = self.get_requested_fields()
+        queryset = subject_rows_queryset(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(subject_rows(page, fields))
+        return Response(subject_rows(queryset, fields))
 
     def perform_create(self, serializer):
         """Valida que el DC solo cree asignaturas en su área/carrera."""
@@ -238,14 +363,17 @@ class SubjectViewSet(viewsets.ModelViewSet):
         return Response(data)
 
 
-class AreaViewSet(viewsets.ModelViewSet):
+class AreaViewSet(ConditionalLookupMixin, viewsets.ModelViewSet):
     queryset = Area.objects.all().order_by('name')
+    pagination_class = None
     serializer_class = AreaSerializer
     permission_classes = [IsAdminOrAcademicDept]
 
 
-class CareerViewSet(viewsets.ModelViewSet):
+class CareerViewSet(ConditionalLookupMixin, viewsets.ModelViewSet):
     queryset = Career.objects.all().select_related('area').order_by('name')
+    pagination_class = None
+    cache_dependencies = (Area,)
     serializer_class = CareerSerializer
     permission_classes = [IsAdminOrAcademicDept]
     filterset_fields = ['area']
@@ -253,180 +381,78 @@ class CareerViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'area', 'area__name']
 
 
-class SubjectSemesterViewSet(viewsets.ReadOnlyModelViewSet):
+class SubjectSemesterViewSet(ConditionalLookupMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SemesterLevel.objects.all().order_by('id')
+    pagination_class = None
     serializer_class = SemesterLevelSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class SubjectUnitViewSet(viewsets.ModelViewSet):
+class SubjectUnitViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = SubjectUnit.objects.all().select_related('subject')
+    ordering = ('subject_id', 'number')
     serializer_class = SubjectUnitSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['subject']
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class SubjectTechnicalCompetencyViewSet(viewsets.ModelViewSet):
+
+class SubjectTechnicalCompetencyViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = SubjectTechnicalCompetency.objects.all().select_related('subject')
+    ordering = ('subject_id', 'number')
     serializer_class = SubjectTechnicalCompetencySerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['subject']
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class CompanyBoundaryConditionViewSet(viewsets.ModelViewSet):
+
+class CompanyBoundaryConditionViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = CompanyBoundaryCondition.objects.all().select_related('subject')
+    ordering = ('subject_id',)
     serializer_class = CompanyBoundaryConditionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class PossibleCounterpartViewSet(viewsets.ModelViewSet):
+
+class PossibleCounterpartViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = PossibleCounterpart.objects.all().select_related('subject', 'company')
+    ordering = ('subject_id', 'company_id', 'id')
     serializer_class = PossibleCounterpartSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class Api3AlternanceViewSet(viewsets.ModelViewSet):
+
+class Api3AlternanceViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Api3Alternance.objects.all().select_related('subject')
+    ordering = ('subject_id',)
     serializer_class = Api3AlternanceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class ApiType2CompletionViewSet(viewsets.ModelViewSet):
+
+class ApiType2CompletionViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = ApiType2Completion.objects.all().select_related('subject')
+    ordering = ('subject_id',)
     serializer_class = ApiType2CompletionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class ApiType3CompletionViewSet(viewsets.ModelViewSet):
+
+class ApiType3CompletionViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = ApiType3Completion.objects.all().select_related('subject')
+    ordering = ('subject_id',)
     serializer_class = ApiType3CompletionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
 
 ## ProblemStatementViewSet movido a companies.views
 
 
-class CompanyEngagementScopeViewSet(viewsets.ModelViewSet):
+class CompanyEngagementScopeViewSet(SubjectScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = CompanyEngagementScope.objects.all().select_related('subject')
+    ordering = ('subject_id',)
     serializer_class = CompanyEngagementScopeSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['subject']
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        if (
-            getattr(user, 'is_staff', False)
-            or getattr(user, 'role', None) in ['DAC', 'VCM', 'COORD']
-            or user.groups.filter(name__in=['vcm']).exists()
-        ):
-            return qs
-        director_scope = _director_scope_q(user)
-        if director_scope is not None:
-            return qs.filter(director_scope | Q(subject__teacher=user))
-        return qs.filter(subject__teacher=user)
-
-
-class PeriodPhaseScheduleViewSet(viewsets.ModelViewSet):
+
+class PeriodPhaseScheduleViewSet(ConditionalLookupMixin, viewsets.ModelViewSet):
     queryset = PeriodPhaseSchedule.objects.all().order_by('period_year', 'period_season', 'phase')
+    pagination_class = None
     serializer_class = PeriodPhaseScheduleSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrCoordinator]
     filterset_fields = ['period_year', 'period_season', 'phase']
@@ -439,6 +465,7 @@ class SubjectPhaseProgressViewSet(viewsets.ModelViewSet):
     Permite filtrar por subject para obtener el progreso de una asignatura específica.
     """
     queryset = SubjectPhaseProgress.objects.all().select_related('subject', 'updated_by')
+    ordering = ('subject_id', 'phase')
     serializer_class = SubjectPhaseProgressSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrCoordinator]
     filterset_fields = ['subject', 'phase', 'status']
@@ -458,43 +485,121 @@ class SubjectPhaseProgressViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='period-overview')
+    def period_overview(self, request):
+        """Resumen columnar del avance de todas las asignaturas de un período (Gantt).
+
+        Período con ``?period=O-2025`` o ``?period_year=&period_season=``; por
+        defecto el período actual. Se sirve desde cache (ver subjects.overview).
+        """
+        period_param = request.query_params.get('period')
+        if period_param:
+            season, year = parse_period_string(period_param)
+            if not (season and year):
+                return Response({'detail': 'period debe tener formato O-2025.'}, status=400)
+        else:
+            season, year = get_current_period()
+            period_season = request.query_params.get('period_season')
+            if period_season:
+                season = normalize_season_token(period_season)
+                if not season:
+                    return Response({'detail': 'period_season debe ser O o P.'}, status=400)
+            period_year = request.query_params.get('period_year')
+            if period_year:
+                try:
+                    year = int(period_year)
+                except ValueError:
+                    return Response({'detail': 'period_year debe ser numérico.'}, status=400)
+        return Response(get_period_overview(year, season))
+
     @action(detail=False, methods=['post'], url_path='bulk-upsert')
     def bulk_upsert(self, request):
         """Crea o actualiza múltiples registros de progreso en una sola petición.
-        
-        Espera un array de objetos con: subject, phase, status, notes (opcional)
+
+        Espera un array de objetos con: subject, phase, status, notes (opcional).
+        Valida todo el lote antes de escribir: si algún ítem es inválido responde
+        400 con los errores y no modifica nada. El upsert es un único INSERT ...
+        ON CONFLICT/ON DUPLICATE KEY UPDATE.
         """
         data_list = request.data if isinstance(request.data, list) else [request.data]
-        results = []
+        phases = {code for code, _ in SubjectPhaseProgress.PHASE_CHOICES}
+        statuses = {code for code, _ in SubjectPhaseProgress.STATUS_CHOICES}
         errors = []
-        
+        items = {}
+
         for item in data_list:
+            if not isinstance(item, dict):
+                errors.append({'error': 'cada ítem debe ser un objeto', 'item': item})
+                continue
             subject_id = item.get('subject')
             phase = item.get('phase')
             status = item.get('status', 'nr')
-            notes = item.get('notes', '')
-            
+            notes = item.get('notes', '') or ''
             if not subject_id or not phase:
                 errors.append({'error': 'subject y phase son requeridos', 'item': item})
                 continue
-            
             try:
-                obj, created = SubjectPhaseProgress.objects.update_or_create(
-                    subject_id=subject_id,
-                    phase=phase,
-                    defaults={
-                        'status': status,
-                        'notes': notes,
-                        'updated_by': request.user,
-                    }
-                )
-                serializer = self.get_serializer(obj)
-                results.append({'created': created, 'data': serializer.data})
-            except Exception as e:
-                errors.append({'error': str(e), 'item': item})
-        
-        return Response({
-            'success': results,
-            'errors': errors,
-        }, status=200 if not errors else 207)
+                subject_id = int(subject_id)
+            except (TypeError, ValueError):
+                errors.append({'error': 'subject debe ser un id numérico', 'item': item})
+                continue
+            if phase not in phases:
+                errors.append({'error': f'phase inválida: {phase}', 'item': item})
+                continue
+            if status not in statuses:
+                errors.append({'error': f'status inválido: {status}', 'item': item})
+                continue
+            # Si el mismo (subject, phase) viene repetido, gana el último
+            items[(subject_id, phase)] = (status, notes, item)
+
+        subjects = Subject.objects.in_bulk({subject_id for subject_id, _ in items})
+        for (subject_id, phase), (_, _, item) in items.items():
+            if subject_id not in subjects:
+                errors.append({'error': f'subject {subject_id} no existe', 'item': item})
+        if errors:
+            return Response({'success': [], 'errors': errors}, status=400)
+        if not items:
+            return Response({'success': [], 'errors': []})
+
+        existing = set(
+            SubjectPhaseProgress.objects.filter(
+                subject_id__in=subjects.keys(),
+                phase__in={phase for _, phase in items},
+            ).values_list('subject_id', 'phase')
+        )
+        objs = [
+            SubjectPhaseProgress(
+                subject=subjects[subject_id],
+                phase=phase,
+                status=status,
+                notes=notes,
+                updated_by=request.user,
+            )
+            for (subject_id, phase), (status, notes, _) in items.items()
+        ]
+        options = {'update_conflicts': True, 'update_fields': ['status', 'notes', 'updated_by', 'updated_at']}
+        if connection.features.supports_update_conflicts_with_target:
+            options['unique_fields'] = ['subject', 'phase']
+        with transaction.atomic():
+            SubjectPhaseProgress.objects.bulk_create(objs, **options)
+        # bulk_create no emite señales
+        invalidate_period_overview(*{(s.period_year, s.period_season) for s in subjects.values()})
+
+        if any(obj.pk is None for obj in objs):
+            # MySQL no devuelve los ids del upsert: una consulta para recuperarlos
+            ids = dict(
+                ((subject_id, phase), pk)
+                for pk, subject_id, phase in SubjectPhaseProgress.objects.filter(
+                    subject_id__in=subjects.keys(),
+                    phase__in={phase for _, phase in items},
+                ).values_list('id', 'subject_id', 'phase')
+            )
+            for obj in objs:
+                obj.pk = ids.get((obj.subject_id, obj.phase))
+
+        results = [
+            {'created': (obj.subject_id, obj.phase) not in existing, 'data': self.get_serializer(obj).data}
+            for obj in objs
+        ]
+        return Response({'success': results, 'errors': []})
 
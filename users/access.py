@@ -0,0 +1,113 @@
+"""
+Perfil de acceso del usuario (rol, grupo 'vcm', alcance de director).
+
+Los permisos y los ``get_queryset`` de las vistas consultan lo mismo en cada
+request: staff, rol, pertenencia al grupo ``vcm`` y área/carrera del
+director. ``get_access_profile`` lo resuelve una sola vez por request (queda
+memorizado en la instancia de ``request.user``) y, si se configura
+``USER_ACCESS_CACHE_SECONDS``, guarda la pertenencia a grupos en el cache de
+Django entre requests. Las señales de ``users.signals`` invalidan esa entrada
+cuando cambian los grupos del usuario o el propio grupo.
+
+Rol, área y carrera se leen siempre de la fila del usuario ya cargada por la
+autenticación, así que un cambio de rol se ve en el siguiente request.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+VCM_GROUP = 'vcm'
+ACCESS_CACHE_KEY = 'users:access:{version}:{user_id}'
+ACCESS_VERSION_KEY = 'users:access:version'
+
+
+class AccessProfile:
+    __slots__ = ('user_id', 'is_staff', 'role', 'area_id', 'career_id', 'in_vcm_group', 'subject_ids')
+
+    def __init__(self, user_id, is_staff, role, area_id, career_id, in_vcm_group):
+        self.user_id = user_id
+        self.is_staff = is_staff
+        self.role = role
+        self.area_id = area_id
+        self.career_id = career_id
+        self.in_vcm_group = in_vcm_group
+        # Asignaturas visibles (docente/director); las resuelve subjects.scoping
+        self.subject_ids = None
+
+    def has_elevated_access(self, roles):
+        """Staff, miembro del grupo 'vcm' o con alguno de ``roles``."""
+        return self.is_staff or self.in_vcm_group or self.role in roles
+
+    @property
+    def is_director(self):
+        return self.role == 'DC'
+
+    @property
+    def director_scope(self):
+        """``('career_id', id)`` / ``('area_id', id)`` del director, o None."""
+        if not self.is_director:
+            return None
+        if self.career_id:
+            return 'career_id', self.career_id
+        if self.area_id:
+            return 'area_id', self.area_id
+        return None
+
+
+def _cache_seconds():
+    return int(getattr(settings, 'USER_ACCESS_CACHE_SECONDS', 0) or 0)
+
+
+def _cache_key(user_id):
+    version = cache.get(ACCESS_VERSION_KEY) or 0
+    return ACCESS_CACHE_KEY.format(version=version, user_id=user_id)
+
+
+def _load_vcm_membership(user):
+    timeout = _cache_seconds()
+    if timeout <= 0:
+        return user.groups.filter(name=VCM_GROUP).exists()
+    key = _cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        cached = user.groups.filter(name=VCM_GROUP).exists()
+        cache.set(key, cached, timeout)
+    return cached
+
+
+def get_access_profile(user):
+    """Perfil de acceso de ``user``, calculado una vez por instancia."""
+    profile = getattr(user, '_access_profile', None)
+    if profile is not None:
+        return profile
+    authenticated = bool(user and getattr(user, 'is_authenticated', False))
+    profile = AccessProfile(
+        user_id=getattr(user, 'pk', None),
+        is_staff=bool(getattr(user, 'is_staff', False)),
+        role=getattr(user, 'role', None),
+        area_id=getattr(user, 'area_id', None),
+        career_id=getattr(user, 'career_id', None),
+        in_vcm_group=_load_vcm_membership(user) if authenticated and user.pk else False,
+    )
+    try:
+        user._access_profile = profile
+    except AttributeError:
+        pass
+    return profile
+
+
+def invalidate_access_profile(user_ids):
+    """Descarta el perfil cacheado de los usuarios indicados."""
+    if _cache_seconds() <= 0:
+        return
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all_access_profiles():
+    """Invalida todos los perfiles (p. ej. al renombrar o borrar un grupo)."""
+    if _cache_seconds() <= 0:
+        return
+    try:
+        cache.incr(ACCESS_VERSION_KEY)
+    except ValueError:
+        cache.set(ACCESS_VERSION_KEY, 1, None)
@@ -9,9 +9,12 @@ from django.db.utils import OperationalError, ProgrammingError
 from django.dispatch import receiver
 from django.apps import apps
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models.signals import post_migrate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.utils import timezone
 
+from users.access import invalidate_access_profile, invalidate_all_access_profiles
 from subjects.utils import (
     get_current_period,
     normalize_season_token,
@@ -549,3 +552,23 @@ def populate_after_migrate(sender, **kwargs):
         _load_populate_json()
     except Exception as e:
         logger.error("Fallo populate post_migrate: %s", e)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_access_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Descarta el perfil de acceso cacheado al cambiar los grupos de un usuario."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_access_profile([instance.pk])
+    elif pk_set:
+        invalidate_access_profile(pk_set)
+    else:
+        # group.user_set.clear(): no se conocen los usuarios afectados
+        invalidate_all_access_profiles()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_access_on_group_change(sender, **kwargs):
+    invalidate_all_access_profiles()
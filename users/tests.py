@@ -1,3 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import User
+
+
+class UserListKeysetPaginationTests(TestCase):
+    """El cursor conserva los microsegundos de las fechas al paginar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        base = datetime(2025, 3, 1, 12, 0, 0, 100, tzinfo=timezone.utc)
+        cls.admin = User.objects.create_user(email='admin@example.com', password='x', role='ADMIN')
+        User.objects.filter(pk=cls.admin.pk).update(date_joined=base - timedelta(days=1))
+        for idx in range(6):
+            user = User.objects.create_user(email=f'u{idx}@example.com', password='x')
+            # Solo difieren en microsegundos, bajo la precisión de DjangoJSONEncoder
+            User.objects.filter(pk=user.pk).update(date_joined=base + timedelta(microseconds=idx * 7))
 
-# Create your tests here.
+    def test_next_links_return_every_row_once(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = '/api/users/?ordering=date_joined&page_size=2'
+        emails = []
+        for _ in range(100):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            emails.extend(row['email'] for row in response.data['results'])
+            url = response.data['next']
+            if not url:
+                break
+        self.assertIsNone(url)
+        # Las migraciones también crean usuarios; ninguno debe repetirse
+        self.assertEqual(len(emails), len(set(emails)))
+        self.assertEqual(len(emails), User.objects.count())
+        expected = ['admin@example.com'] + [f'u{idx}@example.com' for idx in range(6)]
+        self.assertEqual([email for email in emails if email in expected], expected)
@@ -14,6 +14,7 @@ from .serializers import (
     UserAdminUpdateSerializer,
     TeacherManageSerializer,
 )
+from .access import get_access_profile
 from .permissions import IsAdminOrReadOnly, IsAdminOrDAC
 
 User = get_user_model()
@@ -41,6 +42,7 @@ class MeViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 class UserViewSet(viewsets.ModelViewSet):
     """CRUD de usuarios (solo Admin escribe)."""
     queryset = User.objects.all().order_by('id')
+    ordering = ('id',)
     serializer_class = UserListSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -60,9 +62,7 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(methods=['get'], detail=False, url_path='teachers', permission_classes=[IsAuthenticated])
     def list_teachers(self, request, *args, **kwargs):
         user = request.user
-        is_vcm_group = user.groups.filter(name__in=['vcm']).exists()
-        is_vcm_role = getattr(user, 'role', None) == 'VCM'
-        if not (getattr(user, 'is_staff', False) or getattr(user, 'role', None) in ['ADMIN', 'DAC', 'COORD'] or is_vcm_group or is_vcm_role):
+        if not get_access_profile(user).has_elevated_access(['ADMIN', 'DAC', 'COORD', 'VCM']):
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
         qs = User.objects.filter(role='DOC', is_active=True).order_by('first_name', 'last_name', 'email')
         serializer = UserListSerializer(qs, many=True)
@@ -77,6 +77,7 @@ class TeachersViewSet(viewsets.ModelViewSet):
     - En create/update se fuerza role='DOC' y se limitan campos.
     """
     queryset = User.objects.filter(role='DOC').order_by('first_name', 'last_name', 'email')
+    pagination_class = None
     permission_classes = [IsAuthenticated, IsAdminOrDAC]
 
     def get_serializer_class(self):